@@ -0,0 +1,122 @@
+// Output-stationary accumulator between the systolic array and scalar_pipe.
+//
+// For K > N a layer runs in several K passes, each producing a partial N x N
+// output tile, one row per cycle on psum_i. Instead of storing the int32
+// partial sums to SRAM and reading them back, the rows are added into one of
+// TILES resident tiles: the first pass (first_i) overwrites, later passes add.
+// When the last row of the final pass (last_i) is in, the tile is released and
+// drained to scalar_pipe row by row under ready/valid, in release order.
+//
+// psum_i takes a whole row at once. sysray_nxn's psum_out_n_o columns are
+// diagonally skewed (column c one cycle after column c-1), so a tri_shift
+// deskew like the one in scalar_par must sit in front of this module.
+//
+// The array cannot stall, so psum rows have no ready. A released tile stays
+// busy (tile_busy_o) until it is drained; the controller starts the next
+// output tile in another one. A row aimed at a busy tile, or at a tile_i
+// >= TILES, is dropped and sets the sticky overrun_o.
+module accum_buf #(
+    parameter int N = 8,
+    parameter int ACC_WIDTH = 32,
+    parameter int TILES = 2,
+    parameter int TILE_W = (TILES > 1) ? $clog2(TILES) : 1
+)(
+    input logic clk_i,
+    input logic rst_i,
+
+    // one output row of the array per cycle, N rows per tile and pass
+    input logic signed [ACC_WIDTH-1:0] psum_i [N-1:0],
+    input logic psum_valid_i,
+    input logic [TILE_W-1:0] tile_i,
+    input logic first_i,
+    input logic last_i,
+
+    output logic [TILES-1:0] tile_busy_o,
+    output logic overrun_o,
+
+    // finished rows to scalar_pipe
+    output logic signed [ACC_WIDTH-1:0] data_o [N-1:0],
+    output logic data_valid_o,
+    input logic data_ready_i
+);
+
+    localparam int ROW_W = (N > 1) ? $clog2(N) : 1;
+    localparam int DEPTH = TILES * N;
+    localparam int ADDR_W = (DEPTH > 1) ? $clog2(DEPTH) : 1;
+
+    logic signed [ACC_WIDTH-1:0] acc_q [DEPTH][N];
+
+    // accumulate side
+    logic [ROW_W-1:0] in_row_q;
+    logic [ADDR_W-1:0] in_addr;
+    logic tile_ok, tile_busy;
+    logic in_fire, in_done;
+    // with TILES not a power of two tile_i can name a tile that does not exist
+    assign tile_ok   = ({1'b0, tile_i} < (TILE_W+1)'(TILES));
+    assign tile_busy = ~tile_ok | tile_busy_o[tile_ok ? tile_i : '0];
+    assign in_addr = tile_i * N + in_row_q;
+    assign in_fire = psum_valid_i & ~tile_busy;
+    assign in_done = in_fire & last_i & (in_row_q == ROW_W'(N - 1));
+
+    // drain side: released tiles queue up in order
+    logic [TILE_W-1:0] drain_tile;
+    logic [ROW_W-1:0] drain_row_q;
+    logic [ADDR_W-1:0] drain_addr;
+    logic drain_fire, drain_done;
+    assign drain_addr = drain_tile * N + drain_row_q;
+    assign drain_fire = data_valid_o & data_ready_i;
+    assign drain_done = drain_fire & (drain_row_q == ROW_W'(N - 1));
+
+    // never full: a tile is queued at most once until drained
+    fifo #(
+        .DEPTH_LOG2_P(TILE_W),
+        .WIDTH_P(TILE_W)
+    ) release_q (
+        .clk_i(clk_i),
+        .rst_i(rst_i),
+        .data_i(tile_i),
+        .data_o(drain_tile),
+        .valid_i(in_done),
+        .ready_i(drain_done),
+        .valid_o(data_valid_o),
+        .ready_o()
+    );
+
+    genvar i;
+    generate
+        for (i = 0; i < N; i++) begin : gen_lane
+            assign data_o[i] = acc_q[drain_addr][i];
+
+            always_ff @(posedge clk_i) begin
+                if (in_fire)
+                    acc_q[in_addr][i] <= first_i ? psum_i[i] : acc_q[in_addr][i] + psum_i[i];
+            end
+        end
+    endgenerate
+
+    always_ff @(posedge clk_i) begin
+        if (rst_i) begin
+            in_row_q <= '0;
+            drain_row_q <= '0;
+            tile_busy_o <= '0;
+            overrun_o <= '0;
+        end else begin
+            if (in_fire)
+                in_row_q <= (in_row_q == ROW_W'(N - 1)) ? '0 : in_row_q + 1'b1;
+            if (psum_valid_i & tile_busy)
+                overrun_o <= 1'b1;
+
+            if (drain_fire)
+                drain_row_q <= drain_done ? '0 : drain_row_q + 1'b1;
+
+            // set and clear never hit the same tile: a busy tile takes no rows
+            for (int t = 0; t < TILES; t++) begin
+                if (in_done && tile_i == TILE_W'(t))
+                    tile_busy_o[t] <= 1'b1;
+                else if (drain_done && drain_tile == TILE_W'(t))
+                    tile_busy_o[t] <= 1'b0;
+            end
+        end
+    end
+
+endmodule
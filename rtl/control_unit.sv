@@ -0,0 +1,323 @@
+// Control unit: fetches instructions from DRAM through the TPU port of
+// wb_mux_2to1 (Wishbone B4 pipelined), decodes them and dispatches them to the
+// execution units, so a whole program runs without host round-trips.
+//
+// Instruction format (64 bits, two little-endian 32-bit words, word 0 first):
+//   word0[3:0]    opcode
+//   word0[4]      sync: wait until every unit is idle before issuing
+//   word0[5]      flag: DO_RELU enable
+//   word0[15:8]   length (SRAM words / activation rows)
+//   word0[23:16]  SRAM address
+//   word1         DRAM address (GMEM2SMEM / SMEM2GMEM), output SRAM address (MATMUL)
+// sim/isa.py encodes programs in this format.
+//
+// Fetch runs ahead of issue through a small instruction queue, so an
+// instruction issues on the cycle after the previous one as long as its unit
+// is ready. Units other than the scalar parameter loads are command ports:
+// <unit>_valid_o / <unit>_ready_i handshake the operands on cmd_*, and
+// <unit>_busy_i must be high from the cycle after a unit accepts a command
+// until it has finished. The control unit only checks structural hazards (the
+// target unit must be ready) and the weight double buffer (LOAD_WEIGHTS never
+// overwrites the bank of a running MATMUL, MATMUL waits for its weights).
+// Every other ordering, e.g. MATMUL reading what a GMEM2SMEM wrote, is up to
+// the program: it sets the sync bit.
+module control_unit #(
+    parameter int counter_width = 8,
+    parameter int address_width = 8,
+    parameter int QUEUE_LOG2    = 1
+) (
+    input clk_i,
+    input rst_i,
+
+    // host side
+    input  logic        start_i,
+    input  logic [31:0] pc_i,        // byte address of the first instruction
+    output logic        busy_o,
+    output logic        done_o,      // one cycle pulse when EXIT retires
+    output logic        error_o,     // illegal opcode, sticky until the next start
+    output logic        tpu_active_o,
+
+    // instruction fetch, to the m1 (TPU) port of wb_mux_2to1
+    output logic [31:0] wb_adr_o,
+    output logic [31:0] wb_dat_o,
+    output logic        wb_we_o,
+    output logic        wb_stb_o,
+    output logic        wb_cyc_o,
+    output logic [3:0]  wb_sel_o,
+    input  logic [31:0] wb_dat_i,
+    input  logic        wb_ack_i,
+    input  logic        wb_stall_i,
+
+    // operands of the issuing instruction, valid with any <unit>_valid_o
+    output logic [31:0]              cmd_dram_addr_o,
+    output logic [address_width-1:0] cmd_sram_addr_o,
+    output logic [counter_width-1:0] cmd_len_o,
+    output logic                     cmd_to_dram_o,   // DMA direction, 1 = SMEM2GMEM
+    output logic                     cmd_bank_o,      // weight buffer for LOAD_WEIGHTS / MATMUL
+
+    // DMA (GMEM2SMEM, SMEM2GMEM)
+    output logic dma_valid_o,
+    input  logic dma_ready_i,
+    input  logic dma_busy_i,
+
+    // weight loader (LOAD_WEIGHTS)
+    output logic w_valid_o,
+    input  logic w_ready_i,
+    input  logic w_busy_i,
+
+    // activation streamer / systolic array (MATMUL)
+    output logic mm_valid_o,
+    input  logic mm_ready_i,
+    input  logic mm_busy_i,
+
+    // results to the host (TO_HOST_SPI)
+    output logic host_valid_o,
+    input  logic host_ready_i,
+    input  logic host_busy_i,
+
+    // scalar parameter loads (LOAD_BIAS/ZP/SCALE): an SRAM read transaction
+    // (memory_transaction ports) with the matching scalar_stage enable held
+    output logic [address_width-1:0] sram_addr_o,
+    output logic [counter_width-1:0] sram_amount_o,
+    output logic                     sram_rw_mode_o,
+    output logic                     sram_load_valid_o,
+    input  logic                     sram_load_ready_i,
+    output logic                     sram_rd_ready_o,
+    output logic                     load_bias_en_o,
+    output logic                     load_zp_en_o,
+    output logic                     load_scale_en_o,
+    output logic                     relu_en_o
+);
+
+    localparam logic [3:0] OP_EXIT         = 4'd0;
+    localparam logic [3:0] OP_GMEM2SMEM    = 4'd1;
+    localparam logic [3:0] OP_SMEM2GMEM    = 4'd2;
+    localparam logic [3:0] OP_LOAD_BIAS    = 4'd3;
+    localparam logic [3:0] OP_LOAD_ZP      = 4'd4;
+    localparam logic [3:0] OP_LOAD_SCALE   = 4'd5;
+    localparam logic [3:0] OP_LOAD_WEIGHTS = 4'd6;
+    localparam logic [3:0] OP_MATMUL       = 4'd7;
+    localparam logic [3:0] OP_DO_RELU      = 4'd8;
+    localparam logic [3:0] OP_TO_HOST_SPI  = 4'd9;
+
+    typedef enum logic [1:0] {P_IDLE, P_REQ, P_READ, P_TAIL} param_state_t;
+
+    logic running_q;
+
+    // ── Fetch ───────────────────────────────────────────────────────────────
+    logic [31:0] pc_q;
+    logic        hi_q;          // fetching word 1 of the instruction
+    logic [31:0] word0_q;
+    logic        fetch_done_q;  // EXIT fetched, nothing after it is fetched
+    logic        req_q;         // a read was taken by the slave, its ack is due
+
+    logic        q_push, q_ready, q_valid, q_pop;
+    logic [63:0] q_head;
+
+    // B4 pipelined: a read is taken on stb & ~stall and stb drops until its
+    // ack, so the LiteDRAM port the DMA needs never sees a read twice. One
+    // read is in flight at a time; the next one goes out in the cycle of the
+    // ack (at the address and state the ack moves to), so a slave acking the
+    // cycle after the request still gets one read per cycle. Word 1 is only
+    // requested once the queue has room for the instruction, so a started read
+    // never has to wait for the queue (its push does not fall in that cycle).
+    logic        start, fetch_ack, next_hi, next_done;
+    logic [31:0] next_pc;
+    assign start     = start_i & ~running_q & ~req_q;
+    assign fetch_ack = req_q & wb_ack_i;
+    assign next_pc   = fetch_ack ? pc_q + 32'd4 : pc_q;
+    assign next_hi   = fetch_ack ? ~hi_q : hi_q;
+    assign next_done = fetch_done_q | (fetch_ack & hi_q & (word0_q[3:0] == OP_EXIT));
+
+    assign wb_stb_o = running_q & (~req_q | wb_ack_i) & ~next_done & (~next_hi | q_ready);
+    assign wb_cyc_o = wb_stb_o | req_q;
+    assign wb_adr_o = next_pc;
+    assign wb_dat_o = '0;
+    assign wb_we_o  = 1'b0;
+    assign wb_sel_o = 4'hF;
+
+    assign q_push = fetch_ack & hi_q;
+
+    always_ff @(posedge clk_i) begin
+        if (rst_i) begin
+            pc_q         <= '0;
+            hi_q         <= 1'b0;
+            word0_q      <= '0;
+            fetch_done_q <= 1'b0;
+            req_q        <= 1'b0;
+        end else begin
+            if (wb_stb_o & ~wb_stall_i)
+                req_q <= 1'b1;
+            else if (fetch_ack)
+                req_q <= 1'b0;
+
+            if (start) begin
+                pc_q         <= pc_i;
+                hi_q         <= 1'b0;
+                fetch_done_q <= 1'b0;
+            end else if (fetch_ack) begin
+                pc_q         <= next_pc;
+                hi_q         <= next_hi;
+                fetch_done_q <= next_done;
+                if (~hi_q)
+                    word0_q <= wb_dat_i;
+            end
+        end
+    end
+
+    // a new start flushes whatever an aborted (illegal opcode) program left queued
+    fifo #(
+        .DEPTH_LOG2_P(QUEUE_LOG2),
+        .WIDTH_P     (64)
+    ) instr_queue (
+        .clk_i  (clk_i),
+        .rst_i  (rst_i | start),
+        .data_i ({wb_dat_i, word0_q}),
+        .data_o (q_head),
+        .valid_i(q_push),
+        .ready_i(q_pop),
+        .valid_o(q_valid),
+        .ready_o(q_ready)
+    );
+
+    // ── Decode ──────────────────────────────────────────────────────────────
+    logic [3:0] op;
+    logic       sync;
+    assign op   = q_head[3:0];
+    assign sync = q_head[4];
+
+    assign cmd_len_o       = q_head[8 +: counter_width];
+    assign cmd_sram_addr_o = q_head[16 +: address_width];
+    assign cmd_dram_addr_o = q_head[63:32];
+    assign cmd_to_dram_o   = (op == OP_SMEM2GMEM);
+
+    // ── Issue ───────────────────────────────────────────────────────────────
+    param_state_t param_q;
+    logic         param_busy;
+    logic         any_busy;
+    logic         w_bank_q;     // bank the next LOAD_WEIGHTS fills
+    logic         mm_bank_q;    // bank holding the most recently loaded weights
+    logic         run_bank_q;   // bank of the MATMUL in flight
+
+    assign param_busy = (param_q != P_IDLE);
+    assign any_busy   = dma_busy_i | w_busy_i | mm_busy_i | host_busy_i | param_busy;
+    assign cmd_bank_o = (op == OP_LOAD_WEIGHTS) ? w_bank_q : mm_bank_q;
+
+    logic head, blocked, is_param, legal, issue;
+    assign head    = running_q & q_valid;
+    assign blocked = sync & any_busy;
+
+    always_comb begin
+        dma_valid_o  = 1'b0;
+        w_valid_o    = 1'b0;
+        mm_valid_o   = 1'b0;
+        host_valid_o = 1'b0;
+        is_param     = 1'b0;
+        legal        = 1'b1;
+        issue        = 1'b0;
+
+        unique case (op)
+            OP_EXIT: issue = head & ~any_busy;
+            OP_GMEM2SMEM, OP_SMEM2GMEM: begin
+                dma_valid_o = head & ~blocked;
+                issue       = dma_valid_o & dma_ready_i;
+            end
+            OP_LOAD_BIAS, OP_LOAD_ZP, OP_LOAD_SCALE: begin
+                is_param = 1'b1;
+                issue    = head & ~blocked & ~param_busy;
+            end
+            OP_LOAD_WEIGHTS: begin
+                w_valid_o = head & ~blocked & ~(mm_busy_i & (run_bank_q == w_bank_q));
+                issue     = w_valid_o & w_ready_i;
+            end
+            OP_MATMUL: begin
+                mm_valid_o = head & ~blocked & ~w_busy_i;
+                issue      = mm_valid_o & mm_ready_i;
+            end
+            OP_DO_RELU: issue = head & ~blocked;
+            OP_TO_HOST_SPI: begin
+                host_valid_o = head & ~blocked;
+                issue        = host_valid_o & host_ready_i;
+            end
+            default: legal = 1'b0;
+        endcase
+    end
+
+    assign q_pop  = issue;
+    // after an illegal opcode the bus is kept until the read in flight is acked
+    assign busy_o = running_q | any_busy | req_q;
+    assign tpu_active_o = running_q | req_q;
+
+    always_ff @(posedge clk_i) begin
+        if (rst_i) begin
+            running_q  <= 1'b0;
+            done_o     <= 1'b0;
+            error_o    <= 1'b0;
+            relu_en_o  <= 1'b0;
+            w_bank_q   <= 1'b0;
+            mm_bank_q  <= 1'b0;
+            run_bank_q <= 1'b0;
+        end else begin
+            done_o <= 1'b0;
+            if (start) begin
+                running_q <= 1'b1;
+                error_o   <= 1'b0;
+            end else if (head & ~legal) begin
+                running_q <= 1'b0;
+                error_o   <= 1'b1;
+            end
+
+            if (issue) begin
+                unique case (op)
+                    OP_EXIT: begin
+                        running_q <= 1'b0;
+                        done_o    <= 1'b1;
+                    end
+                    OP_LOAD_WEIGHTS: begin
+                        mm_bank_q <= w_bank_q;
+                        w_bank_q  <= ~w_bank_q;
+                    end
+                    OP_MATMUL:  run_bank_q <= mm_bank_q;
+                    OP_DO_RELU: relu_en_o  <= q_head[5];
+                    default: ;
+                endcase
+            end
+        end
+    end
+
+    // ── Scalar parameter loads ──────────────────────────────────────────────
+    // P_REQ:  request the read transaction until memory_transaction accepts it
+    // P_READ: stream it into load_scalar_data, until the transaction is done
+    // P_TAIL: one more cycle for the last word, rd_valid lags the read by one
+    logic [1:0] param_sel_q;    // 0 bias, 1 zp, 2 scale
+
+    assign sram_rw_mode_o    = 1'b0;
+    assign sram_load_valid_o = (param_q == P_REQ);
+    assign sram_rd_ready_o   = (param_q == P_READ);
+    assign load_bias_en_o    = param_busy & (param_sel_q == 2'd0);
+    assign load_zp_en_o      = param_busy & (param_sel_q == 2'd1);
+    assign load_scale_en_o   = param_busy & (param_sel_q == 2'd2);
+
+    always_ff @(posedge clk_i) begin
+        if (rst_i) begin
+            param_q       <= P_IDLE;
+            param_sel_q   <= '0;
+            sram_addr_o   <= '0;
+            sram_amount_o <= '0;
+        end else begin
+            unique case (param_q)
+                P_IDLE: if (issue & is_param) begin
+                    param_q       <= P_REQ;
+                    param_sel_q   <= (op == OP_LOAD_ZP) ? 2'd1 : (op == OP_LOAD_SCALE) ? 2'd2 : 2'd0;
+                    sram_addr_o   <= cmd_sram_addr_o;
+                    sram_amount_o <= cmd_len_o;
+                end
+                P_REQ:  if (sram_load_ready_i) param_q <= P_READ;
+                P_READ: if (sram_load_ready_i) param_q <= P_TAIL;
+                P_TAIL: param_q <= P_IDLE;
+                default: param_q <= P_IDLE;
+            endcase
+        end
+    end
+
+endmodule
@@ -0,0 +1,218 @@
+// DMA between DRAM (Wishbone, the m1/TPU port of wb_mux_2to1) and the
+// activation SRAM (the memory_transaction interface of activation_sram /
+// scalar_stage_sram). Executes the control unit's GMEM2SMEM and SMEM2GMEM
+// commands (dma_valid_o / dma_ready_i / dma_busy_i, operands on cmd_*).
+//
+// A command moves cmd_len_i 64-bit SRAM words, i.e. 2 * cmd_len_i 32-bit bus
+// words starting at byte address cmd_dram_addr_i. The 32-bit word at the lower
+// address is the low half of the SRAM word.
+//
+// The bus side is Wishbone B4 pipelined: one request per cycle while
+// wb_stall_i is low, acks come back in order some cycles later, and cyc stays
+// up until the last ack. CTI/BTE tag the requests as a linear incrementing
+// burst (010, 111 on the last) for slaves that use them.
+//   - GMEM2SMEM: up to 2**OUTSTANDING_LOG2 reads are in flight or buffered at
+//     once; a read is only issued when the read buffer has room for it and
+//     for every read still in flight, so acks are never lost. Pairs of words
+//     are packed and written to the SRAM, one SRAM word per two bus words.
+//   - SMEM2GMEM: SRAM words are read ahead into a small buffer and split
+//     into two pipelined bus writes each.
+// With a read latency L the bus stays busy every cycle as long as
+// 2**OUTSTANDING_LOG2 > L; with a classic slave (stall until ack) it degrades
+// to one request in flight.
+module dma #(
+    parameter int counter_width = 8,
+    parameter int address_width = 8,
+    parameter int OUTSTANDING_LOG2 = 3,
+    parameter int sram_read_latency = 1   // cycles from sram_rd_ready_o to the word on sram_rd_data_i
+) (
+    input clk_i,
+    input rst_i,
+
+    // command port, from the control unit
+    input  logic [31:0]              cmd_dram_addr_i,
+    input  logic [address_width-1:0] cmd_sram_addr_i,
+    input  logic [counter_width-1:0] cmd_len_i,        // SRAM words, 0 is a no-op
+    input  logic                     cmd_to_dram_i,    // 1 = SMEM2GMEM
+    input  logic                     cmd_valid_i,
+    output logic                     cmd_ready_o,
+    output logic                     busy_o,
+
+    // Wishbone B4 pipelined master
+    output logic [31:0] wb_adr_o,
+    output logic [31:0] wb_dat_o,
+    output logic        wb_we_o,
+    output logic        wb_stb_o,
+    output logic        wb_cyc_o,
+    output logic [3:0]  wb_sel_o,
+    output logic [2:0]  wb_cti_o,
+    output logic [1:0]  wb_bte_o,
+    input  logic [31:0] wb_dat_i,
+    input  logic        wb_ack_i,
+    input  logic        wb_stall_i,
+
+    // SRAM transaction interface (memory_transaction ports)
+    output logic [address_width-1:0] sram_addr_o,
+    output logic [counter_width-1:0] sram_amount_o,
+    output logic                     sram_rw_mode_o,   // 1 = write
+    output logic                     sram_load_valid_o,
+    input  logic                     sram_load_ready_i,
+    input  logic                     sram_downstream_ready_i,
+    output logic [63:0]              sram_wr_data_o,
+    output logic                     sram_wr_valid_o,
+    input  logic [63:0]              sram_rd_data_i,
+    output logic                     sram_rd_ready_o
+);
+
+    localparam int DEPTH = 1 << OUTSTANDING_LOG2;
+    localparam int W_LOG2 = $clog2(sram_read_latency + 2);
+    localparam int W_DEPTH = 1 << W_LOG2;
+
+    logic active_q, to_dram_q, sram_pending_q;
+    logic [31:0] adr_q;
+    logic [counter_width:0] req_left_q, ack_left_q;   // bus words
+    logic [counter_width-1:0] sram_left_q;              // SRAM words
+    logic half_q;                                       // next bus write is the high half
+
+    logic accept, sram_go, done;
+    logic wb_accept, wb_ack;
+
+    assign cmd_ready_o = ~active_q;
+    assign accept = cmd_valid_i & cmd_ready_o & (cmd_len_i != '0);
+    assign busy_o = active_q;
+
+    assign sram_load_valid_o = sram_pending_q;
+    assign sram_go = active_q & ~sram_pending_q & sram_downstream_ready_i & (sram_left_q != '0);
+
+    // ── DRAM -> SRAM ────────────────────────────────────────────────────────
+    logic [OUTSTANDING_LOG2:0] rd_credits_q;    // reads in flight plus words buffered
+    logic [31:0] r_data, lo_q;
+    logic r_valid, r_pop, lo_valid_q;
+
+    fifo #(
+        .DEPTH_LOG2_P(OUTSTANDING_LOG2),
+        .WIDTH_P     (32)
+    ) read_buffer (
+        .clk_i  (clk_i),
+        .rst_i  (rst_i),
+        .data_i (wb_dat_i),
+        .data_o (r_data),
+        .valid_i(wb_ack & ~to_dram_q),
+        .ready_i(r_pop),
+        .valid_o(r_valid),
+        .ready_o()
+    );
+
+    assign sram_wr_data_o  = {r_data, lo_q};
+    assign sram_wr_valid_o = ~to_dram_q & sram_go & lo_valid_q & r_valid;
+    assign r_pop = ~to_dram_q & r_valid & (~lo_valid_q | sram_wr_valid_o);
+
+    always_ff @(posedge clk_i) begin
+        if (rst_i) begin
+            rd_credits_q <= '0;
+            lo_q <= '0;
+            lo_valid_q <= 1'b0;
+        end else begin
+            rd_credits_q <= rd_credits_q + (wb_accept & ~to_dram_q) - r_pop;
+            if (r_pop & ~lo_valid_q) begin
+                lo_q <= r_data;
+                lo_valid_q <= 1'b1;
+            end else if (sram_wr_valid_o) begin
+                lo_valid_q <= 1'b0;
+            end
+        end
+    end
+
+    // ── SRAM -> DRAM ────────────────────────────────────────────────────────
+    logic [W_LOG2:0] w_credits_q;               // SRAM reads in flight plus words buffered
+    logic [sram_read_latency-1:0] inflight_q;
+    logic [63:0] w_data;
+    logic w_valid, w_pop;
+
+    assign sram_rd_ready_o = to_dram_q & sram_go & (w_credits_q < W_DEPTH);
+    assign w_pop = to_dram_q & wb_accept & half_q;
+
+    fifo #(
+        .DEPTH_LOG2_P(W_LOG2),
+        .WIDTH_P     (64)
+    ) write_buffer (
+        .clk_i  (clk_i),
+        .rst_i  (rst_i),
+        .data_i (sram_rd_data_i),
+        .data_o (w_data),
+        .valid_i(inflight_q[sram_read_latency-1]),
+        .ready_i(w_pop),
+        .valid_o(w_valid),
+        .ready_o()
+    );
+
+    always_ff @(posedge clk_i) begin
+        if (rst_i) begin
+            w_credits_q <= '0;
+            inflight_q <= '0;
+        end else begin
+            w_credits_q <= w_credits_q + sram_rd_ready_o - w_pop;
+            inflight_q <= {inflight_q, sram_rd_ready_o};
+        end
+    end
+
+    // ── Wishbone ────────────────────────────────────────────────────────────
+    assign wb_cyc_o = active_q & (ack_left_q != '0);
+    assign wb_stb_o = active_q & (req_left_q != '0) & (to_dram_q ? w_valid : (rd_credits_q < DEPTH));
+    assign wb_we_o  = to_dram_q;
+    assign wb_sel_o = 4'hF;
+    assign wb_adr_o = adr_q;
+    assign wb_dat_o = half_q ? w_data[63:32] : w_data[31:0];
+    assign wb_cti_o = (req_left_q == 1) ? 3'b111 : 3'b010;
+    assign wb_bte_o = 2'b00;
+
+    assign wb_accept = wb_stb_o & ~wb_stall_i;
+    assign wb_ack    = wb_cyc_o & wb_ack_i;
+
+    // reading: done once the last word is in the SRAM; writing: once the last write is acked
+    assign done = active_q & ~sram_pending_q &
+                  (to_dram_q ? (ack_left_q == '0) : (sram_left_q == '0));
+
+    always_ff @(posedge clk_i) begin
+        if (rst_i) begin
+            active_q       <= 1'b0;
+            to_dram_q      <= 1'b0;
+            sram_pending_q <= 1'b0;
+            adr_q          <= '0;
+            req_left_q     <= '0;
+            ack_left_q     <= '0;
+            sram_left_q    <= '0;
+            half_q         <= 1'b0;
+            sram_addr_o    <= '0;
+            sram_amount_o  <= '0;
+            sram_rw_mode_o <= 1'b0;
+        end else if (accept) begin
+            active_q       <= 1'b1;
+            to_dram_q      <= cmd_to_dram_i;
+            sram_pending_q <= 1'b1;
+            adr_q          <= cmd_dram_addr_i;
+            req_left_q     <= {cmd_len_i, 1'b0};
+            ack_left_q     <= {cmd_len_i, 1'b0};
+            sram_left_q    <= cmd_len_i;
+            half_q         <= 1'b0;
+            sram_addr_o    <= cmd_sram_addr_i;
+            sram_amount_o  <= cmd_len_i;
+            sram_rw_mode_o <= ~cmd_to_dram_i;
+        end else begin
+            if (sram_load_valid_o & sram_load_ready_i)
+                sram_pending_q <= 1'b0;
+            if (wb_accept) begin
+                adr_q      <= adr_q + 32'd4;
+                req_left_q <= req_left_q - 1'b1;
+                half_q     <= ~half_q;
+            end
+            if (wb_ack)
+                ack_left_q <= ack_left_q - 1'b1;
+            if (sram_wr_valid_o | sram_rd_ready_o)
+                sram_left_q <= sram_left_q - 1'b1;
+            if (done)
+                active_q <= 1'b0;
+        end
+    end
+
+endmodule
@@ -0,0 +1,111 @@
+// Performance counters, read by the host over the SPI bridge (Wishbone B4
+// classic slave, behind the CSR window of wb_mux_2to1).
+//
+//   0x00 CTRL          bit 0: counting enabled (reset 1), writing 0 freezes
+//                      all counters so a set can be read consistently
+//                      bit 1: write 1 to clear all counters (reads 0)
+//   0x04 CYCLES        cycles counted
+//   0x08 ARRAY_BUSY    cycles the systolic array is computing
+//   0x0C WEIGHT_LOAD   cycles weights are shifted into the array
+//   0x10 SCALAR_STALL  cycles the scalar pipe output is valid && !ready
+//   0x14 SRAM_READS    SRAM read accesses
+//   0x18 SRAM_WRITES   SRAM write accesses
+//   0x1C WB_WAIT       cycles the TPU's Wishbone master (B4 pipelined) waits
+//                      for an ack: in a bus cycle, with a request stalled or
+//                      outstanding, and no ack
+//
+// Counters wrap at 2**32; sim/perf_csr.py decodes them into utilization.
+module perf_counters (
+    input clk_i,
+    input rst_i,
+
+    // Wishbone slave
+    input  logic [31:0] wb_adr_i,
+    input  logic [31:0] wb_dat_i,
+    input  logic        wb_we_i,
+    input  logic        wb_stb_i,
+    input  logic        wb_cyc_i,
+    input  logic [3:0]  wb_sel_i,
+    output logic [31:0] wb_dat_o,
+    output logic        wb_ack_o,
+
+    // events, one per cycle
+    input logic array_busy_i,
+    input logic weight_load_i,
+    input logic scalar_valid_i,
+    input logic scalar_ready_i,
+    input logic sram_rd_i,
+    input logic sram_wr_i,
+    input logic tpu_wb_cyc_i,
+    input logic tpu_wb_stb_i,
+    input logic tpu_wb_stall_i,
+    input logic tpu_wb_ack_i
+);
+
+    localparam int NUM = 7;
+
+    localparam logic [2:0] CTRL = 3'd0;
+    // more requests than any m1 master keeps in flight
+    localparam int OUT_W = 8;
+
+    logic        enable_q;
+    // counter i is at 0x04 * (i + 1)
+    logic [31:0] count_q [NUM];
+    logic        event_w [NUM];
+
+    // a pipelined master drops stb once its request is taken, so the requests
+    // still waiting for their ack are counted here. Dropping cyc ends them all
+    logic [OUT_W-1:0] outstanding_q;
+    logic             wb_take;
+    assign wb_take = tpu_wb_cyc_i & tpu_wb_stb_i & ~tpu_wb_stall_i;
+
+    always_ff @(posedge clk_i) begin
+        if (rst_i || !tpu_wb_cyc_i)
+            outstanding_q <= '0;
+        else
+            outstanding_q <= outstanding_q + OUT_W'(wb_take) - OUT_W'(tpu_wb_ack_i);
+    end
+
+    assign event_w[0] = 1'b1;
+    assign event_w[1] = array_busy_i;
+    assign event_w[2] = weight_load_i;
+    assign event_w[3] = scalar_valid_i & ~scalar_ready_i;
+    assign event_w[4] = sram_rd_i;
+    assign event_w[5] = sram_wr_i;
+    assign event_w[6] = tpu_wb_cyc_i & (tpu_wb_stb_i | (outstanding_q != '0)) & ~tpu_wb_ack_i;
+
+    logic [2:0] reg_sel;
+    logic       access, ctrl_write, clear;
+    assign reg_sel    = wb_adr_i[4:2];
+    assign access     = wb_cyc_i & wb_stb_i & ~wb_ack_o;
+    assign ctrl_write = access & wb_we_i & wb_sel_i[0] & (reg_sel == CTRL);
+    assign clear      = ctrl_write & wb_dat_i[1];
+
+    genvar i;
+    generate
+        for (i = 0; i < NUM; i++) begin : gen_count
+            always_ff @(posedge clk_i) begin
+                if (rst_i || clear)
+                    count_q[i] <= '0;
+                else if (enable_q && event_w[i])
+                    count_q[i] <= count_q[i] + 1'b1;
+            end
+        end
+    endgenerate
+
+    always_ff @(posedge clk_i) begin
+        if (rst_i) begin
+            enable_q <= 1'b1;
+            wb_ack_o <= 1'b0;
+            wb_dat_o <= '0;
+        end else begin
+            // one wait state, single cycle ack
+            wb_ack_o <= access;
+            if (ctrl_write)
+                enable_q <= wb_dat_i[0];
+            if (access & ~wb_we_i)
+                wb_dat_o <= (reg_sel == CTRL) ? {31'b0, enable_q} : count_q[reg_sel - 1'b1];
+        end
+    end
+
+endmodule
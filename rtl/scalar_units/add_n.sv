@@ -1,6 +1,8 @@
 module add_n
     #(parameter N = 8
-    , parameter width_p = 32)
+    , parameter width_p = 32
+    // 1: skid-buffered output stage with registered data_ready_o
+    , parameter skid_p = 0)
     (
     input logic clk_i,
     input logic rst_i,
@@ -24,7 +26,8 @@ module add_n
 
     elastic
         #(.width_p(width_p),
-        .depth_p(N))
+        .depth_p(N),
+        .skid_p(skid_p))
     add_elastic
         (.clk_i(clk_i)
         ,.rst_i(rst_i)
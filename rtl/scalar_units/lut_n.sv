@@ -0,0 +1,49 @@
+// int8 -> int8 lookup table per lane, for activations like sigmoid or tanh
+// applied to the quantized output. The 256-entry table is indexed by the
+// input byte (entry 0..127 for inputs 0..127, 128..255 for -128..-1) and is
+// shared by all lanes. lut_en_i = 0 bypasses the table; the stage still
+// registers, so the pipe latency does not depend on it.
+module lut_n
+    #(parameter N = 8
+    , parameter width_p = 8
+    // 1: skid-buffered output stage with registered data_ready_o
+    , parameter skid_p = 0)
+    (
+    input logic clk_i,
+    input logic rst_i,
+
+    input logic signed [width_p-1:0] table_i [(1 << width_p)-1:0],
+    input logic lut_en_i,
+
+    input logic data_valid_i,
+    input logic data_ready_i,
+    input logic signed [width_p-1:0] data_i [N-1:0],
+    output logic data_valid_o,
+    output logic data_ready_o,
+    output logic signed [width_p-1:0] data_o [N-1:0]
+);
+
+    logic signed [width_p-1:0] data_r [N-1:0];
+    genvar i;
+    generate
+        for (i = 0; i < N; i++) begin
+            assign data_r[i] = lut_en_i ? table_i[$unsigned(data_i[i])] : data_i[i];
+        end
+    endgenerate
+
+    elastic
+        #(.width_p(width_p),
+        .depth_p(N),
+        .skid_p(skid_p))
+    lut_elastic
+        (.clk_i(clk_i)
+        ,.rst_i(rst_i)
+        ,.data_i(data_r)
+        ,.valid_i(data_valid_i)
+        ,.ready_o(data_ready_o)
+        ,.valid_o(data_valid_o)
+        ,.ready_i(data_ready_i)
+        ,.data_o(data_o)
+    );
+
+endmodule
@@ -1,6 +1,8 @@
 module relu_n
     #(parameter N = 8,
-     parameter width_p = 32
+     parameter width_p = 32,
+     // 1: skid-buffered output stage with registered data_ready_o
+     parameter skid_p = 0
     )(
     input logic clk_i,
     input logic rst_i,
@@ -23,27 +25,19 @@ module relu_n
         end
     endgenerate
 
-    // elastic
-    assign data_ready_o = ~data_valid_o | data_ready_i;
-
-    generate
-        for (i = 0; i < N; i++) begin : gen_reg
-            always_ff @(posedge clk_i) begin
-                if (rst_i) begin
-                    data_o[i] <= '0;
-                end else if (data_ready_o) begin
-                    data_o[i] <= data_d[i];
-                end
-            end
-        end
-    endgenerate
-
-    always_ff @(posedge clk_i) begin
-        if (rst_i) begin
-            data_valid_o <= 1'b0;
-        end else if (data_ready_o) begin
-            data_valid_o <= data_valid_i;
-        end
-    end
+    elastic
+        #(.width_p(width_p),
+        .depth_p(N),
+        .skid_p(skid_p))
+    relu_elastic
+        (.clk_i(clk_i)
+        ,.rst_i(rst_i)
+        ,.data_i(data_d)
+        ,.valid_i(data_valid_i)
+        ,.ready_o(data_ready_o)
+        ,.valid_o(data_valid_o)
+        ,.ready_i(data_ready_i)
+        ,.data_o(data_o)
+    );
 
 endmodule
@@ -0,0 +1,210 @@
+// Deskew + P parallel scalar pipes behind the systolic array.
+//
+// The array's outputs are diagonally skewed: column c of output row m shows
+// up on psum_i[c] one cycle after column c-1. A tri_shift delays column c by
+// N - c cycles, like loadsysray's output stage, so every row comes out whole
+// with its column 0 valid bit. Rows are dealt round robin to P scalar_pipes
+// and collected in the same order, so data_o keeps the array's row order.
+// All pipes share one set of parameter loaders (and activation table).
+//
+// The array cannot stall, so the input has no ready. A row whose pipe cannot
+// take it is dropped and sets the sticky overrun_o. A pipe takes at most one
+// row per cycle, so more pipes do not raise the peak rate; they hold the rows
+// a slower writeback has not taken yet. sim/scalar_bottleneck.py finds, per N
+// and P, whether the array or the post-processing sets the layer rate.
+module scalar_par #(
+    parameter int N = 8,
+    parameter int P = 2,
+    parameter int PSUM_W = 32,
+    parameter int M0_W = 32,
+    parameter int FIXED_SHIFT = 16,
+    parameter int BUS_W = 64,
+    parameter int SKID_MASK = 0,
+    // 0 leaves out the activation table, its loader and its pipeline stage
+    parameter int HAS_LUT = 1,
+    parameter int SEL_W = (P > 1) ? $clog2(P) : 1
+)(
+    input logic clk_i,
+    input logic rst_i,
+
+    // param loading, shared by all pipes (see scalar_stage)
+    input logic[BUS_W-1:0] read_bus_i,
+    input logic load_valid_i,
+    input logic load_bias_en_i,
+    input logic load_zp_en_i,
+    input logic load_scale_en_i,
+    input logic load_lut_en_i,
+    input logic lut_en_i,
+
+    // skewed array output (sysray_nxn psum_out_n_o / psum_out_valid_n_o)
+    input logic signed [PSUM_W-1:0] psum_i [N-1:0],
+    input logic psum_valid_i [N-1:0],
+    output logic overrun_o,
+
+    // quantized rows, in array order
+    output logic signed [7:0] data_o [N-1:0],
+    output logic data_valid_o,
+    input  logic data_ready_i
+);
+
+    localparam int LANES = BUS_W / PSUM_W;
+    localparam int DEPTH = N / LANES;
+
+    logic signed [PSUM_W-1:0] bias_w[N-1:0];
+    logic signed [PSUM_W-1:0] zp_w[N-1:0];
+    logic signed [M0_W-1:0] scale_w[N-1:0];
+    logic signed [7:0] lut_w[255:0];
+
+    load_scalar_data #(
+        .scalar_data_width_p(PSUM_W),
+        .lane_depth_p       (DEPTH),
+        .read_bus_width     (BUS_W)
+    ) u_load_bias (
+        .clk_i          (clk_i),
+        .reset_i        (rst_i),
+        .read_bus       (read_bus_i),
+        .load_valid_i   (load_valid_i),
+        .load_enable_i  (load_bias_en_i),
+        .scalar_values_o(bias_w)
+    );
+
+    load_scalar_data #(
+        .scalar_data_width_p(PSUM_W),
+        .lane_depth_p       (DEPTH),
+        .read_bus_width     (BUS_W)
+    ) u_load_zp (
+        .clk_i          (clk_i),
+        .reset_i        (rst_i),
+        .read_bus       (read_bus_i),
+        .load_valid_i   (load_valid_i),
+        .load_enable_i  (load_zp_en_i),
+        .scalar_values_o(zp_w)
+    );
+
+    load_scalar_data #(
+        .scalar_data_width_p(M0_W),
+        .lane_depth_p       (DEPTH),
+        .read_bus_width     (BUS_W)
+    ) u_load_scale (
+        .clk_i          (clk_i),
+        .reset_i        (rst_i),
+        .read_bus       (read_bus_i),
+        .load_valid_i   (load_valid_i),
+        .load_enable_i  (load_scale_en_i),
+        .scalar_values_o(scale_w)
+    );
+
+    // the table loader only exists with the LUT stage
+    generate
+        if (HAS_LUT) begin : gen_load_lut
+            load_scalar_data #(
+                .scalar_data_width_p(8),
+                .lane_depth_p       (256 / (BUS_W / 8)),
+                .read_bus_width     (BUS_W)
+            ) u_load_lut (
+                .clk_i          (clk_i),
+                .reset_i        (rst_i),
+                .read_bus       (read_bus_i),
+                .load_valid_i   (load_valid_i),
+                .load_enable_i  (load_lut_en_i),
+                .scalar_values_o(lut_w)
+            );
+        end else begin : gen_no_load_lut
+            for (genvar e = 0; e < 256; e++) begin : gen_tie
+                assign lut_w[e] = '0;
+            end
+        end
+    endgenerate
+
+    // deskew: lane i carries column N-1-i and is delayed i+1 cycles
+    logic [PSUM_W:0] skewed [N];
+    logic [PSUM_W:0] aligned [N];
+    logic signed [PSUM_W-1:0] row [N-1:0];
+    logic row_valid;
+
+    genvar i, p;
+    generate
+        for (i = 0; i < N; i++) begin : gen_deskew
+            assign skewed[i] = {psum_valid_i[N-1-i], psum_i[N-1-i]};
+            assign row[N-1-i] = aligned[i][PSUM_W-1:0];
+        end
+    endgenerate
+    assign row_valid = aligned[N-1][PSUM_W];
+
+    tri_shift #(
+        .N(N),
+        .DATA_W(PSUM_W+1)
+    ) u_deskew (
+        .clk(clk_i),
+        .rst(rst_i),
+        .data_i(skewed),
+        .enable_i(1'b1),
+        .data_o(aligned)
+    );
+
+    // round robin dispatch and in-order collection
+    logic [SEL_W-1:0] wr_sel_q, rd_sel_q;
+    logic pipe_valid_i [P];
+    logic pipe_ready_o [P];
+    logic signed [7:0] pipe_data [P][N-1:0];
+    logic pipe_valid_o [P];
+    logic pipe_ready_i [P];
+
+    generate
+        for (p = 0; p < P; p++) begin : gen_pipe
+            assign pipe_valid_i[p] = row_valid & (wr_sel_q == SEL_W'(p));
+            assign pipe_ready_i[p] = data_ready_i & (rd_sel_q == SEL_W'(p));
+
+            scalar_pipe #(
+                .N          (N),
+                .PSUM_W     (PSUM_W),
+                .M0_W       (M0_W),
+                .FIXED_SHIFT(FIXED_SHIFT),
+                .SKID_MASK  (SKID_MASK),
+                .HAS_LUT    (HAS_LUT)
+            ) u_scalar_pipe (
+                .clk_i       (clk_i),
+                .rst_i       (rst_i),
+                .data_i      (row),
+                .data_valid_i(pipe_valid_i[p]),
+                .data_ready_o(pipe_ready_o[p]),
+
+                .bias_i      (bias_w),
+                .zero_point_i(zp_w),
+                .scale_i     (scale_w),
+                .lut_i       (lut_w),
+                .lut_en_i    (lut_en_i),
+
+                .data_o      (pipe_data[p]),
+                .data_valid_o(pipe_valid_o[p]),
+                .data_ready_i(pipe_ready_i[p])
+            );
+        end
+
+        for (i = 0; i < N; i++) begin : gen_out
+            assign data_o[i] = pipe_data[rd_sel_q][i];
+        end
+    endgenerate
+
+    assign data_valid_o = pipe_valid_o[rd_sel_q];
+
+    logic row_taken;
+    assign row_taken = pipe_ready_o[wr_sel_q];
+
+    always_ff @(posedge clk_i) begin
+        if (rst_i) begin
+            wr_sel_q <= '0;
+            rd_sel_q <= '0;
+            overrun_o <= 1'b0;
+        end else begin
+            // a dropped row keeps its slot, so the next row goes to the same pipe
+            if (row_valid & row_taken)
+                wr_sel_q <= (wr_sel_q == SEL_W'(P - 1)) ? '0 : wr_sel_q + 1'b1;
+            if (row_valid & ~row_taken)
+                overrun_o <= 1'b1;
+            if (data_valid_o & data_ready_i)
+                rd_sel_q <= (rd_sel_q == SEL_W'(P - 1)) ? '0 : rd_sel_q + 1'b1;
+        end
+    end
+
+endmodule
@@ -2,7 +2,13 @@ module scalar_pipe #(
     parameter int N = 8,
     parameter int PSUM_W = 32,
     parameter int M0_W = 32,
-    parameter int FIXED_SHIFT  = 16
+    parameter int FIXED_SHIFT  = 16,
+    // bit s set: stage s (0 bias, 1 relu, 2 sub_zp, 3 scale, 4 lut) is a skid buffer
+    // with a registered ready, which cuts the combinational ready chain
+    parameter int SKID_MASK = 0,
+    // 0: no activation table stage at all (no 256 x 8 table, no pipeline
+    // cycle); lut_i and lut_en_i are then ignored
+    parameter int HAS_LUT = 1
 )(
     input logic clk_i,
     input logic rst_i,
@@ -17,13 +23,17 @@ module scalar_pipe #(
     input logic signed [PSUM_W-1:0] zero_point_i [N-1:0],
     input logic signed [M0_W-1:0] scale_i [N-1:0],
 
+    // activation table applied to the quantized value, bypassed when lut_en_i = 0 (HAS_LUT only)
+    input logic signed [7:0] lut_i [255:0],
+    input logic lut_en_i,
+
     // quantized 8-bit output
     output logic signed [7:0] data_o [N-1:0],
     output logic data_valid_o,
     input logic data_ready_i
 );
 
-    // bias -> relu -> sub_zp -> scale
+    // bias -> relu -> sub_zp -> scale -> lut
 
     // all stages use elastic ready/valid handshaking. sub-zp reuses add_n
     
@@ -42,6 +52,11 @@ module scalar_pipe #(
     logic zp_valid;
     logic zp_ready;
 
+    // scale -> lut
+    logic signed [7:0] q_data [N-1:0];
+    logic q_valid;
+    logic q_ready;
+
     // // negate zero points for subtraction via add_n
     // logic signed [PSUM_W-1:0] neg_zp [N-1:0];
 
@@ -53,7 +68,8 @@ module scalar_pipe #(
 
     add_n #(
         .N       (N),
-        .width_p (PSUM_W)
+        .width_p (PSUM_W),
+        .skid_p  ((SKID_MASK >> 0) & 1)
     ) u_add_bias (
         .clk_i        (clk_i),
         .rst_i        (rst_i),
@@ -70,7 +86,8 @@ module scalar_pipe #(
 
     relu_n #(
         .N       (N),
-        .width_p (PSUM_W)
+        .width_p (PSUM_W),
+        .skid_p  ((SKID_MASK >> 1) & 1)
     ) u_relu (
         .clk_i        (clk_i),
         .rst_i        (rst_i),
@@ -86,7 +103,8 @@ module scalar_pipe #(
 
     add_n #(
         .N       (N),
-        .width_p (PSUM_W)
+        .width_p (PSUM_W),
+        .skid_p  ((SKID_MASK >> 2) & 1)
     ) u_sub_zp (
         .clk_i        (clk_i),
         .rst_i        (rst_i),
@@ -105,19 +123,46 @@ module scalar_pipe #(
         .N          (N),
         .ACC_WIDTH_P (PSUM_W),
         .M0_WIDTH_P  (M0_W),
-        .FIXED_SHIFT_P(FIXED_SHIFT)
+        .FIXED_SHIFT_P(FIXED_SHIFT),
+        .skid_p      ((SKID_MASK >> 3) & 1)
     ) u_scale_n (
         .clk_i       (clk_i),
         .rst_i       (rst_i),
         .m0_i        (scale_i),
         .data_valid_i(zp_valid),
-        .data_ready_i(data_ready_i),
+        .data_ready_i(q_ready),
         .data_i      (zp_data),
-        .data_valid_o(data_valid_o),
+        .data_valid_o(q_valid),
         .data_ready_o(zp_ready),
-        .data_o      (data_o)
+        .data_o      (q_data)
     );
 
+    // s5: activation lookup table (sigmoid, tanh, ...) or bypass
+
+    generate
+        if (HAS_LUT) begin : gen_lut
+            lut_n #(
+                .N     (N),
+                .skid_p((SKID_MASK >> 4) & 1)
+            ) u_lut (
+                .clk_i       (clk_i),
+                .rst_i       (rst_i),
+                .table_i     (lut_i),
+                .lut_en_i    (lut_en_i),
+                .data_valid_i(q_valid),
+                .data_ready_i(data_ready_i),
+                .data_i      (q_data),
+                .data_valid_o(data_valid_o),
+                .data_ready_o(q_ready),
+                .data_o      (data_o)
+            );
+        end else begin : gen_no_lut
+            assign data_o       = q_data;
+            assign data_valid_o = q_valid;
+            assign q_ready      = data_ready_i;
+        end
+    endgenerate
+
     // logic signed [7:0] scale_comb [N-1:0];
 
     // for (genvar i = 0; i < N; i++) begin : gen_qmul
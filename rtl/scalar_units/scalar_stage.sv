@@ -3,7 +3,10 @@ module scalar_stage #(
     parameter int PSUM_W = 32,
     parameter int M0_W = 32,
     parameter int FIXED_SHIFT = 16,
-    parameter int BUS_W = 64
+    parameter int BUS_W = 64,
+    parameter int SKID_MASK = 0,
+    // 0 leaves out the activation table, its loader and its pipeline stage
+    parameter int HAS_LUT = 1
 )(
     input logic clk_i,
     input logic rst_i,
@@ -14,6 +17,10 @@ module scalar_stage #(
     input logic load_bias_en_i,
     input logic load_zp_en_i,
     input logic load_scale_en_i,
+    input logic load_lut_en_i,
+
+    // apply the loaded activation table (sigmoid, tanh, ...) to the output
+    input logic lut_en_i,
 
     // dat pipeline input (from systolic array)
     input logic signed [PSUM_W-1:0] data_i[N-1:0],
@@ -33,6 +40,7 @@ module scalar_stage #(
     logic signed [PSUM_W-1:0] bias_w[N-1:0];
     logic signed [PSUM_W-1:0] zp_w[N-1:0];
     logic signed [M0_W-1:0] scale_w[N-1:0];
+    logic signed [7:0] lut_w[255:0];
 
     load_scalar_data #(
         .scalar_data_width_p(PSUM_W),
@@ -73,11 +81,36 @@ module scalar_stage #(
         .scalar_values_o(scale_w)
     );
 
+    // the table loader only exists with the LUT stage
+    generate
+        if (HAS_LUT) begin : gen_load_lut
+            // 256 int8 entries, BUS_W/8 per bus word, entry 0 in the low byte of the first word
+            load_scalar_data #(
+                .scalar_data_width_p(8),
+                .lane_depth_p       (256 / (BUS_W / 8)),
+                .read_bus_width     (BUS_W)
+            ) u_load_lut (
+                .clk_i          (clk_i),
+                .reset_i        (rst_i),
+                .read_bus       (read_bus_i),
+                .load_valid_i   (load_valid_i),
+                .load_enable_i  (load_lut_en_i),
+                .scalar_values_o(lut_w)
+            );
+        end else begin : gen_no_load_lut
+            for (genvar e = 0; e < 256; e++) begin : gen_tie
+                assign lut_w[e] = '0;
+            end
+        end
+    endgenerate
+
     scalar_pipe #(
         .N          (N),
         .PSUM_W     (PSUM_W),
         .M0_W       (M0_W),
-        .FIXED_SHIFT(FIXED_SHIFT)
+        .FIXED_SHIFT(FIXED_SHIFT),
+        .SKID_MASK  (SKID_MASK),
+        .HAS_LUT    (HAS_LUT)
     ) u_scalar_pipe (
         .clk_i       (clk_i),
         .rst_i       (rst_i),
@@ -88,6 +121,8 @@ module scalar_stage #(
         .bias_i      (bias_w),
         .zero_point_i(zp_w),
         .scale_i     (scale_w),
+        .lut_i       (lut_w),
+        .lut_en_i    (lut_en_i),
         
         .data_o      (data_o),
         .data_valid_o(data_valid_o),
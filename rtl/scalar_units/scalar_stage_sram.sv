@@ -13,6 +13,8 @@ module scalar_stage_sram #(
     input load_bias_en_i,
     input load_zp_en_i,
     input load_scale_en_i,
+    input load_lut_en_i,
+    input lut_en_i,
 
     input signed [DATA_W-1:0] data_i [N-1:0],
     input  data_valid_i,
@@ -93,6 +95,8 @@ module scalar_stage_sram #(
         .load_bias_en_i(load_bias_en_i),
         .load_zp_en_i(load_zp_en_i),
         .load_scale_en_i(load_scale_en_i),
+        .load_lut_en_i(load_lut_en_i),
+        .lut_en_i(lut_en_i),
 
         .data_i(data_i),
         .data_valid_i(data_valid_i),
@@ -4,7 +4,9 @@ module scale_n
     , parameter M0_WIDTH_P = 32
     // hardcoded for 8-bit output, but can be parameterized if needed
     , parameter Q_WIDTH_P = 8
-    , parameter FIXED_SHIFT_P = 16)
+    , parameter FIXED_SHIFT_P = 16
+    // 1: skid-buffered output stage with registered data_ready_o
+    , parameter skid_p = 0)
     (
     input logic clk_i,
     input logic rst_i,
@@ -36,7 +38,8 @@ module scale_n
 
     elastic
         #(.width_p(Q_WIDTH_P),
-        .depth_p(N))
+        .depth_p(N),
+        .skid_p(skid_p))
     add_elastic
         (.clk_i(clk_i)
         ,.rst_i(rst_i)
@@ -0,0 +1,115 @@
+// Pipelined burst reads from a synchronous SRAM macro (sram_8x256).
+//
+// memory_transaction hands out one address per downstream_ready_i and leaves
+// the read data timing to the consumer. This module instead issues one read
+// per cycle and returns the words on a valid/ready stream, so the macro stays
+// busy every cycle while the consumer keeps up:
+//   - a read is only issued when the skid buffer has room for it and for
+//     every read still in flight, so backpressure never loses a word and
+//     rd_ready_i has no combinational path to the SRAM;
+//   - the next transaction is accepted in the cycle the current one issues
+//     its last address, so back-to-back transactions have no idle cycle.
+// With skid_log2 = 2 and a read latency of 1 cycle the buffer covers the
+// round trip and the output streams one word every cycle rd_ready_i is high.
+module burst_read #(
+    parameter counter_width = 8,
+    parameter address_width = 8,
+    parameter data_width = 64,
+    parameter read_latency = 1,   // cycles from sram_en_o/sram_addr_o to the word on sram_rd_data_i
+    parameter skid_log2 = 2       // skid buffer depth, at least read_latency + 2 words for full rate
+)(
+    input clk_i,
+    input rst_i,
+
+    // transaction requests
+    input  [address_width-1:0] addr_i,
+    input  [counter_width-1:0] transaction_amount_i,
+    input  load_valid_i,
+    output load_ready_o,
+    output busy_o,
+
+    // IO to SRAM module (read port)
+    output logic [address_width-1:0] sram_addr_o,
+    output logic sram_en_o,
+    input  [data_width-1:0] sram_rd_data_i,
+
+    // read data stream
+    output [data_width-1:0] rd_data_o,
+    output rd_last_o,               // last word of a transaction
+    output rd_valid_o,
+    input  rd_ready_i
+);
+
+    localparam int DEPTH = 1 << skid_log2;
+
+    logic [address_width-1:0] addr_q;
+    logic [counter_width-1:0] remaining_q;
+    logic active_q;
+
+    // words in flight in the SRAM plus words in the skid buffer
+    logic [skid_log2:0] credits_used_q;
+    logic issue, last_issue, accept, pop;
+
+    // one bit per SRAM pipeline stage: a read issued that many cycles ago, and whether it ends its transaction
+    logic [read_latency-1:0] inflight_q, inflight_last_q;
+
+    logic [data_width:0] buf_data;
+
+    assign issue = active_q & (credits_used_q < DEPTH);
+    assign last_issue = issue & (remaining_q == 1);
+    assign load_ready_o = ~active_q | last_issue;
+    assign accept = load_valid_i & load_ready_o & (transaction_amount_i != '0);
+    assign pop = rd_valid_o & rd_ready_i;
+
+    assign sram_en_o = issue;
+    assign sram_addr_o = addr_q;
+    assign busy_o = active_q | (credits_used_q != '0);
+
+    always_ff @( posedge clk_i ) begin
+        if (rst_i) begin
+            addr_q <= '0;
+            remaining_q <= '0;
+            active_q <= '0;
+        end else if (accept) begin
+            addr_q <= addr_i;
+            remaining_q <= transaction_amount_i;
+            active_q <= 1'b1;
+        end else if (issue) begin
+            addr_q <= addr_q + 1'b1;
+            remaining_q <= remaining_q - 1'b1;
+            if (last_issue)
+                active_q <= 1'b0;
+        end
+    end
+
+    always_ff @( posedge clk_i ) begin
+        if (rst_i) begin
+            credits_used_q <= '0;
+            inflight_q <= '0;
+            inflight_last_q <= '0;
+        end else begin
+            credits_used_q <= credits_used_q + issue - pop;
+            // shift in at bit 0, the read leaving the SRAM falls off the top
+            inflight_q <= {inflight_q, issue};
+            inflight_last_q <= {inflight_last_q, last_issue};
+        end
+    end
+
+    // the skid buffer; credits guarantee it always has room for a word coming out of the SRAM
+    fifo #(
+        .DEPTH_LOG2_P(skid_log2),
+        .WIDTH_P(data_width + 1)
+    ) skid_buffer (
+        .clk_i(clk_i),
+        .rst_i(rst_i),
+        .data_i({inflight_last_q[read_latency-1], sram_rd_data_i}),
+        .data_o(buf_data),
+        .valid_i(inflight_q[read_latency-1]),
+        .ready_i(rd_ready_i),
+        .valid_o(rd_valid_o),
+        .ready_o()
+    );
+
+    assign {rd_last_o, rd_data_o} = buf_data;
+
+endmodule
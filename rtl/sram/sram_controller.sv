@@ -1,61 +1,99 @@
-module sram_mux #(
+// Banked SRAM controller: eight sram_8x256 blocks, address interleaved so
+// consecutive words live in consecutive banks (bank = addr[2:0], row =
+// addr[10:3]).
+//
+// A read port and a write port are served in the same cycle whenever they hit
+// different banks. When both want the same bank, one of them stalls for a
+// cycle (ready low); the winner alternates between the ports so neither
+// starves, and every such cycle counts in conflict_stalls_o.
+//
+// Reads have no response backpressure: a read accepted in cycle t returns its
+// word on rd_data_o with rd_valid_o in cycle t+1, like the macro itself.
+// sim/bank_conflicts.py models the arbitration and predicts the cycles and
+// conflicts of an access pattern.
+module sram_controller #(
     parameter data_width = 64,
-    parameter addr_width = 8
+    parameter bank_log2 = 3,
+    parameter row_width = 8,
+    parameter addr_width = bank_log2 + row_width
 ) (
     input clk_i,
     input rst_i,
 
-    // IO to SRAM module
-    output [addr_width-1:0] sram_addr_o,
-    output [data_width-1:0] sram_wr_data_o,
-    output sram_en_o,
-    output sram_rw_mode_o,
-    input [data_width-1:0] sram_rd_data_i,
+    // read port (activation stream)
+    input  rd_req_valid_i,
+    output rd_req_ready_o,
+    input  [addr_width-1:0] rd_addr_i,
+    output logic rd_valid_o,
+    output [data_width-1:0] rd_data_o,
 
-    // IO to mem_transaction module in write mode
-    input wr_valid_i,
+    // write port (scalar pipe write-back)
+    input  wr_valid_i,
     output wr_ready_o,
-    input [addr_wdith-1:0] wr_addr_i,
-    input [data_width-1:0] write_buffer_i,
-
-    // IO to mem_transaction module in read mode
-    input  rd_ready_i,
-    output rd_valid_o,
-    input  [addr_wdith-1:0] rd_addr_i,
-    output [data_width-1:0] read_buffer_o
+    input  [addr_width-1:0] wr_addr_i,
+    input  [data_width-1:0] wr_data_i,
+
+    output logic [31:0] conflict_stalls_o
 );
 
-    logic rw_mode;
-    logic in_use_q, in_use_d;
+    localparam int BANKS = 1 << bank_log2;
+
+    logic [bank_log2-1:0] rd_bank, wr_bank, rd_bank_q;
+    logic [row_width-1:0] rd_row, wr_row;
+    assign rd_bank = rd_addr_i[bank_log2-1:0];
+    assign wr_bank = wr_addr_i[bank_log2-1:0];
+    assign rd_row  = rd_addr_i[addr_width-1:bank_log2];
+    assign wr_row  = wr_addr_i[addr_width-1:bank_log2];
+
+    // on a conflict the port named by write_first_q wins, then the other one gets the next
+    logic conflict, write_first_q;
+    assign conflict = rd_req_valid_i & wr_valid_i & (rd_bank == wr_bank);
+    assign rd_req_ready_o = ~conflict | ~write_first_q;
+    assign wr_ready_o     = ~conflict | write_first_q;
+
+    logic rd_fire, wr_fire;
+    assign rd_fire = rd_req_valid_i & rd_req_ready_o;
+    assign wr_fire = wr_valid_i & wr_ready_o;
 
-    assign unified_read_buffer_o = sram_rd_data_i;
-    assign sram_wr_data_o = unified_write_buffer_i;
-    assign sram_en_o = '1;
-    assign sram_rw_mode_o = rw_mode;
+    logic [data_width-1:0] bank_rd_data [BANKS];
 
-    always_comb begin
-        in_use_d = in_use_q;
-        if(wr_valid_i) begin
-            in_use_d = '1;
+    genvar b;
+    generate
+        for (b = 0; b < BANKS; b++) begin : bank_block
+            logic rd_hit, wr_hit;
+            assign rd_hit = rd_fire & (rd_bank == b);
+            assign wr_hit = wr_fire & (wr_bank == b);
+
+            sram_8x256
+            bank_inst(
+                .clk_i(clk_i),
+                .rst_i(rst_i),
+                .addr_i(wr_hit ? wr_row : rd_row),
+                .wr_data_i(wr_data_i),
+                .rd_data_o(bank_rd_data[b]),
+                .en_i(rd_hit | wr_hit),
+                .rw_mode_i(wr_hit)
+            );
         end
+    endgenerate
 
-        if(rw_mode == '0)
-            sram_addr_o = rd_addr_i;
-        else
-            sram_addr_o = wr_addr_i;
-    end
+    assign rd_data_o = bank_rd_data[rd_bank_q];
 
     always_ff @( posedge clk_i ) begin
-        if(rst_i) begin
-            which_reader <= '1;
-            which_writer <= '1;
-            rw_mode <= '0;
-            in_use <= '0;
+        if (rst_i) begin
+            rd_valid_o <= '0;
+            rd_bank_q <= '0;
+            write_first_q <= '0;
+            conflict_stalls_o <= '0;
         end else begin
-            in_use_q <= in_use_d;
-
+            rd_valid_o <= rd_fire;
+            if (rd_fire)
+                rd_bank_q <= rd_bank;
+            if (conflict) begin
+                write_first_q <= ~write_first_q;
+                conflict_stalls_o <= conflict_stalls_o + 1'b1;
+            end
         end
     end
 
-    
 endmodule
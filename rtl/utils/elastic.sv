@@ -1,39 +1,84 @@
+// skid_p = 0: one output register, ready_o = ~valid_o | ready_i is combinational
+// skid_p = 1: output register plus a skid register that catches the word
+//             accepted while the output stalls, so ready_o is a flop and a chain
+//             of stages has no combinational ready path. Still one word per cycle.
 module elastic
   #(parameter [31:0] width_p = 8
    ,parameter [31:0] depth_p = 8
+   ,parameter [31:0] skid_p = 0
    )
   (input clk_i
   ,input rst_i
 
   ,input signed [width_p - 1:0] data_i [depth_p-1:0]
   ,input valid_i
-  ,output ready_o 
+  ,output ready_o
 
-  ,output logic valid_o 
+  ,output logic valid_o
   ,output logic signed [width_p - 1:0] data_o [depth_p-1:0]
   ,input ready_i
   );
   genvar i;
   generate
-    for (i = 0; i < depth_p ; i++) begin
+    if (skid_p == 0) begin : gen_pipe
+      for (i = 0; i < depth_p ; i++) begin
+        always_ff @( posedge clk_i) begin
+          if (rst_i) begin
+            data_o[i] <= '0;
+          end else if( valid_i && ready_o) begin
+            data_o[i] <= data_i[i];
+          end
+        end
+      end
+
       always_ff @( posedge clk_i) begin
         if (rst_i) begin
-          data_o[i] <= '0;
-        end else if( valid_i && ready_o) begin
-          data_o[i] <= data_i[i];
+          valid_o <= '0;
+        end else if(ready_o) begin
+          valid_o <= ready_o & valid_i;
         end
       end
-    end
-  endgenerate
 
-  always_ff @( posedge clk_i) begin
-    if (rst_i) begin
-      valid_o <= '0;
-    end else if(ready_o) begin
-      valid_o <= ready_o & valid_i;
-    end
-  end
+      assign ready_o = ~valid_o | ready_i;
+    end else begin : gen_skid
+      logic signed [width_p - 1:0] skid_q [depth_p-1:0];
+      logic skid_valid_q;
+      logic out_en;
+
+      // the output register is free this cycle
+      assign out_en = ~valid_o | ready_i;
+      // only the skid register's state, never ready_i
+      assign ready_o = ~skid_valid_q;
+
+      for (i = 0; i < depth_p ; i++) begin
+        always_ff @( posedge clk_i) begin
+          if (rst_i) begin
+            data_o[i] <= '0;
+            skid_q[i] <= '0;
+          end else if (out_en) begin
+            if (skid_valid_q)
+              data_o[i] <= skid_q[i];
+            else if (valid_i)
+              data_o[i] <= data_i[i];
+          end else if (valid_i && ready_o) begin
+            skid_q[i] <= data_i[i];
+          end
+        end
+      end
 
-  assign ready_o = ~valid_o | ready_i;
+      always_ff @( posedge clk_i) begin
+        if (rst_i) begin
+          valid_o <= '0;
+          skid_valid_q <= '0;
+        end else if (out_en) begin
+          // a full skid register blocks valid_i, so at most one word moves in
+          valid_o <= skid_valid_q | valid_i;
+          skid_valid_q <= '0;
+        end else if (valid_i && ready_o) begin
+          skid_valid_q <= 1'b1;
+        end
+      end
+    end
+  endgenerate
 
 endmodule
@@ -1,4 +1,9 @@
-module wb_mux_2to1 (
+module wb_mux_2to1 #(
+    // SPI bridge accesses inside this window go to the CSR slave (perf_counters)
+    // instead of LiteDRAM, also while the TPU owns the bus
+    parameter logic [31:0] CSR_BASE = 32'hF000_0000,
+    parameter int CSR_ADDR_W = 8
+) (
     input  logic tpu_active,  // 0 for SPI bridge to use bus, 1 = TPU
 
     //SPI Bridge (basically SPIBone)
@@ -12,29 +17,59 @@ module wb_mux_2to1 (
     input  logic [31:0] m1_adr, m1_dat_w,
     input  logic m1_we, m1_stb, m1_cyc,
     input  logic [3:0] m1_sel,
+    input  logic [2:0] m1_cti,
+    input  logic [1:0] m1_bte,
     output logic [31:0] m1_dat_r,
     output logic m1_ack,
+    // B4 pipelined: every m1 master (DMA, control_unit fetch) must honour
+    // m1_stall, a classic master holding stb would repeat its request
+    output logic m1_stall,
 
     //slave-LiteDRAM
     output logic [31:0] s_adr, s_dat_w,
     output logic s_we, s_stb, s_cyc,
     output logic [3:0] s_sel,
+    output logic [2:0] s_cti,
+    output logic [1:0] s_bte,
     input  logic [31:0] s_dat_r,
-    input  logic s_ack
+    input  logic s_ack,
+    input  logic s_stall,
+
+    //slave-CSRs
+    output logic [31:0] c_adr, c_dat_w,
+    output logic c_we, c_stb, c_cyc,
+    output logic [3:0] c_sel,
+    input  logic [31:0] c_dat_r,
+    input  logic c_ack
 );
+    logic m0_csr;
+    assign m0_csr = (m0_adr[31:CSR_ADDR_W] == CSR_BASE[31:CSR_ADDR_W]);
+
     always_comb begin
+        c_adr   = m0_adr;           c_dat_w = m0_dat_w;
+        c_we    = m0_we;            c_sel   = m0_sel;
+        c_stb   = m0_stb & m0_csr;  c_cyc   = m0_cyc & m0_csr;
+
         if (tpu_active) begin
             s_adr   = m1_adr;   s_dat_w = m1_dat_w;
             s_we    = m1_we;    s_stb   = m1_stb;
             s_cyc   = m1_cyc;   s_sel   = m1_sel;
+            s_cti   = m1_cti;   s_bte   = m1_bte;
             m1_dat_r = s_dat_r; m1_ack  = s_ack;
+            m1_stall = s_stall;
             m0_dat_r = '0;      m0_ack  = 1'b0;
         end else begin
             s_adr   = m0_adr;   s_dat_w = m0_dat_w;
-            s_we    = m0_we;    s_stb   = m0_stb;
-            s_cyc   = m0_cyc;   s_sel   = m0_sel;
+            s_we    = m0_we;    s_stb   = m0_stb & ~m0_csr;
+            s_cyc   = m0_cyc & ~m0_csr;   s_sel   = m0_sel;
+            s_cti   = 3'b000;   s_bte   = 2'b00;   // SPIBone: classic cycles
             m0_dat_r = s_dat_r; m0_ack  = s_ack;
             m1_dat_r = '0;      m1_ack  = 1'b0;
+            m1_stall = 1'b1;
+        end
+
+        if (m0_csr) begin
+            m0_dat_r = c_dat_r; m0_ack  = c_ack;
         end
     end
 endmodule
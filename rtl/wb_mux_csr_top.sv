@@ -0,0 +1,81 @@
+// Test top for test_wb_mux_2to1: wb_mux_2to1 with perf_counters on its CSR
+// port, the way the chip wires them. The LiteDRAM side (s_*) and both masters
+// stay ports, so the testbench drives m0 (SPI bridge) and m1 (TPU) and plays
+// the DRAM. The counters see the m1 bus for WB_WAIT; their other events are
+// tied off.
+module wb_mux_csr_top #(
+    parameter logic [31:0] CSR_BASE = 32'hF000_0000,
+    parameter int CSR_ADDR_W = 8
+) (
+    input  logic clk_i,
+    input  logic rst_i,
+    input  logic tpu_active,
+
+    input  logic [31:0] m0_adr, m0_dat_w,
+    input  logic m0_we, m0_stb, m0_cyc,
+    input  logic [3:0] m0_sel,
+    output logic [31:0] m0_dat_r,
+    output logic m0_ack,
+
+    input  logic [31:0] m1_adr, m1_dat_w,
+    input  logic m1_we, m1_stb, m1_cyc,
+    input  logic [3:0] m1_sel,
+    input  logic [2:0] m1_cti,
+    input  logic [1:0] m1_bte,
+    output logic [31:0] m1_dat_r,
+    output logic m1_ack,
+    output logic m1_stall,
+
+    output logic [31:0] s_adr, s_dat_w,
+    output logic s_we, s_stb, s_cyc,
+    output logic [3:0] s_sel,
+    output logic [2:0] s_cti,
+    output logic [1:0] s_bte,
+    input  logic [31:0] s_dat_r,
+    input  logic s_ack,
+    input  logic s_stall
+);
+    logic [31:0] c_adr, c_dat_w, c_dat_r;
+    logic c_we, c_stb, c_cyc, c_ack;
+    logic [3:0] c_sel;
+
+    wb_mux_2to1 #(
+        .CSR_BASE  (CSR_BASE),
+        .CSR_ADDR_W(CSR_ADDR_W)
+    ) u_mux (
+        .tpu_active(tpu_active),
+        .m0_adr(m0_adr), .m0_dat_w(m0_dat_w), .m0_we(m0_we), .m0_stb(m0_stb), .m0_cyc(m0_cyc),
+        .m0_sel(m0_sel), .m0_dat_r(m0_dat_r), .m0_ack(m0_ack),
+        .m1_adr(m1_adr), .m1_dat_w(m1_dat_w), .m1_we(m1_we), .m1_stb(m1_stb), .m1_cyc(m1_cyc),
+        .m1_sel(m1_sel), .m1_cti(m1_cti), .m1_bte(m1_bte),
+        .m1_dat_r(m1_dat_r), .m1_ack(m1_ack), .m1_stall(m1_stall),
+        .s_adr(s_adr), .s_dat_w(s_dat_w), .s_we(s_we), .s_stb(s_stb), .s_cyc(s_cyc),
+        .s_sel(s_sel), .s_cti(s_cti), .s_bte(s_bte),
+        .s_dat_r(s_dat_r), .s_ack(s_ack), .s_stall(s_stall),
+        .c_adr(c_adr), .c_dat_w(c_dat_w), .c_we(c_we), .c_stb(c_stb), .c_cyc(c_cyc),
+        .c_sel(c_sel), .c_dat_r(c_dat_r), .c_ack(c_ack)
+    );
+
+    perf_counters u_perf (
+        .clk_i         (clk_i),
+        .rst_i         (rst_i),
+        .wb_adr_i      (c_adr),
+        .wb_dat_i      (c_dat_w),
+        .wb_we_i       (c_we),
+        .wb_stb_i      (c_stb),
+        .wb_cyc_i      (c_cyc),
+        .wb_sel_i      (c_sel),
+        .wb_dat_o      (c_dat_r),
+        .wb_ack_o      (c_ack),
+        .array_busy_i  (1'b0),
+        .weight_load_i (1'b0),
+        .scalar_valid_i(1'b0),
+        .scalar_ready_i(1'b0),
+        .sram_rd_i     (1'b0),
+        .sram_wr_i     (1'b0),
+        .tpu_wb_cyc_i  (m1_cyc),
+        .tpu_wb_stb_i  (m1_stb),
+        .tpu_wb_stall_i(m1_stall),
+        .tpu_wb_ack_i  (m1_ack)
+    );
+endmodule
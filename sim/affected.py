@@ -0,0 +1,222 @@
+"""
+Selects the pytest files affected by a change.
+
+The dependency index is built from
+  - the RTL sources each sim/test_*.py passes to run_test() (its SOURCES or
+    sources list, read statically so lists built inside functions count too),
+  - module instantiations parsed out of rtl/**/*.sv, so a test also depends
+    on everything its sources instantiate, transitively,
+  - imports between the Python files under sim/, so a change to a helper
+    like refmodel selects the tests that use it.
+A test is affected when its own file or anything it depends on changed.
+Changes to the shared infrastructure (runner.py, shared.py, conftest.py,
+pytest configuration) select every test; changes outside rtl/ and sim/
+select nothing.
+
+Usage (from the repo root):
+    python3 sim/affected.py                      # working tree vs HEAD, print the tests
+    python3 sim/affected.py --base main          # everything changed since main
+    python3 sim/affected.py rtl/scalar_units/add_n.sv --why
+    python3 sim/affected.py --base main --run -- -s   # run them, args after -- go to pytest
+"""
+import re
+import ast
+import sys
+import argparse
+import subprocess
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+RTL = ROOT / "rtl"
+SIM = ROOT / "sim"
+
+# changing any of these can change every test
+GLOBAL_FILES = ["sim/runner.py", "sim/shared.py", "sim/conftest.py", "conftest.py",
+                "pytest.ini", "pyproject.toml", "setup.cfg", "tox.ini"]
+
+HDL_SUFFIXES = (".sv", ".v", ".svh", ".vh")
+
+def rel(path):
+    return Path(path).resolve().relative_to(ROOT).as_posix()
+
+def strip_comments(text):
+    text = re.sub(r"/\*.*?\*/", " ", text, flags=re.S)
+    return re.sub(r"//[^\n]*", " ", text)
+
+def rtl_index():
+    """Returns ({module: [files defining it]}, {file: set of instantiated modules}, {file: set of included names})."""
+    defined = {}
+    texts = {}
+    for f in sorted(RTL.rglob("*")):
+        if f.suffix not in HDL_SUFFIXES or not f.is_file():
+            continue
+        text = strip_comments(f.read_text(errors="replace"))
+        texts[rel(f)] = text
+        for m in re.finditer(r"\b(?:module|interface|package)\s+(?:automatic\s+)?(\w+)", text):
+            defined.setdefault(m.group(1), []).append(rel(f))
+
+    # <module> [#(...)] <instance> [array] (   ; parameter lists may nest one level of parentheses
+    inst = re.compile(r"\b(\w+)\s*(?:#\s*\((?:[^()]|\([^()]*\))*\)\s*)?(\w+)\s*(?:\[[^\]]*\]\s*)?\(")
+    uses = {}
+    includes = {}
+    for f, text in texts.items():
+        uses[f] = {m.group(1) for m in inst.finditer(text) if m.group(1) in defined and f not in defined[m.group(1)]}
+        # package imports count as uses too
+        uses[f] |= {p for p in re.findall(r"\b(\w+)::", text) if p in defined}
+        includes[f] = set(re.findall(r"`include\s+\"([^\"]+)\"", text))
+    return defined, uses, includes
+
+def rtl_deps(files, defined, uses, includes):
+    """Transitive closure of files over module instantiations and includes."""
+    by_name = {}
+    for f in uses:
+        by_name.setdefault(Path(f).name, f)
+    seen = set()
+    todo = list(files)
+    while todo:
+        f = todo.pop()
+        if f in seen:
+            continue
+        seen.add(f)
+        for m in uses.get(f, ()):
+            # some modules exist in several copies (rtl/pe.sv, rtl/sysray/pe.sv): prefer the one
+            # next to the user, otherwise depend on all of them
+            near = [d for d in defined[m] if Path(d).parent == Path(f).parent]
+            todo += near or defined[m]
+        todo += [by_name[Path(i).name] for i in includes.get(f, ()) if Path(i).name in by_name]
+    return seen
+
+def _path_parts(node):
+    """String parts of a / chain (proj_path / "utils" / "shift.sv"), or None if it has none."""
+    if isinstance(node, ast.BinOp) and isinstance(node.op, ast.Div):
+        left = _path_parts(node.left) or []
+        right = _path_parts(node.right) or []
+        return left + right or None
+    if isinstance(node, ast.Constant) and isinstance(node.value, str):
+        return [node.value]
+    return None
+
+def testbench_sources(path):
+    """RTL files (relative to the repo root) a test module refers to."""
+    tree = ast.parse(path.read_text())
+    strings = []
+    in_chain = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.BinOp) and isinstance(node.op, ast.Div) and id(node) not in in_chain:
+            parts = _path_parts(node)
+            for sub in ast.walk(node):
+                in_chain.add(id(sub))
+            if parts:
+                strings.append("/".join(parts))
+        elif isinstance(node, ast.Constant) and isinstance(node.value, str) and id(node) not in in_chain:
+            strings.append(node.value)
+
+    res = set()
+    for s in strings:
+        if not s.endswith(HDL_SUFFIXES):
+            continue
+        p = Path(s.replace("\\", "/"))
+        parts = [x for x in p.parts if x not in (".", "")]
+        # paths are written relative to ./rtl (proj_path) or to the repo root
+        if parts and parts[0] == "rtl":
+            parts = parts[1:]
+        res.add("rtl/" + "/".join(parts))
+    return res
+
+def python_imports(path):
+    """Names of the sibling modules under sim/ a Python file imports."""
+    tree = ast.parse(path.read_text())
+    names = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            names |= {a.name.split(".")[0] for a in node.names}
+        elif isinstance(node, ast.ImportFrom) and node.module and node.level == 0:
+            names.add(node.module.split(".")[0])
+    return names
+
+def python_index():
+    """{sim file: set of sim files it imports, directly}. Modules resolve within sim/ and its packages."""
+    files = [f for f in SIM.rglob("*.py") if "__pycache__" not in f.parts]
+    by_module = {}
+    for f in files:
+        name = f.parent.name if f.name == "__init__.py" else f.stem
+        # tests import siblings by bare name (sim/ and sim/model are on sys.path)
+        by_module.setdefault(name, rel(f))
+    deps = {}
+    for f in files:
+        try:
+            imported = python_imports(f)
+        except SyntaxError:
+            imported = set()
+        deps[rel(f)] = {by_module[n] for n in imported if n in by_module}
+        # packages (refmodel) load their submodules lazily; depend on all of them
+        if f.name == "__init__.py":
+            deps[rel(f)] |= {rel(g) for g in f.parent.glob("*.py") if g != f}
+    return deps
+
+def build_index():
+    """Returns {test file: set of files (rtl and sim) it depends on, including itself}."""
+    defined, uses, includes = rtl_index()
+    py = python_index()
+    index = {}
+    for t in sorted(SIM.rglob("test_*.py")):
+        t = rel(t)
+        # the test itself and every sim module it imports, transitively
+        seen = set()
+        todo = [t]
+        while todo:
+            f = todo.pop()
+            if f in seen:
+                continue
+            seen.add(f)
+            todo += py.get(f, ())
+        rtl = set()
+        for f in seen:
+            rtl |= testbench_sources(ROOT / f)
+        index[t] = seen | rtl_deps(rtl, defined, uses, includes)
+    return index
+
+def changed_files(base):
+    """Files changed in the working tree (staged or not) relative to base, plus untracked ones."""
+    git = lambda *args: subprocess.run(["git", *args], cwd=ROOT, capture_output=True, text=True, check=True).stdout.split("\n")
+    files = git("diff", "--name-only", base) + git("ls-files", "--others", "--exclude-standard")
+    return sorted({f for f in files if f})
+
+def select(changed, index):
+    """Returns {test file: sorted list of the changed files that select it}."""
+    if any(c in GLOBAL_FILES for c in changed):
+        reason = [c for c in changed if c in GLOBAL_FILES]
+        return {t: reason for t in index}
+    res = {}
+    for t, deps in index.items():
+        hit = sorted(set(changed) & deps)
+        if hit:
+            res[t] = hit
+    return res
+
+def main():
+    parser = argparse.ArgumentParser(description="Select the tests affected by a change")
+    parser.add_argument("files", nargs="*", help="changed files (default: from git)")
+    parser.add_argument("--base", default="HEAD", help="git ref to diff the working tree against (default: HEAD)")
+    parser.add_argument("--why", action="store_true", help="show which changed files select each test")
+    parser.add_argument("--run", action="store_true", help="run pytest on the selected tests")
+    argv = sys.argv[1:]
+    # everything after -- goes to pytest
+    pytest_args = argv[argv.index("--") + 1:] if "--" in argv else []
+    args = parser.parse_args(argv[:argv.index("--")] if "--" in argv else argv)
+
+    changed = [rel(f) for f in args.files] if args.files else changed_files(args.base)
+    selected = select(changed, build_index())
+
+    if not selected:
+        print(f"No tests affected by {len(changed)} changed file(s)", file=sys.stderr)
+        return 0
+    for t, why in sorted(selected.items()):
+        print(f"{t}  <- {', '.join(why)}" if args.why else t)
+    if not args.run:
+        return 0
+
+    return subprocess.run([sys.executable, "-m", "pytest", *sorted(selected), *pytest_args], cwd=ROOT).returncode
+
+if __name__ == "__main__":
+    sys.exit(main())
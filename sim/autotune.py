@@ -0,0 +1,90 @@
+"""
+Benchmarks every simulator profile (see SIM_PROFILES in runner.py) on a test module
+and remembers the fastest one per parameter set in sim_build/sim_profiles.json.
+Runs with SIM_PROFILE=auto then use the remembered profile.
+
+Usage (from the repo root):
+    python3 sim/autotune.py test_sysray_nxn sysray_nxn -p N=8 -p N=16 -t test_random_matmul_matrix
+
+Each -p is one parameter set (comma separate several parameters: -p N=8,M=4).
+Profiles are ranked by simulated cycles per wall-clock second, summed over all
+testcases; build time is reported but not ranked on since it is paid once per
+build. Profiles whose run fails are never picked.
+"""
+import os
+import sys
+import json
+import argparse
+import importlib
+from pathlib import Path
+
+PERF_LOG = Path("./sim_build/autotune/perf.jsonl")
+# runner reads these at import time. A SIM_PROFILE override would make every run use the same profile
+os.environ["PERF_LOG"] = str(PERF_LOG)
+os.environ.pop("SIM_PROFILE", None)
+
+from runner import run_test, SIM_PROFILES, SIM_PROFILE_FILE
+from shared import stringify_dict, parse_params
+
+def read_records(offset):
+    """Returns the perf records appended to PERF_LOG after line offset."""
+    if not PERF_LOG.is_file():
+        return []
+    lines = PERF_LOG.read_text().splitlines()
+    return [json.loads(l) for l in lines[offset:]]
+
+def bench(module_name, hdl_toplevel, sources, parameters, testcase, profile):
+    """Runs one profile with verilator and returns (cycles_per_s, build_s), or None if it failed."""
+    offset = len(read_records(0))
+    run_test(parameters=parameters, sources=sources, module_name=module_name, hdl_toplevel=hdl_toplevel,
+             testcase=testcase, sims=["verilator"], sim_profile=profile)
+    records = read_records(offset)
+    if not records or any(r["status"] != "pass" for r in records):
+        return None
+
+    cycles = sum(r["cycles"] for r in records)
+    wall_s = sum(r["wall_s"] for r in records)
+    return (cycles / wall_s if wall_s > 0 else 0.0, records[0]["build_s"])
+
+def main():
+    parser = argparse.ArgumentParser(description="Pick the fastest simulator profile for a test module")
+    parser.add_argument("module", help="cocotb test module, e.g. test_sysray_nxn")
+    parser.add_argument("toplevel", help="HDL toplevel, e.g. sysray_nxn")
+    parser.add_argument("-p", "--params", action="append", default=[],
+                        help="parameter set NAME=VAL[,NAME=VAL...]; repeat for several sets")
+    parser.add_argument("-t", "--testcase", default=None, help="only run this cocotb testcase")
+    # xcheck is for finding missing resets, not a speed setting
+    parser.add_argument("--profiles", nargs="+", default=[p for p in SIM_PROFILES if p != "xcheck"], choices=list(SIM_PROFILES))
+    args = parser.parse_args()
+
+    mod = importlib.import_module(args.module)
+    sources = getattr(mod, "SOURCES", None) or getattr(mod, "sources")
+    param_sets = [parse_params(p) for p in args.params] or [{}]
+
+    tuned = json.loads(SIM_PROFILE_FILE.read_text()) if SIM_PROFILE_FILE.is_file() else {}
+    for params in param_sets:
+        results = {}
+        for profile in args.profiles:
+            results[profile] = bench(args.module, args.toplevel, sources, params, args.testcase, profile)
+
+        print(f"\n{args.module} {params}:")
+        for profile, res in results.items():
+            if res is None:
+                print(f"  {profile:15s} FAILED")
+            else:
+                print(f"  {profile:15s} {res[0]:12.0f} cycles/s  build {res[1]:.1f}s")
+
+        ok = {p: r for p, r in results.items() if r is not None}
+        if not ok:
+            print("  no profile passed, nothing remembered")
+            continue
+        best = max(ok, key=lambda p: ok[p][0])
+        print(f"  fastest: {best}")
+        tuned.setdefault(args.module, {})[stringify_dict(params)] = best
+
+    SIM_PROFILE_FILE.parent.mkdir(parents=True, exist_ok=True)
+    SIM_PROFILE_FILE.write_text(json.dumps(tuned, indent=2))
+    print(f"\nSaved to {SIM_PROFILE_FILE}")
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,81 @@
+"""
+Bank-conflict model of rtl/sram/sram_controller.sv.
+
+Word address a lives in bank a % banks. Each cycle the read port and the write
+port each present their next address; both are served when the banks differ.
+On a conflict one port waits a cycle, the winner alternating starting with the
+read port, exactly like the RTL. simulate() returns the cycles the two streams
+take together, so the effective bandwidth of an access pattern can be checked
+without simulating the RTL.
+
+Patterns are START:COUNT[:STRIDE] word address sequences.
+
+Usage (from the repo root):
+    python3 sim/bank_conflicts.py --read 0:256 --write 1024:256          # sequential, different phase
+    python3 sim/bank_conflicts.py --read 0:256:8 --write 1024:256:8      # both hammer bank 0
+    python3 sim/bank_conflicts.py --read 0:256 --write 1024:256 --banks 2 4 8 16 --json banks.json
+"""
+import sys
+import json
+import argparse
+
+def parse_pattern(text):
+    parts = [int(p, 0) for p in text.split(":")]
+    start, count = parts[0], parts[1]
+    stride = parts[2] if len(parts) > 2 else 1
+    return [start + i * stride for i in range(count)]
+
+def simulate(reads, writes, banks=8):
+    """
+    Runs both address streams through the arbiter. Returns cycles, conflict
+    stall cycles and the words per cycle of each port and of both together.
+    """
+    i = j = 0
+    cycles = 0
+    conflicts = 0
+    write_first = False
+    while i < len(reads) or j < len(writes):
+        r = reads[i] if i < len(reads) else None
+        w = writes[j] if j < len(writes) else None
+        if r is not None and w is not None and r % banks == w % banks:
+            conflicts += 1
+            if write_first:
+                j += 1
+            else:
+                i += 1
+            write_first = not write_first
+        else:
+            i += r is not None
+            j += w is not None
+        cycles += 1
+
+    per_cycle = lambda n: n / cycles if cycles else 0.0
+    return {
+        "banks": banks,
+        "cycles": cycles,
+        "conflict_stalls": conflicts,
+        "reads_per_cycle": per_cycle(len(reads)),
+        "writes_per_cycle": per_cycle(len(writes)),
+        "words_per_cycle": per_cycle(len(reads) + len(writes)),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Predict the throughput of a read/write pattern on the banked SRAM controller")
+    parser.add_argument("--read", type=parse_pattern, default=[], help="read addresses START:COUNT[:STRIDE]")
+    parser.add_argument("--write", type=parse_pattern, default=[], help="write addresses START:COUNT[:STRIDE]")
+    parser.add_argument("--banks", type=int, nargs="+", default=[8], help="bank counts to compare")
+    parser.add_argument("--json", default=None, help="also write the results to this file")
+    args = parser.parse_args()
+
+    results = [simulate(args.read, args.write, b) for b in args.banks]
+    print(f"{'banks':>6s} {'cycles':>8s} {'conflicts':>10s} {'reads/cyc':>10s} {'writes/cyc':>11s} {'words/cyc':>10s}")
+    for r in results:
+        print(f"{r['banks']:6d} {r['cycles']:8d} {r['conflict_stalls']:10d} {r['reads_per_cycle']:10.3f} "
+              f"{r['writes_per_cycle']:11.3f} {r['words_per_cycle']:10.3f}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
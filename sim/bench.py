@@ -0,0 +1,247 @@
+"""
+Hardware throughput / latency benchmarks for the RTL blocks.
+
+Each block has a sim/bench_<block>.py module (not collected by pytest) with
+cocotb benchmarks bench_<scenario> for a full-rate and a randomized-backpressure scenario, and
+a BENCH dict describing how to build it. Benchmarks count items through the
+block with BenchStats and write one record per scenario; this script runs
+them, adds simulator wall time per cycle from the perf records, stores the
+results for the current commit and compares them against a baseline.
+
+Usage (from the repo root):
+    python3 sim/bench.py                      # all blocks, compare to baseline
+    python3 sim/bench.py fifo scalar_pipe     # some blocks
+    python3 sim/bench.py --save-baseline      # make this run the baseline
+
+Results go to sim_build/bench/<commit>.json, the baseline to
+sim_build/bench/baseline.json (override the directory with BENCH_DIR).
+Stimulus uses a fixed seed, so items/cycle and latency are exact and any
+change is a real RTL change; wall time per cycle is noisy and gets a looser
+threshold.
+"""
+import os
+import sys
+import json
+import random
+import argparse
+import subprocess
+import importlib
+from collections import deque
+from pathlib import Path
+import cocotb
+from cocotb.triggers import RisingEdge, FallingEdge
+from shared import HandshakeMonitor
+
+BENCH_DIR = Path(os.getenv("BENCH_DIR", "./sim_build/bench"))
+# set by the bench driver; benchmarks append their records here
+BENCH_OUT = os.getenv("BENCH_OUT")
+# fixed stimulus seed so hardware metrics are comparable between commits
+BENCH_SEED = 1234
+
+BLOCKS = ["sysray_nxn", "scalar_pipe", "fifo", "sram_8x256", "memory_transaction", "burst_read", "loader", "tri_shift"]
+
+def bench_random():
+    """Random generator for stimulus and backpressure, independent of the cocotb seed."""
+    return random.Random(BENCH_SEED)
+
+class BenchStats():
+    """
+    Counts items into and out of a block, cycle-stamped.
+
+    push() when an item is accepted, pop() when an item leaves (in order).
+    Throughput is measured between the first and last output so the fill
+    latency does not count against it.
+    """
+    def __init__(self, clk_i):
+        self.clk_i = clk_i
+        self.cycle = 0
+        self.in_cycles = deque()
+        self.latencies = []
+        self.n_in = 0
+        self.n_out = 0
+        self.first_out = None
+        self.last_out = None
+        cocotb.start_soon(self._count())
+
+    async def _count(self):
+        while True:
+            await RisingEdge(self.clk_i)
+            self.cycle += 1
+
+    def push(self, n=1):
+        for _ in range(n):
+            self.in_cycles.append(self.cycle)
+        self.n_in += n
+
+    def pop(self, n=1):
+        for _ in range(n):
+            self.latencies.append(self.cycle - self.in_cycles.popleft())
+        if self.first_out is None:
+            self.first_out = self.cycle
+        self.last_out = self.cycle
+        self.n_out += n
+
+    def result(self):
+        span = (self.last_out - self.first_out) if self.n_out > 0 else 0
+        # n outputs spread over span cycles: the first one opens the window
+        ipc = (self.n_out - 1) / span if span > 0 else float(self.n_out > 0)
+        lat = self.latencies or [0]
+        return {
+            "items": self.n_out,
+            "cycles": span,
+            "items_per_cycle": ipc,
+            "latency_min": min(lat),
+            "latency_mean": sum(lat) / len(lat),
+            "latency_max": max(lat),
+        }
+
+async def stream_bench(clk_i, rst_i, valid_i, ready_o, valid_o, ready_i, n_items, ready_prob=1.0, drive=None):
+    """
+    Pushes n_items through a ready/valid block and returns its BenchStats.
+
+    The source is always valid; the sink is ready every cycle (full rate) or
+    with probability ready_prob (random backpressure). drive(i) puts item i on
+    the data inputs; it is called once per item, when the previous one has
+    been taken, so the data holds while valid waits for ready. Must be called
+    right after reset, on a falling edge.
+    """
+    rng = bench_random()
+    stats = BenchStats(clk_i)
+    monitor = HandshakeMonitor(clk_i, rst_i)
+    monitor.add(ready_o, valid_i, stats.push)
+    monitor.add(ready_i, valid_o, stats.pop)
+    task = monitor.start()
+
+    driven = None
+    while stats.n_out < n_items:
+        if stats.n_in < n_items:
+            if drive is not None and driven != stats.n_in:
+                drive(stats.n_in)
+                driven = stats.n_in
+            valid_i.value = 1
+        else:
+            valid_i.value = 0
+        ready_i.value = 1 if rng.random() < ready_prob else 0
+        await FallingEdge(clk_i)
+
+    task.cancel()
+    valid_i.value = 0
+    ready_i.value = 0
+    return stats
+
+def write_result(block, scenario, stats, **extra):
+    """Called from a benchmark: stores the BenchStats result of one scenario."""
+    rec = {"block": block, "scenario": scenario}
+    rec.update(stats.result())
+    rec.update(extra)
+    cocotb.log.info(f"[bench] {block}/{scenario}: {rec['items_per_cycle']:.3f} items/cycle, "
+                    f"latency {rec['latency_min']}..{rec['latency_max']} cycles")
+    if BENCH_OUT is not None:
+        with open(BENCH_OUT, "a") as f:
+            f.write(json.dumps(rec) + "\n")
+
+def git_commit():
+    try:
+        sha = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], capture_output=True, text=True).stdout.strip()
+        return sha + ("-dirty" if dirty else "")
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+def key(rec):
+    return f"{rec['block']}/{rec['scenario']}/{rec['parameters']}"
+
+def run_block(block):
+    """Runs one bench module and returns its records, with wall time per cycle from the perf log."""
+    # imported here: the runner is only needed by the driver, not inside the simulator
+    from runner import run_test, PERF_LOG
+    from shared import stringify_dict
+
+    mod = importlib.import_module(f"bench_{block}")
+    cfg = mod.BENCH
+    records = []
+    for params in cfg.get("parameters", [{}]):
+        out = (BENCH_DIR / "runs" / f"{block}_{stringify_dict(params)}.jsonl").resolve()
+        out.parent.mkdir(parents=True, exist_ok=True)
+        out.unlink(missing_ok=True)
+        os.environ["BENCH_OUT"] = str(out)
+
+        perf_start = len(PERF_LOG.read_text().splitlines()) if PERF_LOG.is_file() else 0
+        run_test(parameters=params, sources=cfg["sources"], module_name=f"bench_{block}",
+                 hdl_toplevel=cfg["toplevel"], sims=cfg.get("sims", ["verilator"]))
+        perf = [json.loads(l) for l in PERF_LOG.read_text().splitlines()[perf_start:]] if PERF_LOG.is_file() else []
+        perf = {p["testcase"]: p for p in perf}
+
+        if not out.is_file():
+            print(f"[bench] {block} {params}: no results (build or run failed)")
+            continue
+        for l in out.read_text().splitlines():
+            rec = json.loads(l)
+            rec["parameters"] = stringify_dict(params)
+            # benchmark coroutines are named bench_<scenario>
+            p = perf.get(f"bench_{rec['scenario']}")
+            rec["sim"] = p["sim"] if p else None
+            rec["wall_us_per_cycle"] = 1e6 * p["wall_s"] / p["cycles"] if p and p["cycles"] else None
+            records.append(rec)
+    return records
+
+def compare(results, baseline, tol_ipc, tol_latency, tol_wall):
+    """Prints a comparison table and returns the list of regressions."""
+    regressions = []
+    print(f"\n{'benchmark':50s} {'items/cycle':>18s} {'latency max':>14s} {'us/cycle':>16s}")
+    for k, r in sorted(results.items()):
+        b = baseline.get(k)
+        line = f"{k:50s} {r['items_per_cycle']:8.3f}"
+        if b is None:
+            print(line + "  (new)")
+            continue
+        line += f" ({b['items_per_cycle']:6.3f})  {r['latency_max']:5} ({b['latency_max']:5})"
+        if r["wall_us_per_cycle"] is not None and b.get("wall_us_per_cycle"):
+            line += f"  {r['wall_us_per_cycle']:6.2f} ({b['wall_us_per_cycle']:6.2f})"
+        print(line)
+
+        if r["items_per_cycle"] < b["items_per_cycle"] * (1 - tol_ipc):
+            regressions.append(f"{k}: items/cycle {b['items_per_cycle']:.3f} -> {r['items_per_cycle']:.3f}")
+        if r["latency_max"] > b["latency_max"] + tol_latency:
+            regressions.append(f"{k}: max latency {b['latency_max']} -> {r['latency_max']} cycles")
+        if (r["wall_us_per_cycle"] is not None and b.get("wall_us_per_cycle")
+                and r["wall_us_per_cycle"] > b["wall_us_per_cycle"] * (1 + tol_wall)):
+            regressions.append(f"{k}: wall {b['wall_us_per_cycle']:.2f} -> {r['wall_us_per_cycle']:.2f} us/cycle")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the RTL throughput benchmarks")
+    parser.add_argument("blocks", nargs="*", default=BLOCKS, help=f"blocks to run (default: all of {BLOCKS})")
+    parser.add_argument("--save-baseline", action="store_true", help="store this run as the baseline")
+    parser.add_argument("--baseline", type=Path, default=BENCH_DIR / "baseline.json")
+    parser.add_argument("--tol-ipc", type=float, default=0.0, help="allowed relative items/cycle drop")
+    parser.add_argument("--tol-latency", type=int, default=0, help="allowed max latency increase in cycles")
+    parser.add_argument("--tol-wall", type=float, default=0.25, help="allowed relative wall time per cycle increase")
+    args = parser.parse_args()
+
+    results = {}
+    for block in args.blocks:
+        for rec in run_block(block):
+            results[key(rec)] = rec
+
+    commit = git_commit()
+    BENCH_DIR.mkdir(parents=True, exist_ok=True)
+    (BENCH_DIR / f"{commit}.json").write_text(json.dumps(results, indent=2))
+    print(f"Results for {commit} saved to {BENCH_DIR / f'{commit}.json'}")
+
+    if args.save_baseline:
+        args.baseline.write_text(json.dumps(results, indent=2))
+        print(f"Saved as baseline to {args.baseline}")
+        return 0
+    if not args.baseline.is_file():
+        print(f"No baseline at {args.baseline}; run with --save-baseline first")
+        return 0
+
+    regressions = compare(results, json.loads(args.baseline.read_text()),
+                          args.tol_ipc, args.tol_latency, args.tol_wall)
+    for r in regressions:
+        print(f"REGRESSION {r}")
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
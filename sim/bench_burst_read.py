@@ -0,0 +1,70 @@
+import cocotb
+from cocotb.triggers import FallingEdge
+from pathlib import Path
+from shared import clock_start, reset_sequence, HandshakeMonitor
+from bench import BenchStats, write_result, bench_random
+from test_burst_read import SramModel
+
+N_TRANSACTIONS = 16
+LENGTH = 16
+
+async def run(dut, ready_prob):
+    """
+    Same traffic as bench_memory_transaction: N_TRANSACTIONS back-to-back read
+    transactions of LENGTH words, an item per word, popped when the word is
+    taken off rd_data_o. Also counts the cycles the consumer was ready, so the
+    result shows words per ready cycle as well as words per cycle.
+    """
+    rng = bench_random()
+    dut.load_valid_i.value = 0
+    dut.addr_i.value = 0
+    dut.transaction_amount_i.value = 0
+    dut.rd_ready_i.value = 0
+    dut.sram_rd_data_i.value = 0
+    await clock_start(dut.clk_i)
+    await reset_sequence(dut.clk_i, dut.rst_i)
+    SramModel(dut).start()
+
+    stats = BenchStats(dut.clk_i)
+    monitor = HandshakeMonitor(dut.clk_i, dut.rst_i)
+    monitor.add(dut.load_ready_o, dut.load_valid_i, lambda: stats.push(LENGTH))
+    monitor.add(dut.rd_ready_i, dut.rd_valid_o, stats.pop)
+    task = monitor.start()
+
+    total = N_TRANSACTIONS * LENGTH
+    ready_cycles = 0
+    while stats.n_out < total:
+        n_tx = stats.n_in // LENGTH
+        if n_tx < N_TRANSACTIONS:
+            dut.addr_i.value = (n_tx * LENGTH) % 256
+            dut.transaction_amount_i.value = LENGTH
+            dut.load_valid_i.value = 1
+        else:
+            dut.load_valid_i.value = 0
+        ready = rng.random() < ready_prob
+        dut.rd_ready_i.value = int(ready)
+        # ready cycles inside the measured window (first to last output)
+        if ready and stats.n_out > 0:
+            ready_cycles += 1
+        await FallingEdge(dut.clk_i)
+
+    task.cancel()
+    dut.load_valid_i.value = 0
+    dut.rd_ready_i.value = 0
+    return stats, (stats.n_out - 1) / ready_cycles if ready_cycles else 1.0
+
+@cocotb.test()
+async def bench_full_rate(dut):
+    stats, per_ready = await run(dut, 1.0)
+    write_result("burst_read", "full_rate", stats, words_per_ready_cycle=per_ready)
+
+@cocotb.test()
+async def bench_backpressure(dut):
+    stats, per_ready = await run(dut, 0.5)
+    write_result("burst_read", "backpressure", stats, words_per_ready_cycle=per_ready)
+
+proj_path = Path("./rtl").resolve()
+BENCH = {
+    "toplevel": "burst_read",
+    "sources": [proj_path / "sram/burst_read.sv", proj_path / "fifo.sv"],
+}
@@ -0,0 +1,40 @@
+import cocotb
+from pathlib import Path
+from shared import clock_start, reset_sequence
+from bench import stream_bench, write_result
+
+N_ITEMS = 256
+
+async def init(dut):
+    dut.valid_i.value = 0
+    dut.ready_i.value = 0
+    dut.data_i.value = 0
+    await clock_start(dut.clk_i)
+    await reset_sequence(dut.clk_i, dut.rst_i)
+
+def make_drive(dut):
+    width = dut.WIDTH_P.value.to_unsigned()
+    def drive(i):
+        dut.data_i.value = i % (1 << width)
+    return drive
+
+@cocotb.test()
+async def bench_full_rate(dut):
+    await init(dut)
+    stats = await stream_bench(dut.clk_i, dut.rst_i, dut.valid_i, dut.ready_o, dut.valid_o, dut.ready_i,
+                               N_ITEMS, drive=make_drive(dut))
+    write_result("fifo", "full_rate", stats)
+
+@cocotb.test()
+async def bench_backpressure(dut):
+    await init(dut)
+    stats = await stream_bench(dut.clk_i, dut.rst_i, dut.valid_i, dut.ready_o, dut.valid_o, dut.ready_i,
+                               N_ITEMS, ready_prob=0.5, drive=make_drive(dut))
+    write_result("fifo", "backpressure", stats)
+
+proj_path = Path("./rtl").resolve()
+BENCH = {
+    "toplevel": "fifo",
+    "sources": [proj_path / "fifo.sv"],
+    "parameters": [{"DEPTH_LOG2_P": 1}, {"DEPTH_LOG2_P": 3}],
+}
@@ -0,0 +1,57 @@
+import cocotb
+from cocotb.triggers import FallingEdge
+from pathlib import Path
+from shared import clock_start, reset_sequence
+from bench import BenchStats, write_result, bench_random
+
+N_TILES = 32
+
+async def run(dut, start_prob):
+    """
+    Runs N_TILES tiles through the loader; a tile is an item from the accepted
+    start_i to done_o. The loader has no ready, so backpressure is a random
+    delay before each start.
+    """
+    N = dut.N.value.to_unsigned()
+    K = dut.K.value.to_unsigned()
+    DW = dut.DATA_WIDTH.value.to_unsigned()
+    rng = bench_random()
+
+    dut.start_i.value = 0
+    dut.buf_sel_i.value = 0
+    dut.A_flat.value = rng.getrandbits(N * K * DW)
+    dut.B_flat.value = rng.getrandbits(K * N * DW)
+    await clock_start(dut.clk_i)
+    await reset_sequence(dut.clk_i, dut.rst_i)
+
+    stats = BenchStats(dut.clk_i)
+    while stats.n_out < N_TILES:
+        if dut.done_o.value == 1:
+            stats.pop()
+
+        # start is only accepted in IDLE
+        if stats.n_in < N_TILES and dut.busy_o.value == 0 and rng.random() < start_prob:
+            dut.start_i.value = 1
+            dut.buf_sel_i.value = stats.n_in % 2
+            stats.push()
+        else:
+            dut.start_i.value = 0
+        await FallingEdge(dut.clk_i)
+
+    dut.start_i.value = 0
+    return stats
+
+@cocotb.test()
+async def bench_full_rate(dut):
+    stats = await run(dut, 1.0)
+    write_result("loader", "full_rate", stats)
+
+@cocotb.test()
+async def bench_backpressure(dut):
+    stats = await run(dut, 0.5)
+    write_result("loader", "backpressure", stats)
+
+BENCH = {
+    "toplevel": "loader",
+    "sources": [Path("./rtl/loader.sv").resolve()],
+}
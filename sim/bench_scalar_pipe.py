@@ -0,0 +1,54 @@
+import cocotb
+from pathlib import Path
+from shared import clock_start, reset_sequence
+from bench import stream_bench, write_result, bench_random
+from refmodel import float_to_fixed
+from test_scalar_pipe import SOURCES
+
+N_ITEMS = 256
+
+async def init(dut):
+    N = dut.N.value.to_unsigned()
+    FIXED_SHIFT = dut.FIXED_SHIFT.value.to_unsigned()
+    rng = bench_random()
+    dut.data_valid_i.value = 0
+    dut.data_ready_i.value = 0
+    dut.lut_en_i.value = 0
+    for i in range(N):
+        dut.data_i[i].value = 0
+        dut.bias_i[i].value = rng.randint(-10, 10)
+        dut.zero_point_i[i].value = rng.randint(-10, 10)
+        dut.scale_i[i].value = float_to_fixed(rng.random(), FIXED_SHIFT)
+    await clock_start(dut.clk_i)
+    await reset_sequence(dut.clk_i, dut.rst_i)
+
+def make_drive(dut, n_items=N_ITEMS):
+    """Item i is the same whatever the backpressure did before it."""
+    N = dut.N.value.to_unsigned()
+    rng = bench_random()
+    rows = [[rng.randint(-1000, 1000) for _ in range(N)] for _ in range(n_items)]
+    def drive(i):
+        for lane in range(N):
+            dut.data_i[lane].value = rows[i][lane]
+    return drive
+
+@cocotb.test()
+async def bench_full_rate(dut):
+    await init(dut)
+    stats = await stream_bench(dut.clk_i, dut.rst_i, dut.data_valid_i, dut.data_ready_o, dut.data_valid_o, dut.data_ready_i,
+                               N_ITEMS, drive=make_drive(dut))
+    write_result("scalar_pipe", "full_rate", stats)
+
+@cocotb.test()
+async def bench_backpressure(dut):
+    await init(dut)
+    stats = await stream_bench(dut.clk_i, dut.rst_i, dut.data_valid_i, dut.data_ready_o, dut.data_valid_o, dut.data_ready_i,
+                               N_ITEMS, ready_prob=0.5, drive=make_drive(dut))
+    write_result("scalar_pipe", "backpressure", stats)
+
+BENCH = {
+    "toplevel": "scalar_pipe",
+    "sources": SOURCES,
+    # combinational ready chain vs. skid buffers in every stage
+    "parameters": [{}, {"SKID_MASK": 0b1111}],
+}
@@ -0,0 +1,72 @@
+import cocotb
+from cocotb.triggers import FallingEdge
+from pathlib import Path
+from shared import clock_start, reset_sequence
+from bench import BenchStats, write_result, bench_random
+
+DEPTH = 256
+
+def pattern(addr):
+    """Unique, non-zero word per address so a read can be matched to its request."""
+    return (0xC0FFEE << 40) | (addr << 8) | (addr ^ 0xFF)
+
+async def run(dut, en_prob):
+    """
+    Fills the SRAM, then reads every address back. A read request is an item;
+    it completes when its word shows up on rd_data_o. The requester issues a
+    read each cycle with probability en_prob (the SRAM has no ready).
+    """
+    rng = bench_random()
+    dut.en_i.value = 0
+    dut.rw_mode_i.value = 0
+    dut.addr_i.value = 0
+    dut.wr_data_i.value = 0
+    await clock_start(dut.clk_i)
+    await reset_sequence(dut.clk_i, dut.rst_i)
+
+    for addr in range(DEPTH):
+        dut.addr_i.value = addr
+        dut.wr_data_i.value = pattern(addr)
+        dut.rw_mode_i.value = 1
+        dut.en_i.value = 1
+        await FallingEdge(dut.clk_i)
+    dut.en_i.value = 0
+    dut.rw_mode_i.value = 0
+    await FallingEdge(dut.clk_i)
+
+    stats = BenchStats(dut.clk_i)
+    while stats.n_out < DEPTH:
+        if stats.n_out < stats.n_in and dut.rd_data_o.value.to_unsigned() == pattern(stats.n_out):
+            stats.pop()
+
+        if stats.n_in < DEPTH and rng.random() < en_prob:
+            dut.addr_i.value = stats.n_in
+            dut.en_i.value = 1
+            stats.push()
+        else:
+            dut.en_i.value = 0
+        await FallingEdge(dut.clk_i)
+
+    dut.en_i.value = 0
+    return stats
+
+@cocotb.test()
+async def bench_full_rate(dut):
+    stats = await run(dut, 1.0)
+    write_result("sram_8x256", "full_rate", stats)
+
+@cocotb.test()
+async def bench_backpressure(dut):
+    stats = await run(dut, 0.5)
+    write_result("sram_8x256", "backpressure", stats)
+
+proj_path = Path("./rtl").resolve()
+BENCH = {
+    "toplevel": "sram_8x256",
+    "sources": [
+        proj_path / "sram/sram_8x256.sv",
+        proj_path / "lib/sram/cells/gf180mcu_ocd_ip_sram__sram256x8m8wm1/gf180mcu_ocd_ip_sram__sram256x8m8wm1.v",
+    ],
+    # the gf180 macro model is only used with icarus (see test_sram.py)
+    "sims": ["icarus"],
+}
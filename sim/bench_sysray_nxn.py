@@ -0,0 +1,76 @@
+import cocotb
+from cocotb.triggers import FallingEdge
+from shared import clock_start, reset_sequence
+from bench import BenchStats, write_result, bench_random
+from test_sysray_nxn import load_weights, SOURCES
+
+M = 128
+
+async def run(dut, issue_prob):
+    """
+    Streams M activation vectors through preloaded weights with the usual
+    diagonal skew. A vector is an item from its first element entering row 0
+    until the last column produces its psum. The array has no ready, so
+    backpressure means random gaps between vectors.
+    """
+    N = dut.N.value.to_unsigned()
+    rng = bench_random()
+
+    for i in range(N):
+        dut.act_valid_n_i[i].value = 0
+        dut.act_n_i[i].value = 0
+        dut.act_sel_n_i[i].value = 0
+        dut.weight_valid_n_i[i].value = 0
+        dut.weight_n_i[i].value = 0
+        dut.weight_sel_n_i[i].value = 0
+        dut.psum_valid_n_i[i].value = 0
+        dut.psum_n_i[i].value = 0
+    await clock_start(dut.clk_i)
+    await reset_sequence(dut.clk_i, dut.rst_i)
+
+    weights = [[rng.randint(-128, 127) for _ in range(N)] for _ in range(N)]
+    acts = [[rng.randint(-128, 127) for _ in range(N)] for _ in range(M)]
+    await load_weights(dut, N, weights)
+    await FallingEdge(dut.clk_i)
+
+    stats = BenchStats(dut.clk_i)
+    # issue cycle of each vector -> vector index; row i sees vector m at slot + i
+    slots = {}
+    cycle = 0
+    while stats.n_out < M:
+        if dut.psum_out_valid_n_o[N-1].value == 1:
+            stats.pop()
+
+        if stats.n_in < M and rng.random() < issue_prob:
+            slots[cycle] = stats.n_in
+            stats.push()
+        for i in range(N):
+            m = slots.get(cycle - i)
+            if m is not None:
+                dut.act_n_i[i].value = acts[m][i]
+                dut.act_valid_n_i[i].value = 1
+            else:
+                dut.act_n_i[i].value = 0
+                dut.act_valid_n_i[i].value = 0
+        cycle += 1
+        await FallingEdge(dut.clk_i)
+
+    for i in range(N):
+        dut.act_valid_n_i[i].value = 0
+    return stats
+
+@cocotb.test()
+async def bench_full_rate(dut):
+    stats = await run(dut, 1.0)
+    write_result("sysray_nxn", "full_rate", stats)
+
+@cocotb.test()
+async def bench_backpressure(dut):
+    stats = await run(dut, 0.5)
+    write_result("sysray_nxn", "backpressure", stats)
+
+BENCH = {
+    "toplevel": "sysray_nxn",
+    "sources": SOURCES,
+    "parameters": [{"N": 8}, {"N": 16}],
+}
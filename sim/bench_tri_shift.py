@@ -0,0 +1,64 @@
+import cocotb
+from cocotb.triggers import FallingEdge
+from pathlib import Path
+from shared import clock_start, reset_sequence
+from bench import BenchStats, write_result, bench_random
+
+N_ITEMS = 256
+
+async def run(dut, enable_prob):
+    """
+    Shifts N_ITEMS numbered vectors through; the last (deepest) lane is the one timed.
+
+    enable_i is the only flow control, so backpressure means random enable gaps.
+    """
+    N = dut.N.value.to_unsigned()
+    DATA_W = dut.DATA_W.value.to_unsigned()
+    assert N_ITEMS < (1 << DATA_W)
+    rng = bench_random()
+
+    dut.enable_i.value = 0
+    for lane in range(N):
+        dut.data_i[lane].value = 0
+    await clock_start(dut.clk)
+    await reset_sequence(dut.clk, dut.rst)
+
+    stats = BenchStats(dut.clk)
+    # items are numbered from 1 so the reset value never matches
+    expected = 1
+    while stats.n_out < N_ITEMS:
+        if dut.data_o[N-1].value.to_unsigned() == expected:
+            stats.pop()
+            expected += 1
+
+        enable = rng.random() < enable_prob
+        dut.enable_i.value = int(enable)
+        if enable:
+            item = stats.n_in + 1 if stats.n_in < N_ITEMS else 0
+            for lane in range(N):
+                dut.data_i[lane].value = item
+            if item:
+                stats.push()
+        await FallingEdge(dut.clk)
+
+    dut.enable_i.value = 0
+    return stats
+
+@cocotb.test()
+async def bench_full_rate(dut):
+    stats = await run(dut, 1.0)
+    write_result("tri_shift", "full_rate", stats)
+
+@cocotb.test()
+async def bench_backpressure(dut):
+    stats = await run(dut, 0.5)
+    write_result("tri_shift", "backpressure", stats)
+
+BENCH = {
+    "toplevel": "tri_shift",
+    "sources": [
+        Path("./rtl/tri_shift.sv").resolve(),
+        Path("./rtl/utils/shift.sv").resolve(),
+    ],
+    "parameters": [{"N": 8, "DATA_W": 16}],
+}
@@ -0,0 +1,76 @@
+"""
+Encoder for the SlugTPU instruction set executed by rtl/control_unit.sv.
+
+Every instruction is 64 bits, stored as two little-endian 32-bit words:
+
+    word0[3:0]    opcode
+    word0[4]      sync: issue only once every unit is idle
+    word0[5]      flag: DO_RELU enable
+    word0[15:8]   length (SRAM words / activation rows)
+    word0[23:16]  SRAM address
+    word1         DRAM address (GMEM2SMEM / SMEM2GMEM), output SRAM address (MATMUL)
+
+The control unit only orders instructions that use the same unit (and the
+weight double buffer); when an instruction consumes data another unit
+produces, set sync on it.
+
+    program = [
+        Instruction("gmem2smem", sram_addr=0, length=8, dram_addr=0x1000),
+        Instruction("load_weights", sram_addr=0, length=8),
+        Instruction("matmul", sram_addr=0, length=8, dram_addr=0x40, sync=True),
+        Instruction("exit"),
+    ]
+    mem.write_bytes(0x0, to_bytes(program))
+"""
+import struct
+from dataclasses import dataclass
+
+OPCODES = {
+    "exit":         0,
+    "gmem2smem":    1,
+    "smem2gmem":    2,
+    "load_bias":    3,
+    "load_zp":      4,
+    "load_scale":   5,
+    "load_weights": 6,
+    "matmul":       7,
+    "do_relu":      8,
+    "to_host_spi":  9,
+}
+MNEMONICS = {v: k for k, v in OPCODES.items()}
+
+INSTR_BYTES = 8
+
+@dataclass
+class Instruction:
+    op: str
+    sram_addr: int = 0
+    length: int = 0
+    dram_addr: int = 0
+    sync: bool = False
+    flag: bool = False
+
+def encode(inst):
+    """Returns the instruction as (word0, word1)."""
+    if inst.op not in OPCODES:
+        raise ValueError(f"Unknown opcode '{inst.op}', expected one of {list(OPCODES)}")
+    for name, value, bits in (("length", inst.length, 8), ("sram_addr", inst.sram_addr, 8), ("dram_addr", inst.dram_addr, 32)):
+        if not 0 <= value < (1 << bits):
+            raise ValueError(f"{inst.op}: {name}={value} does not fit in {bits} bits")
+    word0 = OPCODES[inst.op] | (int(inst.sync) << 4) | (int(inst.flag) << 5) | (inst.length << 8) | (inst.sram_addr << 16)
+    return word0, inst.dram_addr
+
+def decode(word0, word1):
+    return Instruction(MNEMONICS[word0 & 0xF], sram_addr=(word0 >> 16) & 0xFF, length=(word0 >> 8) & 0xFF,
+                       dram_addr=word1, sync=bool(word0 & 0x10), flag=bool(word0 & 0x20))
+
+def assemble(program):
+    """32-bit words of a list of Instructions, in memory order."""
+    words = []
+    for inst in program:
+        words += encode(inst)
+    return words
+
+def to_bytes(program):
+    """Little-endian memory image of a program, for WishboneMemory.write_bytes()."""
+    return struct.pack(f"<{2 * len(program)}I", *assemble(program))
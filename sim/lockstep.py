@@ -0,0 +1,184 @@
+"""
+Lockstep co-simulation of an RTL DUT against a cycle-accurate Python model.
+
+Every cycle the same inputs go into the DUT and the model, and their outputs
+are compared (a handful of handle reads). Every check_every cycles the whole
+register state is read from the DUT and compared against the model by hash;
+a matching state becomes the new checkpoint. On any mismatch the harness
+rewinds both sides to the last checkpoint (registers are deposited back into
+the DUT), replays the recorded inputs and bisects for the first cycle whose
+state differs, then raises Divergence with the registers that differ there.
+
+So a long randomized run costs one cheap output compare per cycle, and a
+failure points at the exact cycle and PE register that went wrong instead of
+an output mismatch thousands of cycles later.
+
+A model needs step(inputs), outputs(), state(), load_state(state), save() and
+restore(saved) (see refmodel.sysray.SysrayModel). A probe knows the RTL side
+of the same design: apply(dut, inputs), outputs(dut), state(dut) and
+load_state(dut, state), using the same keys as the model.
+"""
+import cocotb
+import numpy as np
+from cocotb.triggers import FallingEdge
+from refmodel.sysray import state_hash
+from sysray_schedule import drive_inputs
+
+class Divergence(AssertionError):
+    """The DUT and the model first disagreed after cycle `cycle` (counted from Lockstep.start())."""
+    def __init__(self, cycle, diffs):
+        self.cycle = cycle
+        self.diffs = diffs
+        lines = [f"RTL and model diverge at cycle {cycle}:"]
+        for name, idx, rtl, model in diffs[:16]:
+            lines.append(f"  {name}{list(idx)}: rtl {rtl}, model {model}")
+        if len(diffs) > 16:
+            lines.append(f"  ... {len(diffs) - 16} more")
+        super().__init__("\n".join(lines))
+
+def diff_states(rtl, model):
+    """[(register, index, rtl value, model value)] for every entry that differs."""
+    diffs = []
+    for name in model:
+        r = np.asarray(rtl[name])
+        m = np.asarray(model[name])
+        for idx in np.argwhere(r != m):
+            idx = tuple(int(i) for i in idx)
+            diffs.append((name, idx, int(r[idx]), int(m[idx])))
+    return diffs
+
+class Lockstep():
+    def __init__(self, dut, clk_i, model, probe, check_every=64):
+        self.dut = dut
+        self.clk_i = clk_i
+        self.model = model
+        self.probe = probe
+        self.check_every = check_every
+        self.cycle = 0
+        # number of full state reads, to keep an eye on the cost
+        self.full_checks = 0
+
+    def start(self):
+        """Copies the DUT's current register state into the model. Call on a falling edge, after reset."""
+        self.model.load_state(self.probe.state(self.dut))
+        self.model.cycle = 0
+        self.cycle = 0
+        self._checkpoint()
+
+    def _checkpoint(self):
+        self.saved = self.model.save()
+        self.saved_cycle = self.cycle
+        self.replay = []
+
+    def matches(self):
+        """Reads the whole DUT state and compares it with the model."""
+        self.full_checks += 1
+        return state_hash(self.probe.state(self.dut)) == state_hash(self.model.state())
+
+    async def _run(self, inputs):
+        self.probe.apply(self.dut, inputs)
+        self.model.step(inputs)
+        await FallingEdge(self.clk_i)
+
+    async def step(self, inputs):
+        """Runs one cycle with inputs on both sides. Call on a falling edge; returns on the next one."""
+        self.replay.append(inputs)
+        await self._run(inputs)
+        self.cycle += 1
+
+        outputs_ok = self.probe.outputs(self.dut) == self.model.outputs()
+        if outputs_ok and self.cycle - self.saved_cycle < self.check_every:
+            return
+        if outputs_ok and self.matches():
+            self._checkpoint()
+            return
+        await self._bisect()
+
+    async def _rewind(self, saved):
+        self.model.restore(saved)
+        self.probe.load_state(self.dut, self.model.state())
+
+    async def _bisect(self):
+        """
+        State matched after replay[:lo] and differs after replay[:hi]. Halve the
+        interval by rewinding to lo and replaying to the midpoint, until the first
+        differing cycle is found. If the design diverges and reconverges more than
+        once in the interval, this finds one of the first cycles of a divergence.
+        """
+        lo, hi = 0, len(self.replay)
+        lo_saved = self.saved
+        while hi - lo > 1:
+            mid = (lo + hi) // 2
+            await self._rewind(lo_saved)
+            for inputs in self.replay[lo:mid]:
+                await self._run(inputs)
+            if self.matches():
+                lo, lo_saved = mid, self.model.save()
+            else:
+                hi = mid
+
+        await self._rewind(lo_saved)
+        await self._run(self.replay[lo])
+        cycle = self.saved_cycle + hi
+        diffs = diff_states(self.probe.state(self.dut), self.model.state())
+        cocotb.log.info(f"[lockstep] first divergence at cycle {cycle}, {len(diffs)} registers differ "
+                        f"({self.full_checks} full state checks)")
+        raise Divergence(cycle, diffs)
+
+def _read(handle, signed=False):
+    v = handle.value
+    if not v.is_resolvable:
+        # never equal to a model value
+        return -(1 << 62)
+    return v.to_signed() if signed else v.to_unsigned()
+
+class SysrayProbe():
+    """RTL side of refmodel.sysray.SysrayModel: the PE registers of sysray_nxn."""
+    def __init__(self, dut, N):
+        self.N = N
+        # handle lookups are slow; resolve every PE once
+        self.pes = [[dut.row_block[r].col_block[c].pe_ij for c in range(N)] for r in range(N)]
+
+    def apply(self, dut, inputs):
+        drive_inputs(dut, inputs)
+
+    def outputs(self, dut):
+        return {
+            "psum_out": [_read(dut.psum_out_n_o[c], signed=True) for c in range(self.N)],
+            "psum_out_valid": [_read(dut.psum_out_valid_n_o[c]) for c in range(self.N)],
+        }
+
+    def state(self, dut):
+        N = self.N
+        st = {
+            "weight_buf": np.zeros((N, N, 2), dtype=np.int64),
+            "prev_weight_sel": np.zeros((N, N), dtype=np.int64),
+            "psum_o": np.zeros((N, N), dtype=np.int64),
+            "psum_valid_o": np.zeros((N, N), dtype=np.int64),
+            "act_o": np.zeros((N, N), dtype=np.int64),
+            "act_valid_o": np.zeros((N, N), dtype=np.int64),
+        }
+        for r in range(N):
+            for c in range(N):
+                pe = self.pes[r][c]
+                st["weight_buf"][r, c, 0] = _read(pe.weight_buf[0])
+                st["weight_buf"][r, c, 1] = _read(pe.weight_buf[1])
+                st["prev_weight_sel"][r, c] = _read(pe.prev_weight_sel)
+                st["psum_o"][r, c] = _read(pe.psum_o, signed=True)
+                st["psum_valid_o"][r, c] = _read(pe.psum_valid_o)
+                st["act_o"][r, c] = _read(pe.act_o)
+                st["act_valid_o"][r, c] = _read(pe.act_valid_o)
+        return st
+
+    def load_state(self, dut, state):
+        """Deposits register values into every PE; they take effect before the next rising edge."""
+        for r in range(self.N):
+            for c in range(self.N):
+                pe = self.pes[r][c]
+                pe.weight_buf[0].value = int(state["weight_buf"][r, c, 0])
+                pe.weight_buf[1].value = int(state["weight_buf"][r, c, 1])
+                pe.prev_weight_sel.value = int(state["prev_weight_sel"][r, c])
+                pe.psum_o.value = int(state["psum_o"][r, c])
+                pe.psum_valid_o.value = int(state["psum_valid_o"][r, c])
+                pe.act_o.value = int(state["act_o"][r, c])
+                pe.act_valid_o.value = int(state["act_valid_o"][r, c])
@@ -0,0 +1,51 @@
+"""
+Generates the activation table for the scalar pipe's LUT stage (lut_n.sv).
+
+The input scale and zero point are the quantization of the layer output (the
+values coming out of the quantizer), the output ones those of the activation
+output. Sigmoid and tanh default to TFLite's fixed output quantization. The
+table is printed, or written with --hex, as read bus words in the order
+scalar_stage loads them with load_lut_en_i.
+
+Usage (from the repo root):
+    python3 sim/lut_gen.py sigmoid --in-scale 0.0625 --in-zp 0
+    python3 sim/lut_gen.py tanh --in-scale 0.03 --in-zp -5 --hex tanh_lut.hex
+    python3 sim/lut_gen.py relu6 --in-scale 0.05 --in-zp -128 --out-scale 0.0235 --out-zp -128
+"""
+import sys
+import argparse
+from refmodel import lut_table, pack_lut
+from refmodel.lut import ACTIVATIONS
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the int8 activation table for lut_n")
+    parser.add_argument("fn", choices=sorted(ACTIVATIONS), help="activation")
+    parser.add_argument("--in-scale", type=float, required=True, help="input (quantizer output) scale")
+    parser.add_argument("--in-zp", type=int, default=0, help="input zero point")
+    parser.add_argument("--out-scale", type=float, default=None, help="output scale (default: TFLite's for fn)")
+    parser.add_argument("--out-zp", type=int, default=None, help="output zero point (default: TFLite's for fn)")
+    parser.add_argument("--bus-w", type=int, default=64, help="read bus width in bits")
+    parser.add_argument("--hex", default=None, help="write the bus words to this file, one per line")
+    args = parser.parse_args()
+
+    if (args.out_scale is None) != (args.out_zp is None):
+        parser.error("give both --out-scale and --out-zp, or neither")
+    try:
+        table = lut_table(args.fn, args.in_scale, args.in_zp, args.out_scale, args.out_zp)
+    except KeyError:
+        parser.error(f"{args.fn} has no default output quantization, give --out-scale and --out-zp")
+
+    words = pack_lut(table, args.bus_w)
+    digits = args.bus_w // 4
+    lines = [f"{w:0{digits}x}" for w in words]
+    if args.hex:
+        with open(args.hex, "w") as f:
+            f.write("\n".join(lines) + "\n")
+        print(f"{len(words)} words written to {args.hex}")
+    else:
+        for q in range(-128, 128, 16):
+            print(f"{q:5d}: " + " ".join(f"{int(table[v & 0xFF]):4d}" for v in range(q, q + 16)))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
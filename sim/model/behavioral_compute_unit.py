@@ -288,6 +288,7 @@ class TPU_Compute_Unit:
         print("Simulation Passed!")
 
 
-t = TPU_Compute_Unit()
-#t.sim()
-t.basic_correctness_test()
\ No newline at end of file
+if __name__ == "__main__":
+    t = TPU_Compute_Unit()
+    #t.sim()
+    t.basic_correctness_test()
\ No newline at end of file
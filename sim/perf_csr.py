@@ -0,0 +1,110 @@
+"""
+Host side of rtl/perf_counters.sv.
+
+The counters sit in the CSR window of wb_mux_2to1.sv (CSR_BASE, 0xF000_0000
+by default), which the SPI bridge can reach at any time, also while the TPU
+runs. read_counters() takes any read_word(addr)/write_word(addr, data) pair
+(spibone, a LiteX RemoteClient, the cocotb Wishbone master in
+test_perf_counters.py), freezes the counters so the set is consistent, reads
+them and lets them run again. utilization() turns a set into fractions.
+
+The CLI decodes counter values read by other means, in register order:
+    python3 sim/perf_csr.py CYCLES ARRAY_BUSY WEIGHT_LOAD SCALAR_STALL SRAM_READS SRAM_WRITES WB_WAIT
+
+Usage (from the repo root):
+    python3 sim/perf_csr.py 100000 61250 8192 1200 40960 12288 3100
+    python3 sim/perf_csr.py 0x186a0 0xef42 0x2000 0x4b0 0xa000 0x3000 0xc1c --json perf.json
+"""
+import sys
+import json
+import argparse
+
+CSR_BASE = 0xF000_0000
+
+CTRL_ENABLE = 1 << 0
+CTRL_CLEAR = 1 << 1
+
+# byte offsets from CSR_BASE
+PERF_REGS = {
+    "ctrl": 0x00,
+    "cycles": 0x04,
+    "array_busy": 0x08,
+    "weight_load": 0x0C,
+    "scalar_stall": 0x10,
+    "sram_reads": 0x14,
+    "sram_writes": 0x18,
+    # TPU bus cycles with a request stalled or waiting for its ack (B4 pipelined)
+    "wb_wait": 0x1C,
+}
+
+COUNTERS = [name for name in PERF_REGS if name != "ctrl"]
+
+def read_counters(read_word, write_word, base=CSR_BASE, resume=True):
+    """Freezes the counters, reads all of them and (with resume) enables them again. Returns a dict."""
+    write_word(base + PERF_REGS["ctrl"], 0)
+    counters = {name: read_word(base + PERF_REGS[name]) for name in COUNTERS}
+    if resume:
+        write_word(base + PERF_REGS["ctrl"], CTRL_ENABLE)
+    return counters
+
+def clear_counters(write_word, base=CSR_BASE):
+    """Zeroes all counters and leaves them counting."""
+    write_word(base + PERF_REGS["ctrl"], CTRL_CLEAR | CTRL_ENABLE)
+
+def decode(words):
+    """Register values in address order (with or without CTRL first) to a dict of counters."""
+    if len(words) == len(COUNTERS) + 1:
+        words = words[1:]
+    if len(words) != len(COUNTERS):
+        raise ValueError(f"expected {len(COUNTERS)} counter values, got {len(words)}")
+    return dict(zip(COUNTERS, (w & 0xFFFFFFFF for w in words)))
+
+def delta(before, after):
+    """Per-counter difference of two reads, correct across one 32-bit wrap."""
+    return {name: (after[name] - before[name]) & 0xFFFFFFFF for name in COUNTERS}
+
+def utilization(counters):
+    """Fractions of counted cycles, plus SRAM accesses per cycle."""
+    cycles = counters["cycles"]
+    def frac(n):
+        return n / cycles if cycles else 0.0
+    return {
+        "cycles": cycles,
+        "array_busy": frac(counters["array_busy"]),
+        "weight_load": frac(counters["weight_load"]),
+        "scalar_stall": frac(counters["scalar_stall"]),
+        "sram_reads_per_cycle": frac(counters["sram_reads"]),
+        "sram_writes_per_cycle": frac(counters["sram_writes"]),
+        "wb_wait": frac(counters["wb_wait"]),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Decode perf_counters values into utilization")
+    parser.add_argument("values", nargs="+", type=lambda s: int(s, 0),
+                        help="counter values in register order, optionally starting with CTRL")
+    parser.add_argument("--json", default=None, help="also write the results to this file")
+    args = parser.parse_args()
+
+    try:
+        counters = decode(args.values)
+    except ValueError as e:
+        parser.error(str(e))
+    util = utilization(counters)
+
+    for name in COUNTERS:
+        print(f"{name:>14s} {counters[name]:12d}")
+    print()
+    print(f"{'array busy':>22s} {100 * util['array_busy']:6.1f} %")
+    print(f"{'weight load':>22s} {100 * util['weight_load']:6.1f} %")
+    print(f"{'scalar stall':>22s} {100 * util['scalar_stall']:6.1f} %")
+    print(f"{'wishbone wait':>22s} {100 * util['wb_wait']:6.1f} %")
+    print(f"{'SRAM reads / cycle':>22s} {util['sram_reads_per_cycle']:8.3f}")
+    print(f"{'SRAM writes / cycle':>22s} {util['sram_writes_per_cycle']:8.3f}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"counters": counters, "utilization": util}, f, indent=2)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
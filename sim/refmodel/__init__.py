@@ -0,0 +1,43 @@
+"""
+Reference models for the testbenches, importable without cocotb, pytest or a simulator.
+
+Names are resolved lazily: `from refmodel import quantize` only imports
+refmodel/fixed.py, and numpy is only loaded once a matmul helper is used, so
+tools and process-pool workers can import the package cheaply. No submodule
+does any work at import time.
+"""
+import importlib
+
+# public name -> submodule defining it
+_EXPORTS = {
+    "float_to_fixed": "fixed",
+    "fixed_to_float": "fixed",
+    "quantize": "fixed",
+    "quantize_fixed": "fixed",
+    "relu": "scalar",
+    "scalar_pipe_ref": "scalar",
+    "make_rng": "matmul",
+    "random_matrix": "matmul",
+    "wrap": "matmul",
+    "matmul_ref": "matmul",
+    "k_tile_psums": "matmul",
+    "assert_matrix_equal": "matmul",
+    "lut_table": "lut",
+    "lut_ref": "lut",
+    "pack_lut": "lut",
+    "SysrayModel": "sysray",
+    "state_hash": "sysray",
+}
+
+__all__ = list(_EXPORTS)
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{_EXPORTS[name]}", __name__), name)
+    # cache it so later lookups skip __getattr__
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -0,0 +1,25 @@
+"""Fixed-point helpers and the quantizer_mul.sv reference."""
+import math
+
+def float_to_fixed(f_val, frac_bits):
+    """Converts a float to a fixed-point integer with rounding."""
+    scaling_factor = 1 << frac_bits
+    return int(f_val * scaling_factor + 0.5)
+
+def fixed_to_float(fixed_val, frac_bits):
+    """Converts a fixed-point integer back to a float."""
+    scaling_factor = 1 << frac_bits
+    return float(fixed_val) / scaling_factor
+
+def quantize(x, m0):
+    """Matches quantizer_mul.sv: multiply, round, shift, saturate. m0 is the scale as a float."""
+    return max(-128,
+           min(127,
+           math.floor(x * m0 + 0.5)))
+
+def quantize_fixed(psum, m0, shift=16):
+    """Bit exact quantizer_mul.sv with m0 as a fixed-point integer with shift fractional bits."""
+    product = psum * m0
+    rounded = product + (1 << (shift - 1))
+    shifted = rounded >> shift
+    return max(-128, min(127, shifted))
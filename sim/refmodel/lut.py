@@ -0,0 +1,53 @@
+"""
+Activation tables for lut_n.sv and their vectorized reference.
+
+A table maps every int8 value q, dequantized with the input scale and zero
+point (real = in_scale * (q - in_zp)), through an activation and requantizes
+the result with the output scale and zero point, like TFLite's int8 LOGISTIC
+and TANH kernels. Entries are indexed by the input byte, q & 0xFF.
+"""
+import numpy as np
+
+ACTIVATIONS = {
+    "sigmoid": lambda x: 1.0 / (1.0 + np.exp(-x)),
+    "tanh": np.tanh,
+    "relu6": lambda x: np.clip(x, 0.0, 6.0),
+    "identity": lambda x: x,
+}
+
+# TFLite's fixed output quantization for these ops
+TFLITE_OUTPUT = {
+    "sigmoid": (1.0 / 256, -128),
+    "tanh": (1.0 / 128, 0),
+}
+
+def lut_table(fn, in_scale, in_zp, out_scale=None, out_zp=None):
+    """
+    256-entry int8 table for activation fn (a name in ACTIVATIONS or a
+    vectorized callable). out_scale/out_zp default to TFLite's values for fn.
+    """
+    if out_scale is None or out_zp is None:
+        out_scale, out_zp = TFLITE_OUTPUT[fn]
+    f = ACTIVATIONS[fn] if isinstance(fn, str) else fn
+    q = np.arange(256, dtype=np.int64)
+    q = np.where(q >= 128, q - 256, q)
+    real = f(in_scale * (q - in_zp))
+    return np.clip(np.round(real / out_scale) + out_zp, -128, 127).astype(np.int64)
+
+def lut_ref(q, table):
+    """Looks every int8 value in q up in table, elementwise."""
+    return np.asarray(table, dtype=np.int64)[np.asarray(q, dtype=np.int64) & 0xFF]
+
+def pack_lut(table, bus_w=64):
+    """
+    The table as read bus words for load_scalar_data: bus_w // 8 entries per
+    word, lowest entry in the low byte, in load order.
+    """
+    per_word = bus_w // 8
+    words = []
+    for w in range(0, 256, per_word):
+        word = 0
+        for i, v in enumerate(table[w:w + per_word]):
+            word |= (int(v) & 0xFF) << (8 * i)
+        words.append(word)
+    return words
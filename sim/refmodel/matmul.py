@@ -0,0 +1,79 @@
+"""
+Vectorized reference model and stimulus for the systolic array testbenches.
+
+All matrices are int64 NumPy arrays. Accumulation happens in int64 and is
+then wrapped to the accumulator width, which matches the hardware as long
+as no intermediate sum overflows int64 (for 8-bit operands that means
+K < 2**48).
+"""
+import random
+import numpy as np
+
+def make_rng(seed=None):
+    """
+    NumPy generator for bulk stimulus.
+
+    Without a seed it is derived from Python's random module, which cocotb
+    seeds from COCOTB_RANDOM_SEED, so a failing test still reproduces from
+    its logged seed.
+    """
+    if seed is None:
+        seed = random.getrandbits(64)
+    return np.random.default_rng(seed)
+
+def random_matrix(rng, rows, cols, width=8):
+    """rows x cols matrix of random signed width-bit values."""
+    lo = -(1 << (width - 1))
+    hi = (1 << (width - 1)) - 1
+    return rng.integers(lo, hi, size=(rows, cols), endpoint=True, dtype=np.int64)
+
+def wrap(x, width=32):
+    """Wraps int64 values to signed width-bit two's complement, like a width-bit register."""
+    x = np.asarray(x, dtype=np.int64)
+    mask = (1 << width) - 1
+    sign = 1 << (width - 1)
+    return ((x & mask) ^ sign) - sign
+
+def matmul_ref(acts, weights, acc_width=32):
+    """
+    acts @ weights with acc_width-bit wraparound.
+
+    acts is M x K (one activation vector per row), weights is K x N; the
+    result is M x N. A 1-D acts gives a 1-D result (vector @ matrix).
+    """
+    acts = np.asarray(acts, dtype=np.int64)
+    weights = np.asarray(weights, dtype=np.int64)
+    return wrap(acts @ weights, acc_width)
+
+def k_tile_psums(acts, weights, k_tile, acc_width=32):
+    """
+    Splits acts @ weights along K into passes of k_tile: returns the list of
+    partial M x N products, each wrapped to acc_width like the array's output.
+    Summing them with wraparound gives matmul_ref(acts, weights).
+    """
+    acts = np.asarray(acts, dtype=np.int64)
+    weights = np.asarray(weights, dtype=np.int64)
+    K = acts.shape[-1]
+    return [matmul_ref(acts[..., k:k + k_tile], weights[k:k + k_tile], acc_width) for k in range(0, K, k_tile)]
+
+def assert_matrix_equal(got, expected, what="output"):
+    """
+    Compares whole matrices at once. On mismatch, reports the number of wrong
+    entries and the first (row-major) mismatching index with both values.
+    """
+    # testbench result grids hold None where no output was captured
+    missing = np.argwhere(np.vectorize(lambda v: v is None, otypes=[bool])(np.asarray(got, dtype=object)))
+    if len(missing) > 0:
+        raise AssertionError(f"{what}: {len(missing)} entries not captured, first at {missing[0].tolist()}")
+
+    got = np.asarray(got, dtype=np.int64)
+    expected = np.asarray(expected, dtype=np.int64)
+    assert got.shape == expected.shape, f"{what}: shape {got.shape}, expected {expected.shape}"
+
+    bad = np.argwhere(got != expected)
+    if len(bad) > 0:
+        idx = tuple(int(i) for i in bad[0])
+        raise AssertionError(
+            f"{what}: {len(bad)} of {got.size} entries differ, first at {list(idx)}: "
+            f"expected {expected[idx]}, got {got[idx]}"
+        )
@@ -0,0 +1,16 @@
+"""Reference for the scalar post-processing pipeline (scalar_pipe.sv)."""
+from .fixed import quantize_fixed
+
+def relu(x):
+    return max(0, x)
+
+def scalar_pipe_ref(data, bias, zp, scale, shift=16):
+    """bias -> relu -> sub zp -> quantize, per lane. scale is fixed-point with shift fractional bits."""
+    out =[]
+    for i in range(len(data)):
+        v = data[i] + bias[i]
+        v = relu(v)
+        v = v - zp[i]
+        v = quantize_fixed(v, scale[i], shift)
+        out.append(v)
+    return out
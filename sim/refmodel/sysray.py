@@ -0,0 +1,114 @@
+"""
+Cycle-accurate model of sysray_nxn (rtl/sysray/sysray_nxn.sv, pe.sv).
+
+step() is one rising clock edge. The state is exactly the PE registers,
+held as N x N arrays indexed [row, col], so it can be compared against the
+RTL register by register. Values that carry a select bit (act_o, weight_buf)
+are stored as the RTL stores them: {sel, data} as an unsigned
+(data_width + 1)-bit number.
+"""
+import hashlib
+import numpy as np
+from .matmul import wrap
+
+class SysrayModel():
+    # PE registers, in the order they are compared and hashed
+    REGISTERS = ("weight_buf", "prev_weight_sel", "psum_o", "psum_valid_o", "act_o", "act_valid_o")
+
+    def __init__(self, N, data_width=8, acc_width=32):
+        self.N = N
+        self.data_width = data_width
+        self.acc_width = acc_width
+        self.reset()
+
+    def reset(self):
+        N = self.N
+        self.cycle = 0
+        self.weight_buf = np.zeros((N, N, 2), dtype=np.int64)
+        self.prev_weight_sel = np.zeros((N, N), dtype=np.int64)
+        self.psum_o = np.zeros((N, N), dtype=np.int64)
+        self.psum_valid_o = np.zeros((N, N), dtype=np.int64)
+        self.act_o = np.zeros((N, N), dtype=np.int64)
+        self.act_valid_o = np.zeros((N, N), dtype=np.int64)
+
+    def _pack(self, sel, data):
+        return (np.asarray(sel, dtype=np.int64) << self.data_width) | (np.asarray(data, dtype=np.int64) & ((1 << self.data_width) - 1))
+
+    def step(self, inp):
+        """
+        Advances one cycle with the inputs held during it (one dict as yielded by
+        BankScheduler.inputs(): act, act_sel, act_valid per row, weight,
+        weight_sel, weight_valid per column).
+        """
+        N, dw = self.N, self.data_width
+        cols = np.arange(N)
+
+        # weights: combinational down each column, weight_o reads the settled bank
+        w_in = np.zeros((N, N), dtype=np.int64)
+        wv_in = np.zeros((N, N), dtype=np.int64)
+        w = self._pack(inp["weight_sel"], inp["weight"])
+        v = np.asarray(inp["weight_valid"], dtype=np.int64)
+        for r in range(N):
+            w_in[r] = w
+            wv_in[r] = v
+            edge = self.prev_weight_sel[r] != (w >> dw)
+            v = v & ~edge
+            w = self.weight_buf[r, cols, self.prev_weight_sel[r]]
+
+        # activations enter column 0 and move one PE right per cycle
+        a_in = np.empty((N, N), dtype=np.int64)
+        av_in = np.empty((N, N), dtype=np.int64)
+        a_in[:, 0] = self._pack(inp["act_sel"], inp["act"])
+        av_in[:, 0] = inp["act_valid"]
+        a_in[:, 1:] = self.act_o[:, :-1]
+        av_in[:, 1:] = self.act_valid_o[:, :-1]
+
+        # partial sums: row 0 starts from 0 (always valid), others from the PE above
+        p_in = np.zeros((N, N), dtype=np.int64)
+        pv_in = np.ones((N, N), dtype=np.int64)
+        p_in[1:] = self.psum_o[:-1]
+        pv_in[1:] = self.psum_valid_o[:-1]
+
+        active_weight = wrap(np.take_along_axis(self.weight_buf, (a_in >> dw)[..., None], axis=2)[..., 0], dw)
+        fire = av_in & pv_in
+        psum = np.where(fire == 1, wrap(p_in + wrap(a_in, dw) * active_weight, self.acc_width), 0)
+
+        # register updates
+        w_sel_in = w_in >> dw
+        self.prev_weight_sel = np.where(self.prev_weight_sel != w_sel_in, w_sel_in, self.prev_weight_sel)
+        buf = self.weight_buf.copy()
+        np.put_along_axis(buf, w_sel_in[..., None], w_in[..., None], axis=2)
+        self.weight_buf = np.where(wv_in[..., None] == 1, buf, self.weight_buf)
+        self.psum_o = psum
+        self.psum_valid_o = fire
+        self.act_o = a_in
+        self.act_valid_o = av_in
+        self.cycle += 1
+
+    def outputs(self):
+        """psum_out_n_o and psum_out_valid_n_o as lists, one entry per column."""
+        return {"psum_out": self.psum_o[-1].tolist(), "psum_out_valid": self.psum_valid_o[-1].tolist()}
+
+    def state(self):
+        """Copies of the PE registers, see REGISTERS."""
+        return {name: getattr(self, name).copy() for name in self.REGISTERS}
+
+    def load_state(self, state):
+        for name in self.REGISTERS:
+            setattr(self, name, np.asarray(state[name], dtype=np.int64).copy())
+
+    def save(self):
+        """Everything needed to resume the model later, including the cycle count."""
+        return (self.cycle, self.state())
+
+    def restore(self, saved):
+        self.cycle, state = saved
+        self.load_state(state)
+
+def state_hash(state):
+    """Short hash of a state dict of integer arrays, independent of dtype."""
+    h = hashlib.blake2b(digest_size=8)
+    for name in sorted(state):
+        h.update(name.encode())
+        h.update(np.ascontiguousarray(state[name], dtype=np.int64).tobytes())
+    return h.hexdigest()
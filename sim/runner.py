@@ -1,36 +1,198 @@
 from __future__ import annotations
 import os
 import random
+import time
+import json
+import hashlib
+import multiprocessing
 from pathlib import Path
+from xml.etree import ElementTree
 import cocotb
+import cocotb_tools.runner
 from cocotb_tools.runner import get_runner
 import pytest
 import sys
-import importlib
+import importlib.util
 from shared import stringify_dict
 
 LANGUAGE = os.getenv("HDL_TOPLEVEL_LANG", "verilog").lower().strip()
 
-def run_test(parameters, sources, module_name, hdl_toplevel, testcase=None, sims = ["icarus", "verilator"]):
+# every run appends one JSON record per testcase here (override with PERF_LOG=<path>)
+PERF_LOG = Path(os.getenv("PERF_LOG", "./sim_build/perf.jsonl"))
+# PROFILE=1 runs the Python side of the testbench under cProfile
+PROFILE = os.getenv("PROFILE", "0") == "1"
+# WAVES=1 traces every run. Otherwise runs are untraced and only failing testcases
+# are rebuilt and rerun with tracing, with the same seed.
+WAVES = os.getenv("WAVES", "0") == "1"
+# WAVES_WINDOW=<cycles> limits the failure rerun trace to the last <cycles> cycles (icarus only)
+WAVES_WINDOW = int(os.getenv("WAVES_WINDOW", "0"))
+# SNAPSHOTS=0/1 overrides the snapshots argument of run_test (see sim/snapshot.py)
+SNAPSHOTS = os.getenv("SNAPSHOTS")
+# SIM_PROFILE=<name> overrides the sim_profile argument of run_test; "auto" picks the
+# profile sim/autotune.py measured fastest for the module and parameters
+SIM_PROFILE = os.getenv("SIM_PROFILE")
+SIM_PROFILE_FILE = Path("./sim_build/sim_profiles.json")
+
+CPUS = multiprocessing.cpu_count()
+
+# Verilator build settings per profile (icarus has nothing comparable and ignores them).
+#   build_args: extra verilator arguments
+#   test_args:  extra arguments of the simulation run
+#   jobs:       parallel C++ compile jobs (cocotb defaults to 4)
+SIM_PROFILES = {
+    # verilator defaults. Unreset state starts at zero, so this does not find
+    # missing resets; use xcheck for that
+    "debug": {
+        "build_args": [],
+        "test_args": [],
+        "jobs": None,
+    },
+    # opt-in: X assignments and unreset state get a random value per bit.
+    # Verilator only randomises initial state with +verilator+rand+reset+2 at
+    # run time (the seed is +verilator+seed), so missing resets show up.
+    "xcheck": {
+        "build_args": ["--x-assign", "unique", "--x-initial", "unique"],
+        "test_args": ["+verilator+rand+reset+2"],
+        "jobs": None,
+    },
+    # X is resolved to whatever is cheapest and the model is split into many
+    # small files so the C++ compile parallelises. Can hide missing resets.
+    "fast": {
+        "build_args": ["-O3", "--x-assign", "fast", "--x-initial", "fast",
+                       "--output-split", "20000", "--output-split-cfuncs", "2000"],
+        "test_args": [],
+        "jobs": CPUS,
+    },
+    # fast + a multithreaded model, pays off for large designs (sysray_nxn at large N)
+    "max-throughput": {
+        "build_args": ["-O3", "--x-assign", "fast", "--x-initial", "fast",
+                       "--output-split", "20000", "--output-split-cfuncs", "2000",
+                       "--threads", str(min(CPUS, 8)), "-CFLAGS", "-O3"],
+        "test_args": [],
+        "jobs": CPUS,
+    },
+}
+
+def read_results(results_xml):
+    """Returns one dict per testcase (name, status, wall_s, sim_ns, seed) from a cocotb results file."""
+    cases = []
+    if not Path(results_xml).is_file():
+        return cases
+
+    for tc in ElementTree.parse(results_xml).getroot().iter("testcase"):
+        props = {p.get("name"): p.get("value") for p in tc.iter("property")}
+        status = "pass"
+        if tc.find("failure") is not None or tc.find("error") is not None:
+            status = "fail"
+        elif tc.find("skipped") is not None:
+            status = "skip"
+        cases.append({
+            "name": tc.get("name"),
+            "status": status,
+            "wall_s": float(tc.get("time", 0)),
+            "sim_ns": float(props.get("sim_time_duration", 0)),
+            "seed": props.get("random_seed"),
+        })
+    return cases
+
+def report_perf(records):
+    """Appends records to PERF_LOG and prints a one-line summary per testcase."""
+    PERF_LOG.parent.mkdir(parents=True, exist_ok=True)
+    with open(PERF_LOG, "a") as f:
+        for r in records:
+            f.write(json.dumps(r) + "\n")
+
+    for r in records:
+        print(f"[perf] {r['sim']:9s} {r['module']}::{r['testcase']} ({r['status']}) "
+              f"build={r['build_s']:.2f}s elab={r['elab_s']:.2f}s wall={r['wall_s']:.3f}s "
+              f"sim={r['sim_ns']:.0f}ns cycles={r['cycles']} ({r['cycles_per_s']:.0f} cycles/s)")
+
+def write_waves_window(build_dir, hdl_toplevel, start_ps):
+    """
+    Writes an icarus dump module that only starts tracing at start_ps.
+
+    Replaces cocotb's own dump module (which always traces from time 0) for
+    windowed failure reruns.
+    """
+    path = (build_dir / "waves_window.v").resolve()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(
+        "module waves_window();\n"
+        "initial begin\n"
+        f"    $dumpfile(\"{hdl_toplevel}.fst\");\n"
+        f"    #{start_ps} $dumpvars(0, {hdl_toplevel});\n"
+        "end\n"
+        "endmodule\n"
+    )
+    return path
+
+def snapshot_dir(sim, sources, parameters, module_name):
+    """
+    Directory for snapshot.checkpoint() files, shared by all testcases of one build configuration.
+
+    Keyed on the RTL and testbench contents so a stale snapshot is never restored.
+    """
+    h = hashlib.sha1()
+    for f in list(sources) + [importlib.util.find_spec(module_name).origin]:
+        if Path(f).is_file():
+            h.update(Path(f).read_bytes())
+    return Path("./sim_build", sim, module_name, "snapshots", stringify_dict(parameters), h.hexdigest()[:12]).resolve()
+
+def tuned_profile(module_name, parameters):
+    """Returns the profile sim/autotune.py picked for module_name at parameters, or "debug"."""
+    if not SIM_PROFILE_FILE.is_file():
+        return "debug"
+    tuned = json.loads(SIM_PROFILE_FILE.read_text()).get(module_name, {})
+    return tuned.get(stringify_dict(parameters), "debug")
+
+def build_and_test(sim, sources, parameters, module_name, hdl_toplevel, testcase, build_dir, waves,
+                   seed=None, window_start_ps=None, snapshots=None, sim_profile="debug", extra_env=None, build=True):
+    """
+    Builds and runs one simulator configuration.
+
+    extra_env is added to the test's environment. build=False reuses the build
+    already in build_dir (sim/shrink.py reruns one build many times).
+    Returns (passed, cases, build_s, test_s), where cases is read_results() of the run.
+    """
     timescale = ("1ps","1ps")
-    case_name = "all"
+    build_args = []
+    test_args = []
+    sources = list(sources)
 
-    if testcase is not None:
-        case_name = testcase
+    # extra stuff specifically for verilator
+    if (sim == "verilator" and waves):
+        build_args.append("--trace")
+        build_args.append("--trace-structs")
+        build_args.append("--trace-fst")
+        test_args = build_args.copy()
 
-    for sim in sims:
-        build_dir = Path("./sim_build", sim, module_name, case_name, stringify_dict(parameters))
-        build_args = []
-        test_args = []
+    profile = SIM_PROFILES[sim_profile]
+    if (sim == "verilator"):
+        build_args += profile["build_args"]
+        test_args += profile["test_args"]
+        # cocotb has no argument for the make -j of the C++ compile
+        cocotb_tools.runner.MAX_PARALLEL_BUILD_JOBS = profile["jobs"] or 4
 
-        # extra stuff specifically for verilator
-        if (sim == "verilator"):
-            build_args.append("--trace")
-            build_args.append("--trace-structs")
-            build_args.append("--trace-fst")
-            test_args = build_args.copy()
+    # icarus windowed trace: build without cocotb's dump module, add our own, still run with -fst
+    build_waves = waves
+    if (sim == "icarus" and waves and window_start_ps):
+        sources.append(write_waves_window(build_dir, hdl_toplevel, window_start_ps))
+        build_args += ["-s", "waves_window"]
+        build_waves = False
 
-        runner = get_runner(sim)
+    extra_env = dict(extra_env or {})
+    if PROFILE:
+        # cocotb dumps cocotb.pstat into the test directory (the build dir)
+        extra_env["COCOTB_ENABLE_PROFILING"] = "1"
+    if snapshots is not None:
+        extra_env["SNAPSHOT_DIR"] = str(snapshots)
+
+    # cocotb lets the WAVES environment variable override the waves argument
+    os.environ["WAVES"] = "1" if build_waves else "0"
+
+    runner = get_runner(sim)
+    build_start = time.perf_counter()
+    if build:
         runner.build(
             sources=sources,
             hdl_toplevel=hdl_toplevel,
@@ -40,13 +202,112 @@ def run_test(parameters, sources, module_name, hdl_toplevel, testcase=None, sims
             parameters=parameters,
             build_args=build_args,
             verbose=True,
-            waves=True
+            waves=build_waves
         )
-
-        print(f"Running test '{case_name}' with {sim}...")
         print(f"Build command: {runner._build_command()}")
+    build_s = time.perf_counter() - build_start
+
+    os.environ["WAVES"] = "1" if waves else "0"
+    results_xml = (build_dir / "results.xml").resolve()
+    passed = True
+    test_start = time.perf_counter()
+    try:
+        runner.test(testcase=testcase, test_args=test_args, hdl_toplevel=hdl_toplevel, test_module=module_name, waves=waves,
+                    extra_env=extra_env, results_xml=str(results_xml), seed=seed, build_dir=build_dir)
+    except:
+        passed = False
+    test_s = time.perf_counter() - test_start
+    return passed, read_results(results_xml), build_s, test_s
+
+def run_test(parameters, sources, module_name, hdl_toplevel, testcase=None, sims = ["icarus", "verilator"], clk_period_ns=10,
+             snapshots=False, sim_profile="debug", seed=None, stim=None):
+    """
+    Builds and runs module_name's cocotb tests against hdl_toplevel on each simulator.
+
+    With snapshots=True, setup phases wrapped in snapshot.checkpoint() are only
+    simulated by the first testcase of a build configuration; later ones restore
+    the saved state. sim_profile selects one of SIM_PROFILES, or "auto".
+    seed fixes COCOTB_RANDOM_SEED and stim overrides stimulus sizes read with
+    shared.stim_knob() ({"items": 3} sets STIM_ITEMS=3), which is how
+    sim/shrink.py and test_regressions.py replay a failure.
+    Returns True if every simulator passed.
+    """
+    case_name = "all"
+    if SNAPSHOTS is not None:
+        snapshots = SNAPSHOTS == "1"
+    if SIM_PROFILE is not None:
+        sim_profile = SIM_PROFILE
+    if sim_profile == "auto":
+        sim_profile = tuned_profile(module_name, parameters)
+    if sim_profile not in SIM_PROFILES:
+        raise ValueError(f"Unknown simulator profile '{sim_profile}', expected one of {list(SIM_PROFILES)} or 'auto'")
+
+    if testcase is not None:
+        case_name = testcase
+    stim_env = {f"STIM_{k.upper()}": str(v) for k, v in (stim or {}).items()}
+
+    all_passed = True
+    for sim in sims:
+        build_dir = Path("./sim_build", sim, module_name, case_name, stringify_dict(parameters))
+
+        snap_dir = snapshot_dir(sim, sources, parameters, module_name) if snapshots else None
+
+        print(f"Running test '{case_name}' with {sim} ({sim_profile}{', waves' if WAVES else ''})...")
+        passed, cases, build_s, test_s = build_and_test(
+            sim, sources, parameters, module_name, hdl_toplevel, testcase, build_dir, WAVES,
+            seed=seed, snapshots=snap_dir, sim_profile=sim_profile, extra_env=stim_env)
+
+        # whatever the simulator spends outside the testcases is startup + elaboration
+        elab_s = max(0.0, test_s - sum(c["wall_s"] for c in cases))
+        records = []
+        for c in cases:
+            cycles = int(c["sim_ns"] // clk_period_ns)
+            records.append({
+                "time": time.time(),
+                "sim": sim,
+                "module": module_name,
+                "toplevel": hdl_toplevel,
+                "case": case_name,
+                "testcase": c["name"],
+                "parameters": parameters,
+                "status": c["status"],
+                "seed": c["seed"],
+                "waves": WAVES,
+                "sim_profile": sim_profile,
+                "build_s": build_s,
+                "elab_s": elab_s,
+                "wall_s": c["wall_s"],
+                "sim_ns": c["sim_ns"],
+                "cycles": cycles,
+                "cycles_per_s": cycles / c["wall_s"] if c["wall_s"] > 0 else 0.0,
+                "profile": str((build_dir / "cocotb.pstat").resolve()) if PROFILE else None,
+            })
+        report_perf(records)
+
+        if passed:
+            continue
+        all_passed = False
+        print(f"Test '{case_name}' with {sim} failed")
+        failed = [c for c in cases if c["status"] == "fail"]
+        for c in failed:
+            print(f"Reproduce: python3 sim/shrink.py {module_name} {hdl_toplevel} {c['name']} --sim {sim} --seed {c['seed']}"
+                  + "".join(f" -p {k}={v}" for k, v in parameters.items())
+                  + "".join(f" --stim {k}={v}" for k, v in (stim or {}).items()))
+        if WAVES:
+            continue
+
+        # rerun only the failing testcases, traced, with the seed of the failing run.
+        # snapshots stay off so the trace covers the setup phase too
+        rerun = [c["name"] for c in failed] if failed else testcase
+        rerun_seed = failed[0]["seed"] if failed else seed
+        window_start_ps = None
+        if WAVES_WINDOW and len(failed) == 1:
+            # a lone testcase starts at time 0, so its duration is its failure time
+            window_ns = WAVES_WINDOW * clk_period_ns
+            window_start_ps = int(max(0.0, failed[0]["sim_ns"] - window_ns) * 1000)
 
-        try:
-            runner.test(testcase=testcase, test_args=test_args, hdl_toplevel=hdl_toplevel, test_module=module_name, waves=True)
-        except:
-            print(f"Test '{case_name}' with {sim} failed")
+        waves_dir = build_dir / "waves"
+        print(f"Rerunning {rerun or 'all'} with {sim} and waves (seed {rerun_seed}) in {waves_dir}...")
+        build_and_test(sim, sources, parameters, module_name, hdl_toplevel, rerun, waves_dir, True,
+                       seed=rerun_seed, window_start_ps=window_start_ps, sim_profile=sim_profile, extra_env=stim_env)
+    return all_passed
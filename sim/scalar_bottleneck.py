@@ -0,0 +1,130 @@
+"""
+Is the systolic array or the post-processing the bottleneck of a workload?
+
+Rows leave the array at the cycles the double-buffered schedule gives
+(utilization.py / sysray_schedule.py): one row per cycle while a tile
+streams, with gaps between tiles and layers. Only the final K pass of every
+output tile goes to post-processing; earlier passes stay in accum_buf.
+scalar_par.sv deals the rows round robin to P scalar_pipes. Each pipe holds
+up to STAGES rows (twice that with skid buffers) and passes a row through in
+STAGES cycles. The finished rows are written back over a BUS_W-bit port, so
+one row of N int8 values takes ceil(8N / BUS_W) cycles. The array cannot
+stall: a row arriving at a full pipe is dropped (overrun_o in the RTL).
+
+For every N and P this simulates that queue and reports the rate the array
+offers, the writeback rate, the dropped rows, the cycle the last row is
+written, and which side limits the layer rate. Without drops the array does;
+with drops the array would have to stall for the post-processing, and the
+smallest P that absorbs the bursts is reported as well.
+
+Usage (from the repo root):
+    python3 sim/scalar_bottleneck.py -l 784x128 -l 128x10 -b 32 -N 4 8 16 32 -P 1 2 4
+    python3 sim/scalar_bottleneck.py -l 256x256 -b 64 -N 16 -P 1 2 --bus-w 128 --skid --json post.json
+"""
+import sys
+import json
+import math
+import argparse
+from collections import deque
+from utilization import parse_layer, tiles, run_schedule
+
+# elastic stages per scalar_pipe: bias, relu, sub_zp, scale, lut
+STAGES = 5
+
+def arrivals(layers, N, batch):
+    """Cycles the deskewed rows of every final-pass output tile reach scalar_par, sorted."""
+    ts = tiles(layers, N, batch)
+    run_schedule(ts, N)
+    rows = []
+    for l, (K, O) in enumerate(layers):
+        layer_ts = [t for t in ts if t.layer == l]
+        # tiles are K-major, so the last ceil(O/N) of the layer are its final pass
+        for t in layer_ts[-math.ceil(O / N):]:
+            # row m leaves the bottom of column 0 at a_start + m + N, the deskew adds N
+            rows += [t.a_start + m + 2 * N for m in range(t.M)]
+    return sorted(rows)
+
+def simulate(rows, N, P, bus_w=64, skid=False):
+    """Runs the arrival cycles through P pipes and the writeback port. Returns the statistics."""
+    capacity = STAGES * (2 if skid else 1)
+    words = math.ceil(8 * N / bus_w)
+    pipes = [deque() for _ in range(P)]
+    wr = rd = 0
+    dropped = written = 0
+    port_free = 0
+    last_write = 0
+    i = 0
+    t = rows[0] if rows else 0
+    while i < len(rows) or any(pipes):
+        # writeback takes the next row in order once it is through its pipe
+        if t >= port_free and pipes[rd] and pipes[rd][0] + STAGES <= t:
+            pipes[rd].popleft()
+            rd = (rd + 1) % P
+            written += 1
+            port_free = t + words
+            last_write = t + words
+        while i < len(rows) and rows[i] == t:
+            if len(pipes[wr]) < capacity:
+                pipes[wr].append(t)
+                wr = (wr + 1) % P
+            else:
+                dropped += 1
+            i += 1
+        t += 1
+
+    span = rows[-1] - rows[0] + 1 if rows else 0
+    offered = len(rows) / span if span else 0.0
+    return {
+        "N": N,
+        "P": P,
+        "rows": len(rows),
+        "array_rows_per_cycle": offered,
+        "writeback_rows_per_cycle": 1.0 / words,
+        "dropped": dropped,
+        "written": written,
+        "last_write": last_write,
+        "bottleneck": "post-processing" if dropped else "array",
+    }
+
+def pipes_needed(rows, N, bus_w=64, skid=False, max_P=64):
+    """Smallest P without drops, or None if max_P is not enough."""
+    for P in range(1, max_P + 1):
+        if simulate(rows, N, P, bus_w, skid)["dropped"] == 0:
+            return P
+    return None
+
+def main():
+    parser = argparse.ArgumentParser(description="Array vs post-processing bottleneck per N and number of scalar pipes")
+    parser.add_argument("-l", "--layer", action="append", required=True, type=parse_layer,
+                        help="layer shape KxO (inputs x outputs), in order; repeat for each layer")
+    parser.add_argument("-b", "--batch", type=int, default=1, help="activation rows per layer")
+    parser.add_argument("-N", type=int, nargs="+", default=[8], help="array sizes to compare")
+    parser.add_argument("-P", type=int, nargs="+", default=[1, 2], help="numbers of scalar pipes to compare")
+    parser.add_argument("--bus-w", type=int, default=64, help="writeback port width in bits")
+    parser.add_argument("--skid", action="store_true", help="all pipe stages are skid buffers (SKID_MASK all ones)")
+    parser.add_argument("--max-P", type=int, default=64)
+    parser.add_argument("--json", default=None, help="also write the results to this file")
+    args = parser.parse_args()
+
+    results = []
+    print(f"{'N':>4s} {'P':>3s} {'rows':>7s} {'array/cyc':>10s} {'wb/cyc':>7s} {'dropped':>8s} {'last write':>11s}  bottleneck")
+    for N in args.N:
+        rows = arrivals(args.layer, N, args.batch)
+        for P in args.P:
+            r = simulate(rows, N, P, args.bus_w, args.skid)
+            print(f"{N:4d} {P:3d} {r['rows']:7d} {r['array_rows_per_cycle']:10.3f} {r['writeback_rows_per_cycle']:7.3f} "
+                  f"{r['dropped']:8d} {r['last_write']:11d}  {r['bottleneck']}")
+            results.append(r)
+        need = pipes_needed(rows, N, args.bus_w, args.skid, args.max_P)
+        print(f"     N={N}: {need if need else '>' + str(args.max_P)} pipes keep up with the array")
+        for r in results:
+            if r["N"] == N:
+                r["pipes_needed"] = need
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,9 +1,11 @@
 import cocotb
 from cocotb.clock import Clock
-from cocotb.triggers import RisingEdge, ClockCycles, FallingEdge, ReadOnly, ReadWrite
+from cocotb.triggers import RisingEdge, ClockCycles, FallingEdge, ReadOnly, ReadWrite, First
 from cocotb.types import Logic
 from cocotb.handle import LogicObject
 import random
+import os
+import json
 
 async def clock_start(clk_i, period_ns=10):
     """Start clock with given period (in ns)"""
@@ -31,12 +33,100 @@ async def handshake(clk_i: LogicObject, rst_i: LogicObject,ready: LogicObject, v
             if (ready.value == 1 and valid.value == 1):
                 break
 
+class HandshakeMonitor():
+    """
+    Watches many ready/valid interfaces from a single coroutine.
+
+    All registered interfaces are sampled together once per cycle in the ReadOnly
+    phase after the falling edge, i.e. the values that the next rising edge will
+    latch (testbenches drive on the falling edge, see docs/testbench_guide.md).
+    Callbacks only run on cycles where their interface handshakes. When no
+    interface handshakes the monitor sleeps until a ready, valid or reset signal
+    changes instead of waking up every cycle, so idle and stalled stretches cost
+    nothing.
+
+    Callbacks run in ReadOnly: they may read DUT signals and assert, but must not
+    drive anything.
+    """
+    def __init__(self, clk_i: LogicObject, rst_i: LogicObject):
+        self.clk_i = clk_i
+        self.rst_i = rst_i
+        self.interfaces = []
+        # number of times the monitor coroutine actually sampled the bus
+        self.nsamples = 0
+
+    def add(self, ready: LogicObject, valid: LogicObject, callback):
+        """Register an interface. callback() is called on each handshake, in registration order."""
+        self.interfaces.append((ready, valid, callback))
+
+    def start(self):
+        return cocotb.start_soon(self._run())
+
+    def _sample(self):
+        """Sample every interface, dispatch callbacks and return whether any handshake fired."""
+        self.nsamples += 1
+        if is_resetting(self.rst_i.value):
+            return False
+
+        fired = []
+        for (ready, valid, callback) in self.interfaces:
+            assert ready.value.is_resolvable and valid.value.is_resolvable, "Handshake signals must be resolvable"
+            if (ready.value == 1 and valid.value == 1):
+                fired.append(callback)
+
+        # sample everything before dispatching so callbacks see a consistent cycle
+        for callback in fired:
+            callback()
+        return len(fired) > 0
+
+    async def _run(self):
+        changes = [self.rst_i.value_change]
+        for (ready, valid, _) in self.interfaces:
+            changes += [ready.value_change, valid.value_change]
+
+        while True:
+            await ReadOnly()
+            if self.clk_i.value == 1:
+                # started or woken while the clock is high; wait for the sample point
+                await FallingEdge(self.clk_i)
+                continue
+
+            if self._sample():
+                await FallingEdge(self.clk_i)
+            else:
+                # no handshake is possible until one of the control signals moves
+                await First(*changes)
+
 # stringifies a dict with string keys and integer values into path-safe names
 def stringify_dict(dic):
     # TODO: possibly fail on reserved characters?
     return "_".join(f"{k}_{v}" for k, v in sorted(dic.items()))
 
-async def random_binary_driver(clk_i, signal_i, prob=0.5, max_hold=1, stop_event=None):
+# parses "N=8,M=4" into {"N": 8, "M": 4}
+def parse_params(text):
+    params = {}
+    for kv in text.split(","):
+        k, v = kv.split("=")
+        params[k.strip()] = int(v)
+    return params
+
+def stim_knob(name, default, minimum=1):
+    """
+    Size of one dimension of a test's random stimulus (rows, items, value bits, ...).
+
+    Returns default unless the environment variable STIM_<NAME> overrides it.
+    sim/shrink.py lowers knobs towards minimum to find a small failing stimulus,
+    so a test must still be valid for any value in [minimum, default]. With
+    STIM_LOG set, each read is appended there so the shrinker knows the knobs.
+    """
+    value = int(os.getenv(f"STIM_{name.upper()}", default))
+    log = os.getenv("STIM_LOG")
+    if log:
+        with open(log, "a") as f:
+            f.write(json.dumps({"name": name, "default": default, "minimum": minimum, "value": value}) + "\n")
+    return value
+
+async def random_binary_driver(clk_i, signal_i, prob=0.5, max_hold=1, stop_event=None, max_toggles=None):
     """
     Randomly toggle a binary signal on or off
     
@@ -45,12 +135,20 @@ async def random_binary_driver(clk_i, signal_i, prob=0.5, max_hold=1, stop_event
         signal_i: The signal to toggle
         prob: Probability (0.0 to 1.0) of the signal being high.
         max_hold: Maximum number of cycles to stay in high or low
+        max_toggles: After this many changes the signal stays high (None: no limit)
     """
+    toggles = 0
+    prev = None
     while True:
         if (stop_event is not None and stop_event.is_set()):
             break
 
         new_val = 1 if random.random() < prob else 0
+        if max_toggles is not None and toggles >= max_toggles:
+            new_val = 1
+        elif prev is not None and new_val != prev:
+            toggles += 1
+        prev = new_val
         signal_i.value = new_val
 
         hold_cycles = random.randint(1, max_hold)
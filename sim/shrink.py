@@ -0,0 +1,177 @@
+"""
+Shrinks a failing randomized testcase to a small reproducer.
+
+Random tests size their stimulus with shared.stim_knob() (rows, items, value
+bits, ...). Given a failing testcase and its seed, this reruns it with the
+same seed and lowers one knob at a time by bisection, keeping every value that
+still fails, until no knob can be lowered any further. The RTL is built once
+and every rerun reuses that build.
+
+Usage (from the repo root):
+    python3 sim/shrink.py test_fifo fifo fifo_random_stream_test -p DEPTH_LOG2_P=2
+    python3 sim/shrink.py test_sysray_nxn sysray_nxn test_random_matmul_matrix -p N=8 --seed 1712345678
+    python3 sim/shrink.py test_fifo fifo fifo_random_stream_test -p DEPTH_LOG2_P=2 --save fifo_short_stream
+
+Without --seed, the seed of the latest failing run of the testcase in the perf
+log (sim_build/perf.jsonl, see runner.py) is used; a failing run_test prints
+the exact command. --save appends the result to sim/regressions.json, which
+test_regressions.py replays on every test run.
+"""
+import os
+import sys
+import json
+import argparse
+import tempfile
+import importlib
+from pathlib import Path
+
+from runner import build_and_test, PERF_LOG
+from shared import stringify_dict, parse_params
+from affected import ROOT, testbench_sources
+
+REGRESSIONS = ROOT / "sim" / "regressions.json"
+
+def last_failing_seed(module_name, testcase):
+    """Seed of the most recent failing record of the testcase in PERF_LOG, or None."""
+    if not PERF_LOG.is_file():
+        return None
+    seed = None
+    for line in PERF_LOG.read_text().splitlines():
+        r = json.loads(line)
+        if r["module"] == module_name and r["testcase"] == testcase and r["status"] == "fail":
+            seed = r["seed"]
+    return seed
+
+def module_sources(module_name):
+    """RTL sources of a test module: its SOURCES list if it has one, otherwise every HDL file it names."""
+    mod = importlib.import_module(module_name)
+    sources = getattr(mod, "SOURCES", None)
+    if sources:
+        return [Path(s).resolve() for s in sources]
+    # packages first, the rest in a stable order
+    files = sorted(testbench_sources(ROOT / "sim" / f"{module_name}.py"), key=lambda f: ("pkg" not in f, f))
+    return [ROOT / f for f in files if (ROOT / f).is_file()]
+
+class Shrinker():
+    def __init__(self, sim, sources, parameters, module_name, hdl_toplevel, testcase, seed):
+        self.sim = sim
+        self.sources = sources
+        self.parameters = parameters
+        self.module_name = module_name
+        self.hdl_toplevel = hdl_toplevel
+        self.testcase = testcase
+        self.seed = seed
+        self.build_dir = Path("./sim_build", "shrink", sim, module_name, testcase, stringify_dict(parameters))
+        self.built = False
+        self.runs = 0
+
+    def fails(self, stim, log=None):
+        """Runs the testcase once with the stim overrides and returns whether it failed."""
+        env = {f"STIM_{k.upper()}": str(v) for k, v in stim.items()}
+        if log:
+            env["STIM_LOG"] = log
+        self.runs += 1
+        passed, cases, _, _ = build_and_test(
+            self.sim, self.sources, self.parameters, self.module_name, self.hdl_toplevel, [self.testcase],
+            self.build_dir, False, seed=self.seed, extra_env=env, build=not self.built)
+        self.built = True
+        failed = not passed or any(c["status"] == "fail" for c in cases)
+        print(f"[shrink] run {self.runs}: {stim or 'defaults'} -> {'FAIL' if failed else 'pass'}")
+        return failed
+
+    def knobs(self, stim):
+        """Runs once with STIM_LOG to learn the knobs. Returns (failed, {name: (value, minimum)})."""
+        with tempfile.TemporaryDirectory() as tmp:
+            log = os.path.join(tmp, "stim.jsonl")
+            failed = self.fails(stim, log=log)
+            knobs = {}
+            if os.path.isfile(log):
+                for line in Path(log).read_text().splitlines():
+                    k = json.loads(line)
+                    knobs[k["name"]] = (k["value"], k["minimum"])
+        return failed, knobs
+
+    def shrink(self, stim, knobs):
+        """Lowers every knob as far as it goes while the test still fails, until nothing changes."""
+        stim = dict(stim)
+        stim.update({name: value for name, (value, _) in knobs.items()})
+        changed = True
+        while changed:
+            changed = False
+            for name, (_, minimum) in knobs.items():
+                # stim[name] fails; find the smallest value in [minimum, stim[name]] that still does.
+                # Failures are not monotonic in general, so this is a local minimum
+                lo, hi = minimum, stim[name]
+                while lo < hi:
+                    mid = (lo + hi) // 2
+                    if self.fails({**stim, name: mid}):
+                        hi = mid
+                    else:
+                        lo = mid + 1
+                if hi < stim[name]:
+                    stim[name] = hi
+                    changed = True
+        return stim
+
+def save_regression(name, entry):
+    regressions = json.loads(REGRESSIONS.read_text()) if REGRESSIONS.is_file() else []
+    regressions = [r for r in regressions if r["name"] != name]
+    regressions.append({"name": name, **entry})
+    REGRESSIONS.write_text(json.dumps(regressions, indent=2) + "\n")
+
+def main():
+    parser = argparse.ArgumentParser(description="Shrink the random stimulus of a failing testcase")
+    parser.add_argument("module", help="cocotb test module, e.g. test_fifo")
+    parser.add_argument("toplevel", help="HDL toplevel, e.g. fifo")
+    parser.add_argument("testcase", help="the failing cocotb testcase")
+    parser.add_argument("-p", "--params", action="append", default=[], help="NAME=VAL[,NAME=VAL...] HDL parameters")
+    parser.add_argument("--stim", action="append", default=[], help="NAME=VAL starting stimulus knob values")
+    parser.add_argument("--sim", default="icarus", choices=["icarus", "verilator"])
+    parser.add_argument("--seed", default=None, help="random seed of the failing run (default: latest failure in the perf log)")
+    parser.add_argument("--save", default=None, metavar="NAME", help="add the reproducer to sim/regressions.json under NAME")
+    args = parser.parse_args()
+
+    parameters = {}
+    for p in args.params:
+        parameters.update(parse_params(p))
+    stim = {}
+    for s in args.stim:
+        stim.update(parse_params(s))
+    seed = args.seed or last_failing_seed(args.module, args.testcase)
+    if seed is None:
+        parser.error(f"no failing run of {args.module}::{args.testcase} in {PERF_LOG}, give --seed")
+    seed = int(seed)
+
+    sources = module_sources(args.module)
+    shrinker = Shrinker(args.sim, sources, parameters, args.module, args.toplevel, args.testcase, seed)
+    failed, knobs = shrinker.knobs(stim)
+    if not failed:
+        print(f"{args.module}::{args.testcase} passes with seed {seed}, nothing to shrink")
+        return 1
+    if not knobs:
+        print(f"{args.module}::{args.testcase} has no stimulus knobs (shared.stim_knob), keeping seed {seed} only")
+
+    minimal = shrinker.shrink(stim, knobs)
+    print(f"\nMinimal failing stimulus after {shrinker.runs} runs (seed {seed}):")
+    for name, value in minimal.items():
+        default = knobs[name][0] if name in knobs else "?"
+        print(f"  {name:12s} {value:6d}  (was {default})")
+    env = "".join(f"STIM_{k.upper()}={v} " for k, v in minimal.items())
+    print(f"Reproduce: {env}COCOTB_RANDOM_SEED={seed}")
+
+    if args.save:
+        save_regression(args.save, {
+            "module": args.module,
+            "toplevel": args.toplevel,
+            "testcase": args.testcase,
+            "parameters": parameters,
+            "sources": [Path(s).resolve().relative_to(ROOT).as_posix() for s in sources],
+            "sim": args.sim,
+            "seed": seed,
+            "stim": minimal,
+        })
+        print(f"Saved as '{args.save}' in {REGRESSIONS}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,91 @@
+import os
+import json
+from pathlib import Path
+import cocotb
+from cocotb.triggers import FallingEdge, ReadOnly
+from cocotb.types import Logic, LogicArray
+from cocotb.handle import (HierarchyObject, HierarchyArrayObject, ArrayObject, LogicObject,
+                           LogicArrayObject, PackedObject, IntegerObject, EnumObject, RealObject)
+from shared import clock_start
+
+# set by run_test() when snapshots are enabled, shared by every testcase of one build configuration
+SNAPSHOT_DIR = os.getenv("SNAPSHOT_DIR")
+
+def _leaves(handle):
+    """Yields every writable value handle below handle (registers, nets, memory words)."""
+    if isinstance(handle, (HierarchyObject, HierarchyArrayObject)):
+        for child in handle:
+            yield from _leaves(child)
+    elif isinstance(handle, ArrayObject):
+        if handle.is_const:
+            return
+        for elem in handle:
+            yield from _leaves(elem)
+    elif isinstance(handle, (LogicObject, LogicArrayObject, PackedObject, IntegerObject, EnumObject, RealObject)):
+        if not handle.is_const:
+            yield handle
+
+def save_state(dut, path, skip=()):
+    """Writes the value of every signal below dut to path. Must be called in ReadOnly."""
+    skip = {h._path for h in skip}
+    state = {}
+    for h in _leaves(dut):
+        if h._path in skip:
+            continue
+        if isinstance(h, (LogicObject, LogicArrayObject, PackedObject)):
+            state[h._path] = str(h.value)
+        else:
+            state[h._path] = h.value
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # testcases of the same build may run in parallel; never expose a half written file
+    tmp = path.with_suffix(f".{os.getpid()}.tmp")
+    tmp.write_text(json.dumps(state))
+    tmp.replace(path)
+    return len(state)
+
+def restore_state(dut, path):
+    """Deposits every value saved by save_state() back into the design."""
+    state = json.loads(path.read_text())
+    for h in _leaves(dut):
+        if h._path not in state:
+            continue
+        v = state[h._path]
+        if isinstance(h, LogicObject):
+            h.value = Logic(v)
+        elif isinstance(h, (LogicArrayObject, PackedObject)):
+            h.value = LogicArray(v)
+        else:
+            h.value = v
+    return len(state)
+
+async def checkpoint(dut, name, setup, clk_i):
+    """
+    Runs a named setup phase, or restores its snapshot if an earlier testcase already ran it.
+
+    setup(dut) must start clk_i, leave the design in the same state on every run
+    (no random stimulus) and return on a falling edge. The state of every signal
+    except the clock is saved after it; later testcases starting from the same
+    build skip setup and deposit that state instead. Both paths then run one
+    more cycle and return on a falling edge, so what follows sees the same
+    design state either way. Only DUT state is restored: anything setup() left
+    running on the Python side (drivers, monitors) has to be restarted by the
+    caller.
+
+    Without SNAPSHOT_DIR (snapshots disabled in run_test) this just runs setup.
+    """
+    if SNAPSHOT_DIR is None:
+        await setup(dut)
+        return
+
+    path = Path(SNAPSHOT_DIR) / f"{name}.json"
+    if path.is_file():
+        await clock_start(clk_i)
+        await FallingEdge(clk_i)
+        n = restore_state(dut, path)
+        cocotb.log.info(f"Restored snapshot '{name}' ({n} signals) from {path}")
+    else:
+        await setup(dut)
+        await ReadOnly()
+        n = save_state(dut, path, skip=[clk_i])
+        cocotb.log.info(f"Saved snapshot '{name}' ({n} signals) to {path}")
+    await FallingEdge(clk_i)
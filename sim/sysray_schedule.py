@@ -0,0 +1,175 @@
+"""
+Double-buffered weight/activation schedule for sysray_nxn.
+
+Jobs are (weights, activations) pairs run back to back. Job k uses bank
+k % 2: its weights are shifted into the shadow bank while job k-1 is still
+streaming out of the active one, and its activations flip act_sel to the new
+bank.
+
+Timing (cycle = one falling edge of the driver, see pe.sv):
+  - column c shifts in the N weights of job k during [W_k + c, W_k + c + N),
+    one column input per cycle, so W_k >= W_{k-1} + N;
+  - every PE of column c holds its final weight after cycle W_k + c + N - 1,
+    and vector m reaches PE (r, c) at A_k + m + r + c, so A_k >= W_k + N;
+  - rows take one vector per cycle: A_k >= A_{k-1} + M_{k-1};
+  - job k overwrites the bank job k-2 reads: PE (r, c) is first written at
+    W_k + c + r and last read by job k-2 at A_{k-2} + M_{k-2} - 1 + r + c,
+    so W_k >= A_{k-2} + M_{k-2}.
+The scheduler takes the earliest cycles meeting all four. With M >= N for
+every job the activation rows never idle between jobs.
+"""
+from dataclasses import dataclass
+import numpy as np
+from cocotb.triggers import FallingEdge
+
+@dataclass
+class Job:
+    weights: np.ndarray   # N x N, weights[i][j] multiplies activation element i into column j
+    acts: np.ndarray      # M x N, one activation vector per row
+    sel: int = 0          # weight/activation bank
+    w_start: int = 0      # W_k, cycle column 0 starts shifting in the weights
+    a_start: int = 0      # A_k, cycle row 0 gets the first activation vector
+    not_before: int = 0   # earliest A_k, e.g. when the activations are the previous layer's outputs
+
+    @property
+    def M(self):
+        return len(self.acts)
+
+def drive_inputs(dut, inp):
+    """Puts one cycle of inputs (lists indexed by row/column, as yielded by BankScheduler.inputs()) on sysray_nxn."""
+    for i in range(len(inp["act"])):
+        dut.act_n_i[i].value = inp["act"][i]
+        dut.act_sel_n_i[i].value = inp["act_sel"][i]
+        dut.act_valid_n_i[i].value = inp["act_valid"][i]
+        dut.weight_n_i[i].value = inp["weight"][i]
+        dut.weight_sel_n_i[i].value = inp["weight_sel"][i]
+        dut.weight_valid_n_i[i].value = inp["weight_valid"][i]
+
+def schedule(N, jobs):
+    """
+    Sets w_start and a_start of every job to the earliest cycles the four
+    constraints above (and the job's not_before) allow. Only needs M and
+    not_before from the jobs, so it also schedules workloads by shape alone.
+    """
+    for k, job in enumerate(jobs):
+        w = 0
+        a = job.not_before
+        if k >= 1:
+            prev = jobs[k-1]
+            w = prev.w_start + N
+            a = max(a, prev.a_start + prev.M)
+        if k >= 2:
+            prev2 = jobs[k-2]
+            w = max(w, prev2.a_start + prev2.M)
+        job.w_start = w
+        job.a_start = max(a, w + N)
+
+class BankScheduler():
+    def __init__(self, N):
+        self.N = N
+        self.jobs = []
+
+    def add(self, weights, acts):
+        """Queue a job and (re)compute the schedule. Returns the Job."""
+        weights = np.asarray(weights, dtype=np.int64)
+        acts = np.asarray(acts, dtype=np.int64)
+        assert weights.shape == (self.N, self.N), f"weights must be {self.N}x{self.N}, got {weights.shape}"
+        assert acts.ndim == 2 and acts.shape[1] == self.N, f"activations must be Mx{self.N}, got {acts.shape}"
+        job = Job(weights, acts, sel=len(self.jobs) % 2)
+        self.jobs.append(job)
+        self._schedule()
+        return job
+
+    def _schedule(self):
+        schedule(self.N, self.jobs)
+
+    @property
+    def total_rows(self):
+        return sum(job.M for job in self.jobs)
+
+    @property
+    def end_cycle(self):
+        """Last cycle drive() runs: one past the final activation into the last row, so all inputs end deasserted."""
+        last = self.jobs[-1]
+        return last.a_start + last.M + self.N - 1
+
+    def row_gaps(self):
+        """Cycles row 0 sits idle between job k-1 and job k, for each k >= 1."""
+        return [self.jobs[k].a_start - (self.jobs[k-1].a_start + self.jobs[k-1].M)
+                for k in range(1, len(self.jobs))]
+
+    def idle_pe_cycles(self):
+        """
+        PE-cycles lost between jobs. Every idle cycle at the row-0 input
+        travels across the whole array, idling all N*N PEs once.
+        """
+        return sum(self.row_gaps()) * self.N * self.N
+
+    def report(self):
+        busy = self.total_rows * self.N * self.N
+        idle = self.idle_pe_cycles()
+        return {
+            "jobs": len(self.jobs),
+            "rows": self.total_rows,
+            "row_gaps": self.row_gaps(),
+            "idle_pe_cycles": idle,
+            "utilization": busy / (busy + idle) if busy + idle else 0.0,
+        }
+
+    def _weight_at(self, col, cycle):
+        """(value, sel) column col shifts in at cycle, or None."""
+        for job in self.jobs:
+            t = cycle - job.w_start - col
+            if 0 <= t < self.N:
+                # bottom row first, it has the furthest to shift
+                return int(job.weights[self.N - 1 - t][col]), job.sel
+        return None
+
+    def _act_at(self, row, cycle):
+        """(value, sel) activation row row gets at cycle, or None."""
+        for job in self.jobs:
+            m = cycle - job.a_start - row
+            if 0 <= m < job.M:
+                return int(job.acts[m][row]), job.sel
+        return None
+
+    def inputs(self):
+        """
+        Yields the sysray_nxn inputs for every cycle of the schedule, as a dict
+        of per row (act_*) and per column (weight_*) lists, see drive_inputs().
+        """
+        N = self.N
+        # both banks start at 0 after reset. Idle rows and columns keep their select
+        # bit: toggling it moves the PE's bank pointer
+        weight_sel = [0] * N
+        act_sel = [0] * N
+        for cycle in range(self.end_cycle + 1):
+            inp = {"weight": [0] * N, "weight_valid": [0] * N, "act": [0] * N, "act_valid": [0] * N}
+            for col in range(N):
+                w = self._weight_at(col, cycle)
+                if w is not None:
+                    inp["weight"][col], weight_sel[col] = w
+                    inp["weight_valid"][col] = 1
+            for row in range(N):
+                a = self._act_at(row, cycle)
+                if a is not None:
+                    inp["act"][row], act_sel[row] = a
+                    inp["act_valid"][row] = 1
+            inp["weight_sel"] = list(weight_sel)
+            inp["act_sel"] = list(act_sel)
+            yield inp
+
+    async def drive(self, dut):
+        """Drive the whole schedule, one cycle per falling edge, starting at the next one."""
+        for inp in self.inputs():
+            await FallingEdge(dut.clk_i)
+            drive_inputs(dut, inp)
+
+    def split_outputs(self, out):
+        """Splits the total_rows x N output of all jobs (in order) into one matrix per job."""
+        res = []
+        start = 0
+        for job in self.jobs:
+            res.append(out[start:start + job.M])
+            start += job.M
+        return res
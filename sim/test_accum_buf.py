@@ -0,0 +1,233 @@
+import random
+import cocotb
+from cocotb.triggers import FallingEdge, ReadOnly, with_timeout
+from pathlib import Path
+import pytest
+from shared import clock_start, reset_sequence
+from runner import run_test
+from refmodel import make_rng, random_matrix, matmul_ref, k_tile_psums, assert_matrix_equal
+
+class RowSink():
+    """Takes finished rows off data_o with probability ready_prob per cycle."""
+    def __init__(self, dut, ready_prob=1.0):
+        self.dut = dut
+        self.ready_prob = ready_prob
+        self.N = dut.N.value.to_unsigned()
+        self.rows = []
+
+    def start(self):
+        return cocotb.start_soon(self._run())
+
+    async def _run(self):
+        dut = self.dut
+        while True:
+            await FallingEdge(dut.clk_i)
+            dut.data_ready_i.value = int(random.random() < self.ready_prob)
+            await ReadOnly()
+            if dut.data_ready_i.value == 1 and dut.data_valid_o.value == 1:
+                self.rows.append([dut.data_o[i].value.to_signed() for i in range(self.N)])
+
+def layer(rng, N, passes):
+    """One N x N output tile computed in `passes` K passes: returns (partial psums per pass, expected result)."""
+    acts = random_matrix(rng, N, N * passes)
+    weights = random_matrix(rng, N * passes, N)
+    return k_tile_psums(acts, weights, N), matmul_ref(acts, weights)
+
+def schedule(outputs, tiles, interleave=False):
+    """
+    Orders the K passes of every output tile. outputs[o] is the list of
+    partials of output o, accumulated in resident tile o % tiles. Returns
+    (tile, first, last, rows) per pass. With interleave, the passes of each
+    group of `tiles` consecutive outputs alternate.
+    """
+    per_output = [[(o % tiles, p == 0, p == len(parts) - 1, parts[p]) for p in range(len(parts))]
+                  for o, parts in enumerate(outputs)]
+    if not interleave:
+        return [x for passes in per_output for x in passes]
+    order = []
+    for group in range(0, len(per_output), tiles):
+        chunk = per_output[group:group + tiles]
+        for p in range(max(len(c) for c in chunk)):
+            order += [c[p] for c in chunk if p < len(c)]
+    return order
+
+async def feed(dut, passes):
+    """One row per cycle, no gaps inside a pass. Waits for the tile to be free before its first pass."""
+    N = dut.N.value.to_unsigned()
+    for tile, first, last, rows in passes:
+        if first:
+            while (dut.tile_busy_o.value.to_unsigned() >> tile) & 1:
+                await FallingEdge(dut.clk_i)
+        for r in range(N):
+            for i in range(N):
+                dut.psum_i[i].value = int(rows[r][i])
+            dut.psum_valid_i.value = 1
+            dut.tile_i.value = tile
+            dut.first_i.value = int(first)
+            dut.last_i.value = int(last)
+            await FallingEdge(dut.clk_i)
+    dut.psum_valid_i.value = 0
+
+async def do_reset(dut):
+    N = dut.N.value.to_unsigned()
+    for i in range(N):
+        dut.psum_i[i].value = 0
+    dut.psum_valid_i.value = 0
+    dut.tile_i.value = 0
+    dut.first_i.value = 0
+    dut.last_i.value = 0
+    dut.data_ready_i.value = 0
+    await clock_start(dut.clk_i)
+    await reset_sequence(dut.clk_i, dut.rst_i)
+    await FallingEdge(dut.clk_i)
+
+async def run(dut, outputs, ready_prob=1.0, interleave=False):
+    """Accumulates every output, checks the drained tiles in release order and that nothing was dropped."""
+    N = dut.N.value.to_unsigned()
+    tiles = dut.TILES.value.to_unsigned()
+    passes = schedule([parts for parts, _ in outputs], tiles, interleave)
+    # outputs are released in the order their last pass arrives
+    released = []
+    for tile, first, last, rows in passes:
+        if last:
+            released.append(next(o for o, (parts, _) in enumerate(outputs)
+                                 if o % tiles == tile and o not in released))
+
+    sink = RowSink(dut, ready_prob)
+    sink.start()
+    await feed(dut, passes)
+    timeout = 20 * N * len(outputs) / ready_prob + 1000
+    while len(sink.rows) < N * len(outputs):
+        await with_timeout(FallingEdge(dut.clk_i), timeout, "ns")
+    await FallingEdge(dut.clk_i)
+
+    assert dut.overrun_o.value == 0
+    for k, o in enumerate(released):
+        assert_matrix_equal(sink.rows[k * N:(k + 1) * N], outputs[o][1], f"output {o}")
+    assert dut.tile_busy_o.value == 0
+
+@cocotb.test()
+async def test_reset(dut):
+    await do_reset(dut)
+    assert dut.data_valid_o.value == 0
+    assert dut.tile_busy_o.value == 0
+    assert dut.overrun_o.value == 0
+
+@cocotb.test()
+async def test_single_pass(dut):
+    """K = N: the only pass is both first and last."""
+    await do_reset(dut)
+    rng = make_rng()
+    N = dut.N.value.to_unsigned()
+    await run(dut, [layer(rng, N, 1)])
+
+@cocotb.test()
+async def test_k_passes(dut):
+    """One output tile accumulated over several K passes, released only after the last one."""
+    await do_reset(dut)
+    rng = make_rng()
+    N = dut.N.value.to_unsigned()
+    await run(dut, [layer(rng, N, 4)])
+
+@cocotb.test()
+async def test_interleaved_tiles(dut):
+    """The passes of TILES outputs alternate, each accumulating in its own resident tile."""
+    await do_reset(dut)
+    rng = make_rng()
+    N = dut.N.value.to_unsigned()
+    tiles = dut.TILES.value.to_unsigned()
+    await run(dut, [layer(rng, N, random.randint(1, 4)) for _ in range(2 * tiles)], ready_prob=0.7, interleave=True)
+
+@cocotb.test()
+async def test_drain_overlaps_accumulate(dut):
+    """
+    Output tiles back to back under heavy backpressure: the next output
+    accumulates while the previous one drains, and a busy tile is never
+    overwritten.
+    """
+    await do_reset(dut)
+    rng = make_rng()
+    N = dut.N.value.to_unsigned()
+    await run(dut, [layer(rng, N, random.randint(1, 3)) for _ in range(8)], ready_prob=0.3)
+
+@cocotb.test()
+async def test_overrun(dut):
+    """A row for a tile that is still waiting to drain is dropped and flagged."""
+    await do_reset(dut)
+    rng = make_rng()
+    N = dut.N.value.to_unsigned()
+    parts, expected = layer(rng, N, 1)
+    await feed(dut, [(0, True, True, parts[0])])
+    assert dut.tile_busy_o.value.to_unsigned() & 1
+    assert dut.overrun_o.value == 0
+
+    garbage, _ = layer(rng, N, 1)
+    dut.psum_i[0].value = int(garbage[0][0][0])
+    dut.psum_valid_i.value = 1
+    dut.tile_i.value = 0
+    dut.first_i.value = 1
+    dut.last_i.value = 1
+    await FallingEdge(dut.clk_i)
+    dut.psum_valid_i.value = 0
+    await FallingEdge(dut.clk_i)
+    assert dut.overrun_o.value == 1
+
+    # the resident tile is intact
+    sink = RowSink(dut)
+    sink.start()
+    while len(sink.rows) < N:
+        await with_timeout(FallingEdge(dut.clk_i), 1000, "ns")
+    assert_matrix_equal(sink.rows, expected)
+
+@cocotb.test()
+async def test_bad_tile(dut):
+    """With TILES not a power of two, a row for a tile that does not exist is dropped and flagged."""
+    await do_reset(dut)
+    TILES = dut.TILES.value.to_unsigned()
+    TILE_W = dut.TILE_W.value.to_unsigned()
+    if TILES == 1 << TILE_W:
+        return
+    rng = make_rng()
+    N = dut.N.value.to_unsigned()
+    dut.psum_valid_i.value = 1
+    dut.tile_i.value = TILES
+    dut.first_i.value = 1
+    dut.last_i.value = 1
+    await FallingEdge(dut.clk_i)
+    dut.psum_valid_i.value = 0
+    await FallingEdge(dut.clk_i)
+    assert dut.overrun_o.value == 1
+    assert dut.tile_busy_o.value.to_unsigned() == 0
+    assert dut.data_valid_o.value == 0
+
+    # the dropped row did not advance the row counter
+    parts, expected = layer(rng, N, 2)
+    sink = RowSink(dut)
+    sink.start()
+    await feed(dut, schedule([parts], TILES))
+    while len(sink.rows) < N:
+        await with_timeout(FallingEdge(dut.clk_i), 1000, "ns")
+    assert_matrix_equal(sink.rows, expected)
+
+tests = [
+    "test_reset",
+    "test_single_pass",
+    "test_k_passes",
+    "test_interleaved_tiles",
+    "test_drain_overlaps_accumulate",
+    "test_overrun",
+    "test_bad_tile",
+]
+
+proj_path = Path("./rtl").resolve()
+sources = [proj_path / "accum_buf.sv", proj_path / "fifo.sv"]
+
+@pytest.mark.parametrize("tiles", [1, 2, 3, 4])
+@pytest.mark.parametrize("testcase", tests)
+def test_accum_buf_each(testcase, tiles):
+    """Runs each test independently. Continues on test failure."""
+    run_test(parameters={"N": 4, "TILES": tiles}, sources=sources, module_name="test_accum_buf", hdl_toplevel="accum_buf", testcase=testcase)
+
+def test_accum_buf_all():
+    """Runs all tests sequentially in one simulation."""
+    run_test(parameters={}, sources=sources, module_name="test_accum_buf", hdl_toplevel="accum_buf")
@@ -10,7 +10,7 @@ from collections import deque
 from cocotb.types import LogicArray, Logic, Array
 from collections import deque
 import random
-from shared import handshake, is_resetting
+from shared import HandshakeMonitor
 
 def logic_add(a: LogicArray, b: LogicArray, width: int) -> LogicArray:
     """
@@ -131,39 +131,10 @@ class ModelRunner():
         self.model = add_n_model(dut.N.value.to_unsigned(), dut.width_p.value.to_unsigned())
 
     def start(self):
-        cocotb.start_soon(self.run_input())
-        cocotb.start_soon(self.run_output())
-
-    async def run_input(self):
-        clk_i = self.dut.clk_i
-        valid_i, valid_o = self.dut.data_valid_i, self.dut.data_valid_o
-        ready_i, ready_o = self.dut.data_ready_i, self.dut.data_ready_o
-        rst_i = self.dut.rst_i
-
-        await FallingEdge(rst_i)
-
-        while True:
-            # await handshake(clk_i, rst_i, ready_o, valid_i)
-            await RisingEdge(clk_i)
-            if (valid_i.value == 1 and ready_o.value == 1):
-                cocotb.log.info("Input handshake successful, consuming input")
-                self.model.consume(self.dut)
-
-    async def run_output(self):
-        clk_i = self.dut.clk_i
-        valid_i, valid_o = self.dut.data_valid_i, self.dut.data_valid_o
-        ready_i, ready_o = self.dut.data_ready_i, self.dut.data_ready_o
-        rst_i = self.dut.rst_i
-
-        await FallingEdge(rst_i)
-
-        while True:
-            cocotb.log.info(f"Waiting for output handshake..., ready_i={ready_i.value}, valid_o={valid_o.value}, valid_i={valid_i.value}, ready_o={ready_o.value}")
-            # await handshake(clk_i, rst_i, ready_i, valid_o)
-            await RisingEdge(clk_i)
-            if (ready_i.value == 1 and valid_o.value == 1):
-                cocotb.log.info("Output handshake successful, producing output")
-                self.model.produce(self.dut)
+        monitor = HandshakeMonitor(self.dut.clk_i, self.dut.rst_i)
+        monitor.add(self.dut.data_ready_o, self.dut.data_valid_i, lambda: self.model.consume(self.dut))
+        monitor.add(self.dut.data_ready_i, self.dut.data_valid_o, lambda: self.model.produce(self.dut))
+        return monitor.start()
 
 @cocotb.test()
 async def reset_test(dut):
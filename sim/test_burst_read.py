@@ -0,0 +1,175 @@
+import random
+import cocotb
+from cocotb.triggers import FallingEdge, ReadOnly, with_timeout
+from pathlib import Path
+import pytest
+from shared import clock_start, reset_sequence
+from runner import run_test
+
+def pattern(addr):
+    """Unique word per address so every read can be matched to its request."""
+    return (0xC0FFEE << 40) | (addr << 8) | (addr ^ 0xFF)
+
+class SramModel():
+    """
+    Read port of sram_8x256: the word at the address presented with en_i shows
+    up on the data output read_latency cycles later. Between reads the output
+    holds garbage, so a word taken at the wrong time is caught.
+    """
+    def __init__(self, dut):
+        self.dut = dut
+        self.latency = dut.read_latency.value.to_unsigned()
+        self.reads = []          # cycle of every read
+        self.cycle = 0
+
+    def start(self):
+        return cocotb.start_soon(self._run())
+
+    async def _run(self):
+        dut = self.dut
+        width = dut.data_width.value.to_unsigned()
+        pipe = [None] * self.latency
+        while True:
+            await FallingEdge(dut.clk_i)
+            self.cycle += 1
+            addr = pipe.pop(0)
+            dut.sram_rd_data_i.value = pattern(addr) if addr is not None else random.getrandbits(width)
+            await ReadOnly()
+            if dut.sram_en_o.value == 1:
+                pipe.append(dut.sram_addr_o.value.to_unsigned())
+                self.reads.append(self.cycle)
+            else:
+                pipe.append(None)
+
+class StreamSink():
+    """Takes words off rd_data_o with probability ready_prob per cycle and records when rd_ready_i was wasted."""
+    def __init__(self, dut, ready_prob=1.0):
+        self.dut = dut
+        self.ready_prob = ready_prob
+        self.words = []
+        self.lasts = []
+        # cycles with rd_ready_i high and nothing to take, after the first word
+        self.starved = 0
+
+    def start(self):
+        return cocotb.start_soon(self._run())
+
+    async def _run(self):
+        dut = self.dut
+        while True:
+            await FallingEdge(dut.clk_i)
+            dut.rd_ready_i.value = int(random.random() < self.ready_prob)
+            await ReadOnly()
+            if dut.rd_ready_i.value == 1:
+                if dut.rd_valid_o.value == 1:
+                    self.words.append(dut.rd_data_o.value.to_unsigned())
+                    self.lasts.append(dut.rd_last_o.value.to_unsigned())
+                elif self.words and dut.busy_o.value == 1:
+                    self.starved += 1
+
+async def do_reset(dut):
+    dut.addr_i.value = 0
+    dut.transaction_amount_i.value = 0
+    dut.load_valid_i.value = 0
+    dut.rd_ready_i.value = 0
+    dut.sram_rd_data_i.value = 0
+    await clock_start(dut.clk_i)
+    await reset_sequence(dut.clk_i, dut.rst_i)
+    await FallingEdge(dut.clk_i)
+
+async def issue(dut, transactions):
+    """Requests every (addr, amount) as soon as the previous one is accepted."""
+    for addr, amount in transactions:
+        dut.addr_i.value = addr
+        dut.transaction_amount_i.value = amount
+        dut.load_valid_i.value = 1
+        await ReadOnly()
+        while dut.load_ready_o.value == 0:
+            await FallingEdge(dut.clk_i)
+            await ReadOnly()
+        await FallingEdge(dut.clk_i)
+    dut.load_valid_i.value = 0
+
+def expected(transactions):
+    words, lasts = [], []
+    for addr, amount in transactions:
+        for i in range(amount):
+            words.append(pattern((addr + i) % 256))
+            lasts.append(int(i == amount - 1))
+    return words, lasts
+
+async def run_transactions(dut, transactions, ready_prob):
+    sram = SramModel(dut)
+    sink = StreamSink(dut, ready_prob)
+    sram.start()
+    sink.start()
+    words, lasts = expected(transactions)
+    await issue(dut, transactions)
+    timeout = 20 * (len(words) + 10) / max(ready_prob, 0.05)
+    while len(sink.words) < len(words):
+        await with_timeout(FallingEdge(dut.clk_i), timeout, "ns")
+    await FallingEdge(dut.clk_i)
+
+    assert sink.words == words
+    assert sink.lasts == lasts
+    return sram, sink
+
+@cocotb.test()
+async def test_reset(dut):
+    await do_reset(dut)
+    assert dut.rd_valid_o.value == 0
+    assert dut.sram_en_o.value == 0
+    assert dut.load_ready_o.value == 1
+
+@cocotb.test()
+async def test_single_burst(dut):
+    """One transaction with the consumer always ready reads one word per cycle."""
+    await do_reset(dut)
+    sram, sink = await run_transactions(dut, [(8, 16)], ready_prob=1.0)
+    assert sram.reads == list(range(sram.reads[0], sram.reads[0] + 16)), f"reads not back-to-back: {sram.reads}"
+    assert sink.starved == 0
+
+@cocotb.test()
+async def test_back_to_back(dut):
+    """Queued transactions keep the SRAM busy every cycle, with no idle cycle between them."""
+    await do_reset(dut)
+    transactions = [(0, 5), (100, 1), (40, 12), (250, 10), (7, 3)]
+    sram, sink = await run_transactions(dut, transactions, ready_prob=1.0)
+    total = sum(n for _, n in transactions)
+    assert sram.reads == list(range(sram.reads[0], sram.reads[0] + total)), f"SRAM idled: {sram.reads}"
+    assert sink.starved == 0
+
+@cocotb.test()
+async def test_random_backpressure(dut):
+    """
+    Random transactions under random backpressure: every word arrives in order,
+    and once streaming the output never makes a ready consumer wait, i.e. one
+    word per cycle rd_ready_i is high.
+    """
+    await do_reset(dut)
+    transactions = [(random.randrange(256), random.randint(1, 24)) for _ in range(20)]
+    sram, sink = await run_transactions(dut, transactions, ready_prob=0.6)
+    cocotb.log.info(f"{len(sink.words)} words, {sink.starved} starved cycles")
+    assert sink.starved == 0
+
+tests = [
+    "test_reset",
+    "test_single_burst",
+    "test_back_to_back",
+    "test_random_backpressure",
+]
+
+proj_path = Path("./rtl").resolve()
+sources = [proj_path / "sram/burst_read.sv", proj_path / "fifo.sv"]
+
+@pytest.mark.parametrize("read_latency", [1, 2])
+@pytest.mark.parametrize("testcase", tests)
+def test_burst_read_each(testcase, read_latency):
+    """Runs each test independently. Continues on test failure."""
+    # the skid buffer has to cover the read latency plus the word being taken
+    params = {"read_latency": read_latency, "skid_log2": 2 if read_latency < 3 else 3}
+    run_test(parameters=params, sources=sources, module_name="test_burst_read", hdl_toplevel="burst_read", testcase=testcase)
+
+def test_burst_read_all():
+    """Runs all tests sequentially in one simulation."""
+    run_test(parameters={}, sources=sources, module_name="test_burst_read", hdl_toplevel="burst_read")
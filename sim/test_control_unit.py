@@ -0,0 +1,297 @@
+import struct
+import cocotb
+from cocotb.triggers import FallingEdge, ReadOnly, with_timeout
+from pathlib import Path
+import pytest
+from shared import clock_start, reset_sequence
+from runner import run_test
+from isa import Instruction, to_bytes, INSTR_BYTES
+from model.dma import WishboneMemory
+from wishbone_slave import WishboneSlave
+
+# command ports of the execution units; the scalar parameter loads go through the SRAM port
+UNITS = ("dma", "w", "mm", "host")
+
+class ControlBench():
+    """
+    Drives the control unit's environment: instruction memory, one model per
+    execution unit and the SRAM transaction port. Every accepted command is
+    appended to self.log as (cycle, unit, operands), in issue order.
+    """
+    def __init__(self, dut, unit_cycles=None, wait_prob=0.0, latency=0):
+        self.dut = dut
+        self.mem = WishboneMemory(1 << 16, "DRAM")
+        # the m1 port: LiteDRAM, pipelined
+        self.slave = WishboneSlave(dut, self.mem, pipelined=True, latency=latency, stall_prob=wait_prob)
+        self.unit_cycles = {u: 4 for u in UNITS}
+        self.unit_cycles.update(unit_cycles or {})
+        self.cycle = 0
+        self.log = []
+        # cycle each unit last became idle again
+        self.finished = {u: None for u in UNITS + ("param",)}
+
+    def start(self):
+        self.slave.start()
+        cocotb.start_soon(self._count())
+        for u in UNITS:
+            cocotb.start_soon(self._unit(u))
+        cocotb.start_soon(self._sram())
+
+    async def _count(self):
+        while True:
+            await FallingEdge(self.dut.clk_i)
+            self.cycle += 1
+
+    def operands(self, unit):
+        dut = self.dut
+        ops = {"sram_addr": dut.cmd_sram_addr_o.value.to_unsigned(), "len": dut.cmd_len_o.value.to_unsigned()}
+        if unit == "dma":
+            ops["to_dram"] = dut.cmd_to_dram_o.value.to_unsigned()
+            ops["dram_addr"] = dut.cmd_dram_addr_o.value.to_unsigned()
+        if unit in ("w", "mm"):
+            ops["bank"] = dut.cmd_bank_o.value.to_unsigned()
+        if unit == "mm":
+            ops["out_addr"] = dut.cmd_dram_addr_o.value.to_unsigned()
+        return ops
+
+    async def _unit(self, unit):
+        """Accepts a command when idle, then stays busy for unit_cycles[unit] cycles."""
+        dut = self.dut
+        valid_o = getattr(dut, f"{unit}_valid_o")
+        ready_i = getattr(dut, f"{unit}_ready_i")
+        busy_i = getattr(dut, f"{unit}_busy_i")
+        remaining = 0
+        while True:
+            await FallingEdge(dut.clk_i)
+            ready_i.value = int(remaining == 0)
+            busy_i.value = int(remaining > 0)
+            await ReadOnly()
+            if remaining > 0:
+                remaining -= 1
+                if remaining == 0:
+                    self.finished[unit] = self.cycle + 1
+            elif valid_o.value == 1:
+                self.log.append((self.cycle, unit, self.operands(unit)))
+                remaining = self.unit_cycles[unit]
+
+    async def _sram(self):
+        """memory_transaction as seen from the control unit: busy until `amount` words are read."""
+        dut = self.dut
+        remaining = 0
+        while True:
+            await FallingEdge(dut.clk_i)
+            dut.sram_load_ready_i.value = int(remaining == 0)
+            await ReadOnly()
+            if remaining > 0:
+                assert dut.sram_rd_ready_o.value == 1, "parameter load stopped reading mid-transaction"
+                remaining -= 1
+                if remaining == 0:
+                    self.finished["param"] = self.cycle + 1
+            elif dut.sram_load_valid_o.value == 1:
+                assert dut.sram_rw_mode_o.value == 0, "parameter loads are reads"
+                en = [dut.load_bias_en_o.value, dut.load_zp_en_o.value, dut.load_scale_en_o.value]
+                assert sum(int(e) for e in en) == 1, f"exactly one scalar load enable expected, got {en}"
+                kind = ("bias", "zp", "scale")[[int(e) for e in en].index(1)]
+                self.log.append((self.cycle, "param", {"kind": kind, "sram_addr": dut.sram_addr_o.value.to_unsigned(),
+                                                       "len": dut.sram_amount_o.value.to_unsigned()}))
+                remaining = max(1, dut.sram_amount_o.value.to_unsigned())
+
+    async def run(self, program, pc=0x100, timeout_cycles=2000):
+        """Loads program at pc, starts the control unit and waits for EXIT. Returns the cycles it took."""
+        dut = self.dut
+        self.mem.write_bytes(pc, program if isinstance(program, bytes) else to_bytes(program))
+        await FallingEdge(dut.clk_i)
+        dut.pc_i.value = pc
+        dut.start_i.value = 1
+        await FallingEdge(dut.clk_i)
+        dut.start_i.value = 0
+        start = self.cycle
+        await with_timeout(self._wait_done(), timeout_cycles * 10, "ns")
+        return self.cycle - start
+
+    async def _wait_done(self):
+        while True:
+            await FallingEdge(self.dut.clk_i)
+            if self.dut.done_o.value == 1 or self.dut.error_o.value == 1:
+                return
+
+async def do_reset(dut):
+    dut.start_i.value = 0
+    dut.pc_i.value = 0
+    dut.wb_dat_i.value = 0
+    dut.wb_ack_i.value = 0
+    dut.wb_stall_i.value = 0
+    dut.sram_load_ready_i.value = 1
+    for u in UNITS:
+        getattr(dut, f"{u}_ready_i").value = 0
+        getattr(dut, f"{u}_busy_i").value = 0
+    await clock_start(dut.clk_i)
+    await reset_sequence(dut.clk_i, dut.rst_i)
+    await FallingEdge(dut.clk_i)
+
+# one of everything, every instruction that consumes another unit's output is synced
+PROGRAM = [
+    Instruction("gmem2smem", sram_addr=0x00, length=16, dram_addr=0x1000),
+    Instruction("load_bias", sram_addr=0x20, length=4, sync=True),
+    Instruction("load_zp", sram_addr=0x24, length=4),
+    Instruction("load_scale", sram_addr=0x28, length=4),
+    Instruction("do_relu", flag=True),
+    Instruction("load_weights", sram_addr=0x40, length=8),
+    Instruction("matmul", sram_addr=0x00, length=16, dram_addr=0x80),
+    Instruction("smem2gmem", sram_addr=0x80, length=16, dram_addr=0x2000, sync=True),
+    Instruction("to_host_spi", sram_addr=0x80, length=16),
+    Instruction("exit"),
+]
+
+PROGRAM_COMMANDS = [
+    ("dma", {"sram_addr": 0x00, "len": 16, "to_dram": 0, "dram_addr": 0x1000}),
+    ("param", {"kind": "bias", "sram_addr": 0x20, "len": 4}),
+    ("param", {"kind": "zp", "sram_addr": 0x24, "len": 4}),
+    ("param", {"kind": "scale", "sram_addr": 0x28, "len": 4}),
+    ("w", {"sram_addr": 0x40, "len": 8, "bank": 0}),
+    ("mm", {"sram_addr": 0x00, "len": 16, "bank": 0, "out_addr": 0x80}),
+    ("dma", {"sram_addr": 0x80, "len": 16, "to_dram": 1, "dram_addr": 0x2000}),
+    ("host", {"sram_addr": 0x80, "len": 16}),
+]
+
+async def check_program(dut, wait_prob, latency=0):
+    await do_reset(dut)
+    bench = ControlBench(dut, wait_prob=wait_prob, latency=latency)
+    bench.start()
+    cycles = await bench.run(PROGRAM)
+    cocotb.log.info(f"{len(PROGRAM)} instructions in {cycles} cycles, {bench.slave.reads} fetches, {bench.slave.stats()}")
+
+    assert [(u, ops) for _, u, ops in bench.log] == PROGRAM_COMMANDS
+    assert dut.error_o.value == 0
+    assert dut.relu_en_o.value == 1
+    # a read held across stall-free cycles would be taken again and show up here
+    assert bench.slave.reads == 2 * len(PROGRAM), "fetched a word twice or past EXIT"
+    assert bench.slave.max_outstanding == 1
+    assert bench.slave.writes == 0, "instruction fetch must not write"
+    await FallingEdge(dut.clk_i)
+    assert dut.busy_o.value == 0
+    assert dut.tpu_active_o.value == 0
+    assert dut.wb_cyc_o.value == 0
+
+@cocotb.test()
+async def test_program(dut):
+    """Runs one instruction of each kind and checks the commands every unit receives."""
+    await check_program(dut, wait_prob=0.0)
+
+@cocotb.test()
+async def test_program_wait_states(dut):
+    """Same program with a stalling instruction memory."""
+    await check_program(dut, wait_prob=0.6)
+
+@cocotb.test()
+async def test_program_fetch_latency(dut):
+    """Same program with DRAM-like fetch latency: every fetch waits 2 to 6 cycles for its ack."""
+    await check_program(dut, wait_prob=0.0, latency=(2, 6))
+
+@cocotb.test()
+async def test_back_to_back(dut):
+    """Independent instructions issue while earlier ones are still running, one per fetched instruction."""
+    await do_reset(dut)
+    bench = ControlBench(dut, unit_cycles={u: 40 for u in UNITS})
+    bench.start()
+    program = [
+        Instruction("gmem2smem", sram_addr=0, length=8, dram_addr=0x1000),
+        Instruction("load_weights", sram_addr=0, length=8),
+        Instruction("to_host_spi", sram_addr=0x10, length=8),
+        Instruction("load_bias", sram_addr=0x20, length=30),
+        Instruction("exit"),
+    ]
+    await bench.run(program)
+
+    issue = [c for c, _, _ in bench.log]
+    cocotb.log.info(f"issue cycles {issue}")
+    assert [u for _, u, _ in bench.log] == ["dma", "w", "host", "param"]
+    # two 32-bit fetches per instruction bound the issue rate. The SRAM request of a
+    # parameter load shows up one cycle after it issues
+    limits = [INSTR_BYTES // 4 + (u == "param") for _, u, _ in bench.log[1:]]
+    assert all(b - a <= l for a, b, l in zip(issue, issue[1:], limits)), f"issue gaps too large: {issue}"
+    assert issue[-1] < min(f for f in bench.finished.values() if f is not None), "waited for a unit it does not use"
+
+@cocotb.test()
+async def test_sync(dut):
+    """A synced instruction waits until every unit is idle, an unsynced one does not."""
+    await do_reset(dut)
+    bench = ControlBench(dut, unit_cycles={"dma": 30})
+    bench.start()
+    program = [
+        Instruction("gmem2smem", sram_addr=0, length=8, dram_addr=0x1000),
+        Instruction("to_host_spi", sram_addr=0x10, length=8),
+        Instruction("load_weights", sram_addr=0, length=8, sync=True),
+        Instruction("exit"),
+    ]
+    await bench.run(program)
+
+    (dma_c, _, _), (host_c, _, _), (w_c, _, _) = bench.log
+    assert host_c < bench.finished["dma"]
+    assert w_c >= bench.finished["dma"], f"synced LOAD_WEIGHTS issued at {w_c}, DMA busy until {bench.finished['dma']}"
+
+@cocotb.test()
+async def test_weight_double_buffer(dut):
+    """LOAD_WEIGHTS fills the other bank during a MATMUL, but never the bank the MATMUL uses."""
+    await do_reset(dut)
+    bench = ControlBench(dut, unit_cycles={"w": 4, "mm": 40})
+    bench.start()
+    program = [
+        Instruction("load_weights", sram_addr=0x00, length=8),
+        Instruction("matmul", sram_addr=0x80, length=32, dram_addr=0xC0),
+        Instruction("load_weights", sram_addr=0x08, length=8),
+        Instruction("load_weights", sram_addr=0x10, length=8),
+        Instruction("exit"),
+    ]
+    await bench.run(program)
+
+    (w0, _, ops0), (mm, _, mm_ops), (w1, _, ops1), (w2, _, ops2) = bench.log
+    assert [ops0["bank"], mm_ops["bank"], ops1["bank"], ops2["bank"]] == [0, 0, 1, 0]
+    assert mm >= w0 + bench.unit_cycles["w"], "MATMUL started before its weights were loaded"
+    assert w1 < bench.finished["mm"], "loading the idle bank waited for the MATMUL"
+    assert w2 >= bench.finished["mm"], "overwrote the bank of the running MATMUL"
+
+@cocotb.test()
+async def test_illegal_opcode(dut):
+    """An unknown opcode stops the program with error_o instead of done_o."""
+    await do_reset(dut)
+    bench = ControlBench(dut)
+    bench.start()
+    program = to_bytes([Instruction("load_weights", sram_addr=0, length=8)]) + struct.pack("<II", 0xF, 0)
+    await bench.run(program)
+
+    assert dut.error_o.value == 1
+    assert dut.done_o.value == 0
+    assert [u for _, u, _ in bench.log] == ["w"]
+    # the bus is released once the read in flight is acked
+    for _ in range(4):
+        await FallingEdge(dut.clk_i)
+        if dut.tpu_active_o.value == 0:
+            break
+    assert dut.tpu_active_o.value == 0
+
+    # a new start clears the error and runs normally
+    await bench.run([Instruction("exit")], pc=0x400)
+    assert dut.error_o.value == 0
+
+tests = [
+    "test_program",
+    "test_program_wait_states",
+    "test_program_fetch_latency",
+    "test_back_to_back",
+    "test_sync",
+    "test_weight_double_buffer",
+    "test_illegal_opcode",
+]
+
+proj_path = Path("./rtl").resolve()
+sources = [proj_path / "control_unit.sv", proj_path / "fifo.sv"]
+
+@pytest.mark.parametrize("testcase", tests)
+def test_control_unit_each(testcase):
+    """Runs each test independently. Continues on test failure."""
+    run_test(parameters={}, sources=sources, module_name="test_control_unit", hdl_toplevel="control_unit", testcase=testcase)
+
+def test_control_unit_all():
+    """Runs all tests sequentially in one simulation."""
+    run_test(parameters={}, sources=sources, module_name="test_control_unit", hdl_toplevel="control_unit")
@@ -0,0 +1,277 @@
+import random
+import cocotb
+from cocotb.triggers import FallingEdge, ReadOnly
+from pathlib import Path
+import pytest
+from shared import clock_start, reset_sequence
+from runner import run_test
+from model.dma import WishboneMemory
+from wishbone_slave import WishboneSlave, RowBuffer
+
+class SramTransactionModel():
+    """
+    The memory_transaction interface of activation_sram: a transaction is
+    loaded while idle, then every sram_wr_valid_o / sram_rd_ready_o moves one
+    word at the next address, reads returning the word one cycle later.
+    """
+    def __init__(self, dut):
+        self.dut = dut
+        self.words = 1 << dut.address_width.value.to_unsigned()
+        self.mem = [0] * self.words
+        self.in_use = False
+
+    def start(self):
+        return cocotb.start_soon(self._run())
+
+    async def _run(self):
+        dut = self.dut
+        read = None
+        while True:
+            await FallingEdge(dut.clk_i)
+            dut.sram_load_ready_i.value = int(not self.in_use)
+            dut.sram_downstream_ready_i.value = int(self.in_use)
+            dut.sram_rd_data_i.value = read if read is not None else random.getrandbits(64)
+            read = None
+            await ReadOnly()
+            wr = dut.sram_wr_valid_o.value == 1
+            rd = dut.sram_rd_ready_o.value == 1
+            if not self.in_use:
+                assert not wr and not rd, "SRAM access without a transaction"
+                if dut.sram_load_valid_o.value == 1:
+                    self.addr = dut.sram_addr_o.value.to_unsigned()
+                    self.amount = dut.sram_amount_o.value.to_unsigned()
+                    self.write = dut.sram_rw_mode_o.value == 1
+                    self.count = 0
+                    self.in_use = True
+            elif wr or rd:
+                assert not (wr and rd)
+                assert wr == self.write, "access does not match the transaction direction"
+                if wr:
+                    self.mem[self.addr] = dut.sram_wr_data_o.value.to_unsigned()
+                else:
+                    read = self.mem[self.addr]
+                self.addr = (self.addr + 1) % self.words
+                self.count += 1
+                if self.count == self.amount:
+                    self.in_use = False
+
+class DmaBench():
+    def __init__(self, dut, latency=4, stall_prob=0.0):
+        self.dut = dut
+        self.dram = WishboneMemory(1 << 16, "DRAM")
+        # LiteDRAM stand-in
+        self.bus = WishboneSlave(dut, self.dram, pipelined=True, latency=latency, stall_prob=stall_prob)
+        self.sram = SramTransactionModel(dut)
+        self.bus.start()
+        self.sram.start()
+
+    async def issue(self, dram_addr, sram_addr, length, to_dram):
+        """Hands the DMA one command, like the control unit's dma_valid_o / dma_ready_i."""
+        dut = self.dut
+        await FallingEdge(dut.clk_i)
+        dut.cmd_dram_addr_i.value = dram_addr
+        dut.cmd_sram_addr_i.value = sram_addr
+        dut.cmd_len_i.value = length
+        dut.cmd_to_dram_i.value = int(to_dram)
+        dut.cmd_valid_i.value = 1
+        while True:
+            await ReadOnly()
+            accepted = dut.cmd_ready_o.value == 1
+            await FallingEdge(dut.clk_i)
+            if accepted:
+                break
+        dut.cmd_valid_i.value = 0
+
+    async def wait_idle(self, timeout_cycles=5000):
+        """Cycles until busy_o drops."""
+        dut = self.dut
+        for cycles in range(timeout_cycles):
+            await ReadOnly()
+            if dut.busy_o.value == 0:
+                return cycles
+            await FallingEdge(dut.clk_i)
+        assert False, "DMA still busy"
+
+    async def transfer(self, dram_addr, sram_addr, length, to_dram):
+        await self.issue(dram_addr, sram_addr, length, to_dram)
+        return await self.wait_idle()
+
+def pack(data):
+    """SRAM words of a byte string, little endian, like the DMA packs bus words."""
+    return [int.from_bytes(data[i:i + 8], "little") for i in range(0, len(data), 8)]
+
+async def do_reset(dut):
+    dut.cmd_dram_addr_i.value = 0
+    dut.cmd_sram_addr_i.value = 0
+    dut.cmd_len_i.value = 0
+    dut.cmd_to_dram_i.value = 0
+    dut.cmd_valid_i.value = 0
+    dut.wb_dat_i.value = 0
+    dut.wb_ack_i.value = 0
+    dut.wb_stall_i.value = 0
+    dut.sram_load_ready_i.value = 1
+    dut.sram_downstream_ready_i.value = 0
+    dut.sram_rd_data_i.value = 0
+    await clock_start(dut.clk_i)
+    await reset_sequence(dut.clk_i, dut.rst_i)
+
+async def check_gmem2smem(bench, dram_addr, sram_addr, length):
+    data = random.randbytes(8 * length)
+    bench.dram.write_bytes(dram_addr, data)
+    cycles = await bench.transfer(dram_addr, sram_addr, length, to_dram=False)
+    words = bench.sram.words
+    assert [bench.sram.mem[(sram_addr + i) % words] for i in range(length)] == pack(data)
+    return cycles
+
+async def check_smem2gmem(bench, dram_addr, sram_addr, length):
+    words = bench.sram.words
+    data = random.randbytes(8 * length)
+    for i, w in enumerate(pack(data)):
+        bench.sram.mem[(sram_addr + i) % words] = w
+    cycles = await bench.transfer(dram_addr, sram_addr, length, to_dram=True)
+    assert bench.dram.read_bytes(dram_addr, 8 * length) == data
+    return cycles
+
+@cocotb.test()
+async def test_reset(dut):
+    await do_reset(dut)
+    assert dut.cmd_ready_o.value == 1
+    assert dut.busy_o.value == 0
+    assert dut.wb_cyc_o.value == 0
+    assert dut.sram_load_valid_o.value == 0
+
+@cocotb.test()
+async def test_gmem2smem(dut):
+    await do_reset(dut)
+    bench = DmaBench(dut)
+    await check_gmem2smem(bench, 0x100, 10, 16)
+    assert bench.bus.requests == 32
+    # one linear incrementing burst, end of burst on the last request
+    assert bench.bus.cti == [0b010] * 31 + [0b111]
+
+@cocotb.test()
+async def test_smem2gmem(dut):
+    await do_reset(dut)
+    bench = DmaBench(dut)
+    await check_smem2gmem(bench, 0x2000, 200, 16)
+    assert bench.bus.requests == 32
+
+@cocotb.test()
+async def test_sram_wraps(dut):
+    """The SRAM address wraps like memory_transaction's counter."""
+    await do_reset(dut)
+    bench = DmaBench(dut)
+    await check_gmem2smem(bench, 0x400, 250, 12)
+    await check_smem2gmem(bench, 0x800, 250, 12)
+
+@cocotb.test()
+async def test_latency_stalls(dut):
+    """Random latency and stalls in both directions; the data always comes through intact."""
+    await do_reset(dut)
+    bench = DmaBench(dut)
+    for _ in range(6):
+        bench.bus.latency = random.randint(1, 12)
+        bench.bus.stall_prob = random.choice([0.1, 0.3, 0.6])
+        await check_gmem2smem(bench, 4 * random.randint(0, 1000), random.randint(0, 255), random.randint(1, 40))
+        await check_smem2gmem(bench, 4 * random.randint(0, 1000), random.randint(0, 255), random.randint(1, 40))
+
+@cocotb.test()
+async def test_outstanding(dut):
+    """Reads overlap the DRAM latency, up to the buffer the credits allow."""
+    await do_reset(dut)
+    depth = 1 << dut.OUTSTANDING_LOG2.value.to_unsigned()
+    latency = 6
+    bench = DmaBench(dut, latency=latency)
+    length = 64
+    cycles = await check_gmem2smem(bench, 0, 0, length)
+    # a credit comes back latency + 2 cycles after its request was issued
+    per_word = max(1.0, (latency + 2) / depth)
+    cocotb.log.info(f"{2 * length} bus words in {cycles} cycles: {bench.bus.stats()}")
+    assert bench.bus.max_outstanding == min(depth, latency)
+    assert cycles <= 2 * length * per_word + latency + 8
+
+@cocotb.test()
+async def test_write_throughput(dut):
+    """Pipelined writes: one bus word per cycle, the latency paid once."""
+    await do_reset(dut)
+    latency = 6
+    bench = DmaBench(dut, latency=latency)
+    length = 64
+    cycles = await check_smem2gmem(bench, 0, 0, length)
+    assert cycles <= 2 * length + latency + 8
+
+@cocotb.test()
+async def test_row_buffer(dut):
+    """Open-row DRAM timing: a sequential transfer misses once per row, and pipelining hides the rest."""
+    await do_reset(dut)
+    rows = RowBuffer(hit=4, miss=12, row_bytes=256, banks=4)
+    bench = DmaBench(dut, latency=rows)
+    length = 64
+    await check_gmem2smem(bench, 0, 0, length)
+    stats = bench.bus.stats()
+    cocotb.log.info(stats)
+    assert stats["row_misses"] == 8 * length // 256
+    assert stats["row_hits"] == 2 * length - stats["row_misses"]
+    assert stats["bytes"] == 8 * length
+    assert stats["latency_min"] >= rows.hit
+
+@cocotb.test()
+async def test_slave_queue(dut):
+    """A slave that only queues two requests stalls the DMA instead of losing any."""
+    await do_reset(dut)
+    bench = DmaBench(dut, latency=5)
+    bench.bus.queue_depth = 2
+    await check_gmem2smem(bench, 0x200, 0, 24)
+    await check_smem2gmem(bench, 0x600, 0, 24)
+    assert bench.bus.max_outstanding == 2
+
+@cocotb.test()
+async def test_back_to_back(dut):
+    """Commands in both directions right after each other, as the control unit issues them."""
+    await do_reset(dut)
+    bench = DmaBench(dut, latency=3, stall_prob=0.2)
+    data = random.randbytes(8 * 32)
+    bench.dram.write_bytes(0x1000, data)
+    await bench.issue(0x1000, 0, 16, to_dram=False)
+    await bench.issue(0x1080, 16, 16, to_dram=False)
+    await bench.issue(0x3000, 0, 32, to_dram=True)
+    await bench.wait_idle()
+    assert bench.sram.mem[:32] == pack(data)
+    assert bench.dram.read_bytes(0x3000, len(data)) == data
+
+@cocotb.test()
+async def test_zero_length(dut):
+    """A command of length 0 is taken and does nothing."""
+    await do_reset(dut)
+    bench = DmaBench(dut)
+    await bench.issue(0x100, 0, 0, to_dram=False)
+    assert await bench.wait_idle() == 0
+    assert bench.bus.requests == 0
+    await check_gmem2smem(bench, 0x100, 0, 1)
+
+tests = [
+    "test_reset",
+    "test_gmem2smem",
+    "test_smem2gmem",
+    "test_sram_wraps",
+    "test_latency_stalls",
+    "test_outstanding",
+    "test_write_throughput",
+    "test_row_buffer",
+    "test_slave_queue",
+    "test_back_to_back",
+    "test_zero_length",
+]
+
+proj_path = Path("./rtl").resolve()
+sources = [proj_path / "dma.sv", proj_path / "fifo.sv"]
+
+@pytest.mark.parametrize("outstanding_log2", [1, 3])
+@pytest.mark.parametrize("testcase", tests)
+def test_dma_each(testcase, outstanding_log2):
+    """Runs each test independently. Continues on test failure."""
+    run_test(parameters={"OUTSTANDING_LOG2": outstanding_log2}, sources=sources, module_name="test_dma", hdl_toplevel="dma", testcase=testcase)
+
+def test_dma_all():
+    """Runs all tests sequentially in one simulation."""
+    run_test(parameters={}, sources=sources, module_name="test_dma", hdl_toplevel="dma")
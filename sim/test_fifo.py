@@ -3,7 +3,7 @@ import cocotb
 from cocotb.clock import Clock
 from cocotb.triggers import RisingEdge, ClockCycles, FallingEdge, ReadWrite, ReadOnly, Event
 from pathlib import Path
-from shared import reset_sequence, clock_start, random_binary_driver, handshake
+from shared import reset_sequence, clock_start, random_binary_driver, HandshakeMonitor, stim_knob
 from runner import run_test
 from collections import deque
 import random
@@ -38,26 +38,19 @@ class ModelRunner():
         self.data_o = dut.data_o
 
     def start(self):
-        cocotb.start_soon(self.run_input())
-        cocotb.start_soon(self.run_output())
-
-    async def run_input(self):
-        while True:
-            await handshake(self.clk_i, self.rst_i, self.ready_o, self.valid_i)
-            self.model.consume(self.dut)
-
-    async def run_output(self):
-        while True:
-            await handshake(self.clk_i, self.rst_i, self.ready_i, self.valid_o)
-            self.model.produce(self.dut)
+        monitor = HandshakeMonitor(self.clk_i, self.rst_i)
+        monitor.add(self.ready_o, self.valid_i, lambda: self.model.consume(self.dut))
+        monitor.add(self.ready_i, self.valid_o, lambda: self.model.produce(self.dut))
+        return monitor.start()
 
 # model for streaming n elements with or without backpressure
 class StreamIOModel():
-    def __init__(self, dut, length, in_pressure, out_pressure):
+    def __init__(self, dut, length, in_pressure, out_pressure, max_toggles=None):
         self.dut = dut
         self.length = length
         self.in_pressure = in_pressure
         self.out_pressure = out_pressure
+        self.max_toggles = max_toggles
         self.n_rd = 0
         self.n_wr = 0
 
@@ -78,7 +71,7 @@ class StreamIOModel():
         await FallingEdge(clk_i)
 
         if (self.in_pressure):
-            cocotb.start_soon(random_binary_driver(clk_i, valid_i, prob=0.5, max_hold=10, stop_event=stop_event))
+            cocotb.start_soon(random_binary_driver(clk_i, valid_i, prob=0.5, max_hold=10, stop_event=stop_event, max_toggles=self.max_toggles))
         else:
             valid_i.value = 1
 
@@ -114,7 +107,7 @@ class StreamIOModel():
         await FallingEdge(clk_i)
 
         if (self.out_pressure):
-            cocotb.start_soon(random_binary_driver(clk_i, ready_i, prob=0.5, max_hold=10, stop_event=stop_event))
+            cocotb.start_soon(random_binary_driver(clk_i, ready_i, prob=0.5, max_hold=10, stop_event=stop_event, max_toggles=self.max_toggles))
         else:
             ready_i.value = 1
 
@@ -199,7 +192,9 @@ async def fifo_random_stream_test(dut, with_pressure):
 
     m = FifoModel()
     r = ModelRunner(dut, m)
-    iom = StreamIOModel(dut, 10, with_pressure, with_pressure)
+    # STIM_ITEMS / STIM_TOGGLES shrink the stimulus (sim/shrink.py)
+    iom = StreamIOModel(dut, stim_knob("items", 10), with_pressure, with_pressure,
+                        max_toggles=stim_knob("toggles", 1000, minimum=0))
 
 
     await clock_start(clk_i)
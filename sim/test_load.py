@@ -24,6 +24,7 @@ from cocotb.clock import Clock
 from cocotb.triggers import RisingEdge, ReadOnly, with_timeout
 
 from runner import run_test
+from shared import stim_knob
 
 
 # ──────────────────────────────────────────────────────────────────────────────
@@ -390,7 +391,7 @@ async def test_fuzz(dut):
     await reset_sequence(dut)
 
     rng = random.Random(0xC0FFEE)
-    for i in range(50):
+    for i in range(stim_knob("tiles", 50)):
         model = LoaderModel()
         await with_timeout(
             run_one_tile(dut, model,
@@ -0,0 +1,104 @@
+import random
+import cocotb
+from cocotb.triggers import FallingEdge, ReadOnly
+from pathlib import Path
+import pytest
+import numpy as np
+from shared import clock_start, reset_sequence
+from runner import run_test
+from refmodel import lut_table, lut_ref, assert_matrix_equal
+
+async def do_reset(dut, table=None, lut_en=0):
+    """Resets with the given table (random if None) on table_i."""
+    N = dut.N.value.to_unsigned()
+    if table is None:
+        table = [random.randint(-128, 127) for _ in range(256)]
+    for i in range(256):
+        dut.table_i[i].value = int(table[i])
+    dut.lut_en_i.value = lut_en
+    for i in range(N):
+        dut.data_i[i].value = 0
+    dut.data_valid_i.value = 0
+    dut.data_ready_i.value = 0
+    await clock_start(dut.clk_i)
+    await reset_sequence(dut.clk_i, dut.rst_i)
+    await FallingEdge(dut.clk_i)
+    return table
+
+async def stream(dut, vectors, ready_prob=1.0, valid_prob=1.0):
+    """Pushes every vector through with random gaps and backpressure, returns the output vectors."""
+    N = dut.N.value.to_unsigned()
+    got = []
+    nin = 0
+    while len(got) < len(vectors):
+        valid = nin < len(vectors) and random.random() < valid_prob
+        if valid:
+            for i in range(N):
+                dut.data_i[i].value = int(vectors[nin][i])
+        dut.data_valid_i.value = int(valid)
+        dut.data_ready_i.value = int(random.random() < ready_prob)
+        await ReadOnly()
+        if dut.data_valid_i.value == 1 and dut.data_ready_o.value == 1:
+            nin += 1
+        if dut.data_ready_i.value == 1 and dut.data_valid_o.value == 1:
+            got.append([dut.data_o[i].value.to_signed() for i in range(N)])
+        await FallingEdge(dut.clk_i)
+    dut.data_valid_i.value = 0
+    dut.data_ready_i.value = 0
+    return got
+
+def random_vectors(n, N):
+    return np.array([[random.randint(-128, 127) for _ in range(N)] for _ in range(n)], dtype=np.int64)
+
+@cocotb.test()
+async def test_reset(dut):
+    await do_reset(dut)
+    assert dut.data_valid_o.value == 0
+    assert dut.data_ready_o.value == 1
+
+@cocotb.test()
+async def test_bypass(dut):
+    """lut_en_i = 0 passes the values through, whatever the table holds."""
+    await do_reset(dut, lut_en=0)
+    vectors = random_vectors(50, dut.N.value.to_unsigned())
+    got = await stream(dut, vectors, ready_prob=0.7)
+    assert_matrix_equal(got, vectors)
+
+@cocotb.test()
+async def test_all_entries(dut):
+    """Every input value, in every lane, against a random table."""
+    table = await do_reset(dut, lut_en=1)
+    N = dut.N.value.to_unsigned()
+    values = list(range(-128, 128))
+    vectors = np.array([[values[(v + lane) % 256] for lane in range(N)] for v in range(256)], dtype=np.int64)
+    got = await stream(dut, vectors)
+    assert_matrix_equal(got, lut_ref(vectors, table))
+
+@cocotb.test()
+async def test_sigmoid(dut):
+    """A TFLite-quantized sigmoid table under random input gaps and backpressure."""
+    table = lut_table("sigmoid", in_scale=0.0625, in_zp=-3)
+    await do_reset(dut, table, lut_en=1)
+    vectors = random_vectors(100, dut.N.value.to_unsigned())
+    got = await stream(dut, vectors, ready_prob=0.6, valid_prob=0.8)
+    assert_matrix_equal(got, lut_ref(vectors, table))
+
+tests = [
+    "test_reset",
+    "test_bypass",
+    "test_all_entries",
+    "test_sigmoid",
+]
+
+proj_path = Path("./rtl").resolve()
+sources = [proj_path / "scalar_units/lut_n.sv", proj_path / "utils/elastic.sv"]
+
+@pytest.mark.parametrize("skid_p", [0, 1])
+@pytest.mark.parametrize("testcase", tests)
+def test_lut_n_each(testcase, skid_p):
+    """Runs each test independently. Continues on test failure."""
+    run_test(parameters={"skid_p": skid_p}, sources=sources, module_name="test_lut_n", hdl_toplevel="lut_n", testcase=testcase)
+
+def test_lut_n_all():
+    """Runs all tests sequentially in one simulation."""
+    run_test(parameters={}, sources=sources, module_name="test_lut_n", hdl_toplevel="lut_n")
@@ -0,0 +1,252 @@
+import random
+import cocotb
+from cocotb.triggers import FallingEdge, ReadOnly, ClockCycles
+from pathlib import Path
+import pytest
+from shared import clock_start, reset_sequence
+from runner import run_test
+from perf_csr import PERF_REGS, COUNTERS, CTRL_ENABLE, CTRL_CLEAR, decode, delta, utilization
+
+EVENTS = ["array_busy_i", "weight_load_i", "scalar_valid_i", "scalar_ready_i",
+          "sram_rd_i", "sram_wr_i"]
+TPU_BUS = ["tpu_wb_cyc_i", "tpu_wb_stb_i", "tpu_wb_stall_i", "tpu_wb_ack_i"]
+
+async def do_reset(dut):
+    dut.wb_adr_i.value = 0
+    dut.wb_dat_i.value = 0
+    dut.wb_we_i.value = 0
+    dut.wb_stb_i.value = 0
+    dut.wb_cyc_i.value = 0
+    dut.wb_sel_i.value = 0
+    for name in EVENTS + TPU_BUS:
+        getattr(dut, name).value = 0
+    await clock_start(dut.clk_i)
+    await reset_sequence(dut.clk_i, dut.rst_i)
+
+async def wb_access(dut, addr, data=None, timeout_cycles=10):
+    """One Wishbone B4 classic cycle, as the SPI bridge issues it. Returns the read data."""
+    await FallingEdge(dut.clk_i)
+    dut.wb_adr_i.value = addr
+    dut.wb_we_i.value = int(data is not None)
+    dut.wb_dat_i.value = data or 0
+    dut.wb_sel_i.value = 0xF
+    dut.wb_cyc_i.value = 1
+    dut.wb_stb_i.value = 1
+    for _ in range(timeout_cycles):
+        await ReadOnly()
+        if dut.wb_ack_o.value == 1:
+            value = dut.wb_dat_o.value.to_unsigned()
+            await FallingEdge(dut.clk_i)
+            dut.wb_cyc_i.value = 0
+            dut.wb_stb_i.value = 0
+            dut.wb_we_i.value = 0
+            return value
+        await FallingEdge(dut.clk_i)
+    assert False, f"no ack for address {addr:#x}"
+
+async def wb_read(dut, addr):
+    return await wb_access(dut, addr)
+
+async def wb_write(dut, addr, data):
+    await wb_access(dut, addr, data)
+
+async def read_all(dut):
+    """Like perf_csr.read_counters: freeze, read every counter, count again."""
+    await wb_write(dut, PERF_REGS["ctrl"], 0)
+    counters = {name: await wb_read(dut, PERF_REGS[name]) for name in COUNTERS}
+    await wb_write(dut, PERF_REGS["ctrl"], CTRL_ENABLE)
+    return counters
+
+class TpuBus():
+    """
+    The m1 master seen by the counters: B4 pipelined, a request is taken on
+    stb & ~stall and acked later, in order. wait counts the WB_WAIT cycles:
+    in a bus cycle, a request stalled or outstanding, and no ack.
+    """
+    def __init__(self):
+        self.outstanding = 0
+        self.wait = 0
+
+    def step(self, cyc, stb, stall, ack):
+        if cyc and (stb or self.outstanding) and not ack:
+            self.wait += 1
+        self.outstanding = self.outstanding + (stb and not stall) - ack if cyc else 0
+
+async def drive_bus(dut, trace, bus):
+    """Drives one (cyc, stb, stall, ack) tuple per cycle on the tpu_wb_* inputs and steps the model."""
+    for cyc, stb, stall, ack in trace:
+        await FallingEdge(dut.clk_i)
+        for name, v in zip(TPU_BUS, (cyc, stb, stall, ack)):
+            getattr(dut, name).value = int(v)
+        bus.step(cyc, stb, stall, ack)
+
+def random_bus(cycles):
+    """A legal pipelined bus: acks only for outstanding requests and only inside a bus cycle."""
+    trace = []
+    cyc = outstanding = 0
+    for _ in range(cycles):
+        if not cyc:
+            cyc = random.random() < 0.3
+            outstanding = 0
+        elif not outstanding and random.random() < 0.2:
+            cyc = 0
+        stb = int(cyc and random.random() < 0.5)
+        stall = random.randint(0, 1)
+        ack = int(cyc and outstanding > 0 and random.random() < 0.5)
+        trace.append((int(cyc), stb, stall, ack))
+        if cyc:
+            outstanding += (stb and not stall) - ack
+    return trace
+
+async def drive_events(dut, cycles):
+    """Random events and bus traffic for the given number of cycles, then all quiet. Returns the expected counts."""
+    expect = {name: 0 for name in COUNTERS if name != "cycles"}
+    bus = TpuBus()
+    trace = random_bus(cycles)
+    for t in range(cycles):
+        await FallingEdge(dut.clk_i)
+        ev = {name: random.randint(0, 1) for name in EVENTS}
+        for name, v in ev.items():
+            getattr(dut, name).value = v
+        for name, v in zip(TPU_BUS, trace[t]):
+            getattr(dut, name).value = v
+        bus.step(*trace[t])
+        expect["array_busy"] += ev["array_busy_i"]
+        expect["weight_load"] += ev["weight_load_i"]
+        expect["scalar_stall"] += ev["scalar_valid_i"] & (1 - ev["scalar_ready_i"])
+        expect["sram_reads"] += ev["sram_rd_i"]
+        expect["sram_writes"] += ev["sram_wr_i"]
+    expect["wb_wait"] = bus.wait
+    await FallingEdge(dut.clk_i)
+    for name in EVENTS + TPU_BUS:
+        getattr(dut, name).value = 0
+    return expect
+
+def pipelined_reads(n, latency, stall_every=0):
+    """
+    n reads issued back to back (stalled every stall_every-th cycle), each
+    acked latency cycles after it was taken; cyc drops after the last ack.
+    """
+    trace = []
+    taken = []
+    t = 0
+    while len(taken) < n or (taken and t <= taken[-1] + latency):
+        stb = len(taken) < n
+        stall = int(stb and stall_every > 0 and t % stall_every == stall_every - 1)
+        ack = int(any(t == c + latency for c in taken))
+        trace.append((1, int(stb), stall, ack))
+        if stb and not stall:
+            taken.append(t)
+        t += 1
+    return trace
+@cocotb.test()
+async def test_reset(dut):
+    await do_reset(dut)
+    assert await wb_read(dut, PERF_REGS["ctrl"]) == CTRL_ENABLE
+    for name in COUNTERS:
+        if name != "cycles":
+            assert await wb_read(dut, PERF_REGS[name]) == 0, name
+
+@cocotb.test()
+async def test_event_counts(dut):
+    """Every counter matches the events driven, cycle for cycle."""
+    await do_reset(dut)
+    await wb_write(dut, PERF_REGS["ctrl"], CTRL_CLEAR | CTRL_ENABLE)
+    n = 500
+    expect = await drive_events(dut, n)
+    got = await read_all(dut)
+    for name, count in expect.items():
+        assert got[name] == count, f"{name}: {got[name]} != {count}"
+    # the clear and the freeze write add a few cycles around the event window
+    assert n <= got["cycles"] <= n + 8
+
+@cocotb.test()
+async def test_freeze(dut):
+    """Writing 0 to CTRL stops every counter until it is enabled again."""
+    await do_reset(dut)
+    await drive_events(dut, 50)
+    await wb_write(dut, PERF_REGS["ctrl"], 0)
+    assert await wb_read(dut, PERF_REGS["ctrl"]) == 0
+    before = {name: await wb_read(dut, PERF_REGS[name]) for name in COUNTERS}
+    await drive_events(dut, 50)
+    after = {name: await wb_read(dut, PERF_REGS[name]) for name in COUNTERS}
+    assert before == after
+
+    await wb_write(dut, PERF_REGS["ctrl"], CTRL_ENABLE)
+    await ClockCycles(dut.clk_i, 10)
+    assert await wb_read(dut, PERF_REGS["cycles"]) > after["cycles"]
+
+@cocotb.test()
+async def test_clear(dut):
+    """Writing CLEAR zeroes all counters; with ENABLE clear they stay at zero."""
+    await do_reset(dut)
+    await drive_events(dut, 50)
+    await wb_write(dut, PERF_REGS["ctrl"], CTRL_CLEAR)
+    for name in COUNTERS:
+        assert await wb_read(dut, PERF_REGS[name]) == 0, name
+    assert await wb_read(dut, PERF_REGS["ctrl"]) == 0
+
+@cocotb.test()
+async def test_decode(dut):
+    """Two reads around a workload decode into the utilization of that workload."""
+    await do_reset(dut)
+    before = await read_all(dut)
+    expect = await drive_events(dut, 200)
+    after = await read_all(dut)
+    d = delta(before, after)
+    for name, count in expect.items():
+        assert d[name] == count, name
+    util = utilization(d)
+    assert util["array_busy"] == pytest.approx(expect["array_busy"] / d["cycles"])
+    assert 0.0 < util["array_busy"] < 1.0
+    words = [after[name] for name in COUNTERS]
+    assert decode(words) == after
+    assert decode([CTRL_ENABLE] + words) == after
+
+@cocotb.test()
+async def test_pipelined_wait(dut):
+    """
+    A pipelined master keeps several reads in flight against a slow slave:
+    WB_WAIT counts the cycles until the first ack and every stall, not the
+    request cycles of a burst that is streaming.
+    """
+    await do_reset(dut)
+    for n, latency, stall_every in [(8, 3, 0), (4, 10, 0), (16, 1, 0), (12, 5, 3)]:
+        await wb_write(dut, PERF_REGS["ctrl"], CTRL_CLEAR | CTRL_ENABLE)
+        bus = TpuBus()
+        trace = pipelined_reads(n, latency, stall_every)
+        await drive_bus(dut, trace + [(0, 0, 0, 0)], bus)
+        got = await read_all(dut)
+        assert got["wb_wait"] == bus.wait, f"n={n} latency={latency}: {got['wb_wait']} != {bus.wait}"
+        if not stall_every:
+            # requests go out every cycle and the acks follow every cycle from the first
+            assert bus.wait == latency
+        # waiting while the read buffer is full (stb low) counts too
+        assert bus.wait >= latency
+
+def test_delta_wraps():
+    """Counters wrap at 2**32; one wrap between two reads still gives the right difference."""
+    before = {name: 0xFFFFFFF0 for name in COUNTERS}
+    after = {name: 0x10 for name in COUNTERS}
+    assert delta(before, after) == {name: 0x20 for name in COUNTERS}
+
+tests = [
+    "test_reset",
+    "test_event_counts",
+    "test_freeze",
+    "test_clear",
+    "test_decode",
+    "test_pipelined_wait",
+]
+
+proj_path = Path("./rtl").resolve()
+sources = [proj_path / "perf_counters.sv"]
+
+@pytest.mark.parametrize("testcase", tests)
+def test_perf_counters_each(testcase):
+    """Runs each test independently. Continues on test failure."""
+    run_test(parameters={}, sources=sources, module_name="test_perf_counters", hdl_toplevel="perf_counters", testcase=testcase)
+
+def test_perf_counters_all():
+    """Runs all tests sequentially in one simulation."""
+    run_test(parameters={}, sources=sources, module_name="test_perf_counters", hdl_toplevel="perf_counters")
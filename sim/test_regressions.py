@@ -0,0 +1,21 @@
+"""
+Replays the reproducers saved by sim/shrink.py --save (sim/regressions.json):
+each entry reruns one testcase with its recorded seed and shrunk stimulus.
+"""
+import json
+from pathlib import Path
+import pytest
+from runner import run_test
+
+REGRESSIONS = Path(__file__).resolve().parent / "regressions.json"
+ROOT = REGRESSIONS.parent.parent
+
+def load_regressions():
+    return json.loads(REGRESSIONS.read_text()) if REGRESSIONS.is_file() else []
+
+@pytest.mark.parametrize("entry", load_regressions(), ids=lambda e: e["name"])
+def test_regression(entry):
+    passed = run_test(parameters=entry["parameters"], sources=[ROOT / s for s in entry["sources"]],
+                      module_name=entry["module"], hdl_toplevel=entry["toplevel"], testcase=entry["testcase"],
+                      sims=[entry["sim"]], seed=entry["seed"], stim=entry["stim"])
+    assert passed, f"regression {entry['name']} fails again"
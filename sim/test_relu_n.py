@@ -223,7 +223,7 @@ async def backpressure_test(dut):
 
 tests = ["reset_test", "known_values_test", "random_stress_test", "backpressure_test"]
 proj_path = Path("./rtl").resolve()
-sources = [proj_path / "scalar_units/relu_n.sv"]
+sources = [proj_path / "scalar_units/relu_n.sv", proj_path / "utils/elastic.sv"]
 
 
 @pytest.mark.parametrize("testcase", tests)
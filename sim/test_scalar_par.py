@@ -0,0 +1,186 @@
+import random
+import cocotb
+from cocotb.triggers import FallingEdge, ReadOnly, ClockCycles
+from pathlib import Path
+import pytest
+from shared import clock_start, reset_sequence
+from runner import run_test
+from refmodel import scalar_pipe_ref
+from test_scalar_stage import load_param, read_array_s8, FIXED_SHIFT
+from scalar_bottleneck import STAGES
+
+class WritebackSink():
+    """Takes a row, then is busy for words - 1 cycles, like the BUS_W writeback port. words=None never takes one."""
+    def __init__(self, dut, words=1):
+        self.dut = dut
+        self.words = words
+        self.N = dut.N.value.to_unsigned()
+        self.rows = []
+
+    def start(self):
+        return cocotb.start_soon(self._run())
+
+    async def _run(self):
+        dut = self.dut
+        busy = 0
+        while True:
+            await FallingEdge(dut.clk_i)
+            ready = self.words is not None and busy == 0
+            dut.data_ready_i.value = int(ready)
+            busy = max(0, busy - 1)
+            await ReadOnly()
+            if ready and dut.data_valid_o.value == 1:
+                self.rows.append(read_array_s8(dut.data_o, self.N))
+                busy = self.words - 1
+
+async def init(dut):
+    N = dut.N.value.to_unsigned()
+    dut.read_bus_i.value = 0
+    dut.load_valid_i.value = 0
+    dut.load_bias_en_i.value = 0
+    dut.load_zp_en_i.value = 0
+    dut.load_scale_en_i.value = 0
+    dut.load_lut_en_i.value = 0
+    dut.lut_en_i.value = 0
+    dut.data_ready_i.value = 0
+    for c in range(N):
+        dut.psum_i[c].value = 0
+        dut.psum_valid_i[c].value = 0
+    await clock_start(dut.clk_i)
+    await reset_sequence(dut.clk_i, dut.rst_i)
+
+async def load_params(dut):
+    """Random bias, no zero point and unit scale: the outputs are clamp(relu(psum + bias))."""
+    N = dut.N.value.to_unsigned()
+    bias = [random.randint(-20, 20) for _ in range(N)]
+    zp = [0] * N
+    scale = [1 << FIXED_SHIFT] * N
+    await load_param(dut, bias, dut.load_bias_en_i)
+    await load_param(dut, zp, dut.load_zp_en_i)
+    await load_param(dut, scale, dut.load_scale_en_i)
+    return lambda row: scalar_pipe_ref(row, bias, zp, scale, FIXED_SHIFT)
+
+async def drive_skewed(dut, rows):
+    """Like the array: column c of row m is valid m + c cycles after column 0 of row 0."""
+    N = dut.N.value.to_unsigned()
+    M = len(rows)
+    for t in range(M + N - 1):
+        await FallingEdge(dut.clk_i)
+        for c in range(N):
+            m = t - c
+            dut.psum_valid_i[c].value = int(0 <= m < M)
+            dut.psum_i[c].value = rows[m][c] if 0 <= m < M else 0
+    await FallingEdge(dut.clk_i)
+    for c in range(N):
+        dut.psum_valid_i[c].value = 0
+
+def random_rows(M, N):
+    return [[random.randint(-150, 150) for _ in range(N)] for _ in range(M)]
+
+def pipe_stages(dut):
+    """Registered stages per pipe: STAGES, one fewer without the LUT stage."""
+    return STAGES - 1 + dut.HAS_LUT.value.to_unsigned()
+
+async def wait_rows(dut, sink, n, timeout_cycles=2000):
+    for _ in range(timeout_cycles):
+        if len(sink.rows) >= n:
+            return
+        await FallingEdge(dut.clk_i)
+    assert False, f"only {len(sink.rows)} of {n} rows came out"
+
+@cocotb.test()
+async def test_reset(dut):
+    await init(dut)
+    assert dut.data_valid_o.value == 0
+    assert dut.overrun_o.value == 0
+
+@cocotb.test()
+async def test_rows_in_order(dut):
+    """A long burst at one row per cycle with a full-rate writeback: every row, in order, none dropped."""
+    await init(dut)
+    ref = await load_params(dut)
+    N = dut.N.value.to_unsigned()
+    rows = random_rows(40, N)
+    sink = WritebackSink(dut, words=1)
+    sink.start()
+    await drive_skewed(dut, rows)
+    await wait_rows(dut, sink, len(rows))
+    assert sink.rows == [ref(r) for r in rows]
+    assert dut.overrun_o.value == 0
+
+@cocotb.test()
+async def test_burst_absorbed(dut):
+    """The pipes hold a burst the writeback cannot keep up with, as long as it fits."""
+    await init(dut)
+    ref = await load_params(dut)
+    N = dut.N.value.to_unsigned()
+    P = dut.P.value.to_unsigned()
+    # never ready while the burst arrives: every row has to sit in a pipe
+    stages = pipe_stages(dut)
+    rows = random_rows(P * stages, N)
+    sink = WritebackSink(dut, words=None)
+    task = sink.start()
+    await drive_skewed(dut, rows)
+    await ClockCycles(dut.clk_i, 2 * stages)
+    assert dut.overrun_o.value == 0
+    task.cancel()
+    sink = WritebackSink(dut, words=2)
+    sink.start()
+    await wait_rows(dut, sink, len(rows))
+    assert sink.rows == [ref(r) for r in rows]
+
+@cocotb.test()
+async def test_overrun(dut):
+    """One row more than the pipes hold is dropped and flagged; the ones held come out intact."""
+    await init(dut)
+    ref = await load_params(dut)
+    N = dut.N.value.to_unsigned()
+    P = dut.P.value.to_unsigned()
+    stages = pipe_stages(dut)
+    held = P * stages * (2 if dut.SKID_MASK.value.to_unsigned() else 1)
+    rows = random_rows(held + 1, N)
+    sink = WritebackSink(dut, words=None)
+    task = sink.start()
+    await drive_skewed(dut, rows)
+    await ClockCycles(dut.clk_i, 2 * stages)
+    assert dut.overrun_o.value == 1
+    task.cancel()
+    sink = WritebackSink(dut, words=1)
+    sink.start()
+    await wait_rows(dut, sink, held)
+    await ClockCycles(dut.clk_i, 2 * stages)
+    assert sink.rows == [ref(r) for r in rows[:held]]
+
+tests = [
+    "test_reset",
+    "test_rows_in_order",
+    "test_burst_absorbed",
+    "test_overrun",
+]
+
+proj_path = Path("./rtl").resolve()
+sources = [
+    proj_path / "scalar_units/scalar_par.sv",
+    proj_path / "scalar_units/scalar_pipe.sv",
+    proj_path / "scalar_units/add_n.sv",
+    proj_path / "scalar_units/relu_n.sv",
+    proj_path / "scalar_units/scale_n.sv",
+    proj_path / "scalar_units/lut_n.sv",
+    proj_path / "scalar_units/load_data.sv",
+    proj_path / "quantizer_mul.sv",
+    proj_path / "tri_shift.sv",
+    proj_path / "utils/elastic.sv",
+    proj_path / "utils/shift.sv",
+]
+
+@pytest.mark.parametrize("has_lut", [1, 0])
+@pytest.mark.parametrize("skid_mask", [0, 0b11111])
+@pytest.mark.parametrize("pipes", [1, 2, 3])
+@pytest.mark.parametrize("testcase", tests)
+def test_scalar_par_each(testcase, pipes, skid_mask, has_lut):
+    """Runs each test independently. Continues on test failure."""
+    run_test(parameters={"P": pipes, "SKID_MASK": skid_mask, "HAS_LUT": has_lut}, sources=sources, module_name="test_scalar_par", hdl_toplevel="scalar_par", testcase=testcase)
+
+def test_scalar_par_all():
+    """Runs all tests sequentially in one simulation."""
+    run_test(parameters={}, sources=sources, module_name="test_scalar_par", hdl_toplevel="scalar_par")
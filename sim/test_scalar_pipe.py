@@ -2,21 +2,20 @@ from typing import Iterator
 import pytest
 import cocotb
 from cocotb.clock import Clock
-from cocotb.triggers import RisingEdge, FallingEdge, ClockCycles
+from cocotb.triggers import RisingEdge, FallingEdge, ClockCycles, ReadOnly, Timer
 from pathlib import Path
-from shared import clock_start, reset_sequence, handshake
+from shared import clock_start, reset_sequence, HandshakeMonitor
 from cocotb.types import LogicArray, Logic, Array
 from runner import run_test
 import random
-from test_scale_n import float_to_fixed, fixed_to_float, quantize
+from refmodel import float_to_fixed, fixed_to_float, quantize, quantize_fixed, relu, lut_table
 from collections import deque
 
-def relu(x):
-    return max(0, x)
-
 class SclarPipeModel():
     def __init__(self):
         self.q = deque()
+        # activation table when the LUT stage is enabled
+        self.table = None
 
     def consume(self, dut):
         N = dut.N.value.to_unsigned()
@@ -37,6 +36,10 @@ class SclarPipeModel():
             # bias -> relu -> zero point -> quantize
             # zp is signed so we implicitly subtracts
             got = data_o[i].value.to_signed()
+            if self.table is not None:
+                expected = int(self.table[quantize_fixed(relu(data + bias) + zp, m0, FIXED_SHIFT) & 0xFF])
+                assert got == expected, f"Output mismatch at index {i}: got {got}, expected {expected}"
+                continue
             expected = quantize(relu(data + bias) + zp, fixed_to_float(m0, FIXED_SHIFT))
 
             # expected = max(0, inp[i].to_signed())
@@ -52,30 +55,10 @@ class ModelRunner():
         self.model = SclarPipeModel()
 
     def start(self):
-        cocotb.start_soon(self.run_input())
-        cocotb.start_soon(self.run_output())
-
-    async def run_input(self):
-        clk_i = self.dut.clk_i
-        valid_i, valid_o = self.dut.data_valid_i, self.dut.data_valid_o
-        ready_i, ready_o = self.dut.data_ready_i, self.dut.data_ready_o
-        rst_i = self.dut.rst_i
-
-        while True:
-            await handshake(clk_i, rst_i, ready_o, valid_i)
-            self.model.consume(self.dut)
-
-    async def run_output(self):
-        clk_i = self.dut.clk_i
-        valid_i, valid_o = self.dut.data_valid_i, self.dut.data_valid_o
-        ready_i, ready_o = self.dut.data_ready_i, self.dut.data_ready_o
-        rst_i = self.dut.rst_i
-
-        while True:
-            cocotb.log.info("Waiting for output handshake...")
-            await handshake(clk_i, rst_i, ready_i, valid_o)
-            self.model.produce(self.dut)
-            cocotb.log.info("Output handshake successful, producing output")
+        monitor = HandshakeMonitor(self.dut.clk_i, self.dut.rst_i)
+        monitor.add(self.dut.data_ready_o, self.dut.data_valid_i, lambda: self.model.consume(self.dut))
+        monitor.add(self.dut.data_ready_i, self.dut.data_valid_o, lambda: self.model.produce(self.dut))
+        return monitor.start()
 
     
 class InputModel():
@@ -181,6 +164,7 @@ async def test_scalar_pipe_basic(dut):
     output_model = OutputModel(dut, yes_generator(), total_nin)
     m = ModelRunner(dut)
 
+    dut.lut_en_i.value = 0
     await clock_start(clk_i)
     await reset_sequence(clk_i, rst_i)
 
@@ -227,6 +211,7 @@ async def test_scalar_pipe_backpressure(dut):
     output_model = OutputModel(dut, backpressure_generator(), total_nin)
     m = ModelRunner(dut)
 
+    dut.lut_en_i.value = 0
     await clock_start(clk_i)
     await reset_sequence(clk_i, rst_i)
 
@@ -240,9 +225,123 @@ async def test_scalar_pipe_backpressure(dut):
     dut.data_valid_i.value = 0
     await FallingEdge(clk_i)
 
+async def stream_random(dut, total, ready_prob, data_range=10, table=None):
+    """
+    Always-valid source, sink ready with probability ready_prob, checked by the
+    model. With a table the LUT stage is enabled. Returns the number of ready
+    cycles after the first output and how many of them found no word.
+    """
+    clk_i = dut.clk_i
+    N = dut.N.value.to_unsigned()
+    FIXED_SHIFT = dut.FIXED_SHIFT.value.to_unsigned()
+
+    for i in range(N):
+        dut.data_i[i].value = 0
+        dut.bias_i[i].value = random.randint(-10, 10)
+        dut.zero_point_i[i].value = random.randint(-10, 10)
+        dut.scale_i[i].value = float_to_fixed(random.random(), FIXED_SHIFT)
+    for i in range(256):
+        dut.lut_i[i].value = int(table[i]) if table is not None else 0
+    dut.lut_en_i.value = int(table is not None)
+    dut.data_valid_i.value = 0
+    dut.data_ready_i.value = 0
+
+    await clock_start(clk_i)
+    await reset_sequence(clk_i, dut.rst_i)
+    m = ModelRunner(dut)
+    m.model.table = table
+    m.start()
+
+    nin = nout = ready_cycles = starved = 0
+    driven = None
+    while nout < total:
+        # a new row only once the previous one was taken: data holds while valid waits
+        if nin < total and driven != nin:
+            for i in range(N):
+                dut.data_i[i].value = random.randint(-data_range, data_range)
+            driven = nin
+        dut.data_valid_i.value = int(nin < total)
+        dut.data_ready_i.value = int(random.random() < ready_prob)
+        await ReadOnly()
+        if dut.data_valid_i.value == 1 and dut.data_ready_o.value == 1:
+            nin += 1
+        if dut.data_ready_i.value == 1:
+            if dut.data_valid_o.value == 1:
+                nout += 1
+            elif nout > 0:
+                starved += 1
+            if nout > 0:
+                ready_cycles += 1
+        await FallingEdge(clk_i)
+
+    dut.data_valid_i.value = 0
+    dut.data_ready_i.value = 0
+    await FallingEdge(clk_i)
+    return ready_cycles, starved
+
+@cocotb.test()
+async def test_scalar_pipe_throughput(dut):
+    """
+    Always-valid source, randomly ready sink: once the first word is out, a word
+    leaves on every cycle data_ready_i is high, i.e. 100% of the ready cycles.
+    """
+    ready_cycles, starved = await stream_random(dut, 200, ready_prob=0.5)
+    cocotb.log.info(f"{ready_cycles} ready cycles, {starved} starved")
+    assert starved == 0, f"output starved on {starved} of {ready_cycles} ready cycles"
+
+@cocotb.test()
+async def test_scalar_pipe_lut(dut):
+    """Sigmoid table enabled: every output is the table entry of the bit-exact quantized value."""
+    if not dut.HAS_LUT.value.to_unsigned():
+        cocotb.log.info("built without the LUT stage")
+        return
+    table = lut_table("sigmoid", in_scale=0.05, in_zp=0)
+    await stream_random(dut, 100, ready_prob=0.7, data_range=300, table=table)
+
+@cocotb.test()
+async def test_scalar_pipe_registered_ready(dut):
+    """With a skid buffer in the first stage, data_ready_o does not follow data_ready_i within a cycle."""
+    clk_i = dut.clk_i
+    N = dut.N.value.to_unsigned()
+    if not dut.SKID_MASK.value.to_unsigned() & 1:
+        cocotb.log.info("first stage has no skid buffer, data_ready_o is combinational")
+        return
+
+    for i in range(N):
+        dut.data_i[i].value = 0
+        dut.bias_i[i].value = 0
+        dut.zero_point_i[i].value = 0
+        dut.scale_i[i].value = 0
+    dut.lut_en_i.value = 0
+    dut.data_valid_i.value = 0
+    dut.data_ready_i.value = 0
+    await clock_start(clk_i)
+    await reset_sequence(clk_i, dut.rst_i)
+
+    stalls = 0
+    for _ in range(100):
+        dut.data_valid_i.value = 1
+        dut.data_ready_i.value = 0
+        await Timer(1, "ns")
+        ready_stalled = dut.data_ready_o.value
+        dut.data_ready_i.value = 1
+        await Timer(1, "ns")
+        assert dut.data_ready_o.value == ready_stalled, "data_ready_o depends combinationally on data_ready_i"
+        stalls += ready_stalled == 0
+        dut.data_ready_i.value = int(random.random() < 0.5)
+        await FallingEdge(clk_i)
+    # the input side did see backpressure, it just arrived a cycle late
+    assert stalls > 0
+    dut.data_valid_i.value = 0
+    dut.data_ready_i.value = 0
+    await FallingEdge(clk_i)
+
 tests = [
     "test_scalar_pipe_basic",
-    "test_scalar_pipe_backpressure"
+    "test_scalar_pipe_backpressure",
+    "test_scalar_pipe_throughput",
+    "test_scalar_pipe_lut",
+    "test_scalar_pipe_registered_ready",
 ]
 
 SOURCES = [
@@ -250,17 +349,21 @@ SOURCES = [
     Path("./rtl/scalar_units/add_n.sv").resolve(),
     Path("./rtl/scalar_units/relu_n.sv").resolve(),
     Path("./rtl/scalar_units/scale_n.sv").resolve(),
+    Path("./rtl/scalar_units/lut_n.sv").resolve(),
     Path("./rtl/quantizer_mul.sv").resolve(),
     Path("./rtl/utils/elastic.sv").resolve(),
 ]
 
+# no skid buffers, all of them, every other stage
+@pytest.mark.parametrize("has_lut", [1, 0])
+@pytest.mark.parametrize("skid_mask", [0, 0b1111, 0b0101])
 @pytest.mark.parametrize("testcase", tests)
-def test_scalar_pipe_each(testcase):
+def test_scalar_pipe_each(testcase, skid_mask, has_lut):
     run_test(
         sources=SOURCES,
         module_name="test_scalar_pipe",
         hdl_toplevel="scalar_pipe",
-        parameters={},
+        parameters={"SKID_MASK": skid_mask, "HAS_LUT": has_lut},
         testcase=testcase,
     )
 
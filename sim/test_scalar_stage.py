@@ -6,6 +6,7 @@ from pathlib import Path
 
 from shared import clock_start, reset_sequence
 from runner import run_test
+from refmodel import scalar_pipe_ref, lut_table, lut_ref, pack_lut
 
 N = 8
 FIXED_SHIFT = 16
@@ -24,22 +25,6 @@ def read_array_s8(signal, n):
         out.append(raw - 256 if raw >= 128 else raw)
     return out
 
-def quantize(psum, m0, shift=FIXED_SHIFT):
-    product = psum * m0
-    rounded = product + (1 << (shift - 1))
-    shifted = rounded >> shift
-    return max(-128, min(127, shifted))
-
-def scalar_pipe_ref(data, bias, zp, scale):
-    out =[]
-    for i in range(len(data)):
-        v = data[i] + bias[i]
-        v = max(0, v)
-        v = v - zp[i]
-        v = quantize(v, scale[i])
-        out.append(v)
-    return out
-
 async def init(dut):
     cocotb.start_soon(Clock(dut.clk_i, 10, unit="ns").start())
     dut.rst_i.value = 1
@@ -50,6 +35,8 @@ async def init(dut):
     dut.load_bias_en_i.value = 0
     dut.load_zp_en_i.value = 0
     dut.load_scale_en_i.value = 0
+    dut.load_lut_en_i.value = 0
+    dut.lut_en_i.value = 0
 
     # init pipeline inputs
     dut.data_valid_i.value = 0
@@ -83,6 +70,19 @@ async def load_param(dut, param_vals, en_sig):
     en_sig.value = 0
     await ClockCycles(dut.clk_i, 2)
 
+async def load_lut(dut, table):
+    """Shifts the 256-entry activation table in over the 64-bit bus, 8 entries per word"""
+    for word in pack_lut(table, 64):
+        await FallingEdge(dut.clk_i)
+        dut.read_bus_i.value = word
+        dut.load_valid_i.value = 1
+        dut.load_lut_en_i.value = 1
+
+    await FallingEdge(dut.clk_i)
+    dut.load_valid_i.value = 0
+    dut.load_lut_en_i.value = 0
+    await ClockCycles(dut.clk_i, 2)
+
 
 @cocotb.test()
 async def test_basic(dut):
@@ -164,6 +164,44 @@ async def test_multi_vector(dut):
             assert got[i] == exp[i], f"vec {idx} lane {i}: expected {exp[i]}, got {got[i]}"
 
 
+@cocotb.test()
+async def test_lut(dut):
+    """Load a sigmoid table over the bus, then check it is applied to the quantized outputs."""
+    await init(dut)
+
+    vectors = [[-200, -100, -20, -1, 0, 1, 20, 60], [80, 100, 127, 128, 300, -128, 5, -5]]
+    bias  = [0, 3, -3, 0, 7, 0, -7, 1]
+    zp    = [0] * N
+    scale = [1 << FIXED_SHIFT] * N
+    table = lut_table("sigmoid", in_scale=0.05, in_zp=0)
+
+    expected_all = [lut_ref(scalar_pipe_ref(v, bias, zp, scale), table).tolist() for v in vectors]
+
+    await load_param(dut, bias, dut.load_bias_en_i)
+    await load_param(dut, zp, dut.load_zp_en_i)
+    await load_param(dut, scale, dut.load_scale_en_i)
+    await load_lut(dut, table)
+    dut.lut_en_i.value = 1
+
+    for v in vectors:
+        await FallingEdge(dut.clk_i)
+        drive_array(dut.data_i, v)
+        dut.data_valid_i.value = 1
+
+    await FallingEdge(dut.clk_i)
+    dut.data_valid_i.value = 0
+
+    results =[]
+    for _ in range(40):
+        await RisingEdge(dut.clk_i)
+        if dut.data_valid_o.value == 1:
+            results.append(read_array_s8(dut.data_o, N))
+            if len(results) == len(vectors):
+                break
+
+    assert results == expected_all
+
+
 # pytest
 SOURCES =[
     Path("./rtl/scalar_units/scalar_stage.sv").resolve(),
@@ -171,6 +209,7 @@ SOURCES =[
     Path("./rtl/scalar_units/add_n.sv").resolve(),
     Path("./rtl/scalar_units/scale_n.sv").resolve(),
     Path("./rtl/scalar_units/relu_n.sv").resolve(),
+    Path("./rtl/scalar_units/lut_n.sv").resolve(),
     Path("./rtl/scalar_units/load_data.sv").resolve(),
     Path("./rtl/quantizer_mul.sv").resolve(),
     Path("./rtl/utils/elastic.sv").resolve(),
@@ -182,6 +221,7 @@ PARAMS = {"N": N, "PSUM_W": 32, "M0_W": 32, "FIXED_SHIFT": FIXED_SHIFT, "BUS_W":
 tests =[
     "test_basic",
     "test_multi_vector",
+    "test_lut",
 ]
 
 @pytest.mark.parametrize("testcase", tests)
@@ -7,7 +7,8 @@ from shared import reset_sequence, clock_start
 from runner import run_test
 import random
 
-from test_scalar_stage import scalar_pipe_ref
+from refmodel import scalar_pipe_ref
+from snapshot import checkpoint
 
 class scalar_stage_sram_interface:
     def __init__(self, dut):
@@ -31,7 +32,7 @@ class scalar_stage_sram_interface:
             self.dut.rd_ready_i.value = 1
             await FallingEdge(self.dut.clk_i)
             assert self.dut.rd_data_o.value == val
-            print(self.dut.rd_data_o.value)
+            cocotb.log.debug(f"read {self.dut.rd_data_o.value}")
         self.dut.rd_ready_i.value = 0
         assert self.dut.load_ready_o.value == 1
         assert self.dut.downstream_ready_o.value == 0
@@ -51,6 +52,8 @@ async def do_reset(dut):
     dut.load_bias_en_i.value = 0
     dut.load_zp_en_i.value = 0
     dut.load_scale_en_i.value = 0
+    dut.load_lut_en_i.value = 0
+    dut.lut_en_i.value = 0
     dut.data_i.value = [0 for i in range(8)]
     dut.data_valid_i.value = 0
     dut.addr_i.value = 0
@@ -70,52 +73,32 @@ async def do_reset(dut):
 async def test_reset(dut):
     await do_reset(dut)
 
-@cocotb.test()
-async def test_simple(dut):
+# unit parameters preloaded by load_params, shared by every test that starts from it
+BIAS = [1,1,1,1,2,2,2,2]
+ZP = [0 for _ in range (8)]
+MUL = [1 << 16 for _ in range (8)]
+
+def pack_words(vals):
+    """Packs pairs of 32-bit values into 64-bit SRAM words, low half first."""
+    return [
+        ((b1 & 0xFFFFFFFF) | ((b2 & 0xFFFFFFFF) << 32))
+        for b1, b2 in zip(vals[0::2], vals[1::2])
+    ]
+
+async def load_params(dut):
+    """Reset, write BIAS/ZP/MUL to the SRAM and load them into the pipeline."""
     await do_reset(dut)
     mem = scalar_stage_sram_interface(dut)
 
-    bias = [1,1,1,1,2,2,2,2]
-    bias_packed = [
-        (b1 | (b2 << 32))
-        for b1, b2 in zip(bias[0::2], bias[1::2])
-    ]
-    
-    zp = [0 for _ in range (8)]
-    zp_packed = [0 for _ in range(4)]
-    mul = [1 << 16 for _ in range (8)]
-    mul_packed = [
-        (b1 | (b2 << 32))
-        for b1, b2 in zip(mul[0::2], mul[1::2])
-    ]
+    bias_packed = pack_words(BIAS)
+    zp_packed = pack_words(ZP)
+    mul_packed = pack_words(MUL)
 
     # for v in mul_packed:
     #     bits = f"{v:064b}"
     #     grouped = " ".join(bits[i:i+8] for i in range(0, 64, 8))
     #     print(f"0b {grouped}")
 
-    data = [
-        [1 for _ in range(8)],
-        [2 for _ in range(8)],
-        [3 for _ in range(8)],
-        [4 for _ in range(8)],
-        [5 for _ in range(8)],
-        [6 for _ in range(8)],
-        [7 for _ in range(8)],
-        [8 for _ in range(8)],
-    ]
-    print(data)
-
-    expected_packed = [
-        sum((scalar_pipe_ref(data[i], bias, zp, mul)[j] & 0xFF) << (j * 8)
-            for j in range(8))
-        for i in range(8)
-    ]
-
-    for v in expected_packed:
-        bits = f"{v:064b}"
-        grouped = " ".join(bits[i:i+8] for i in range(0, 64, 8))
-        print(f"0b {grouped}")
     # bias at 0, sf at 4, mul at 8
     await mem.load_address('w', 0, 12)
     await mem.write_data(bias_packed + zp_packed + mul_packed)
@@ -138,11 +121,26 @@ async def test_simple(dut):
     await FallingEdge(dut.clk_i)
     dut.load_scale_en_i.value = 0
 
-    await mem.load_address('w', 20, 8)
+async def run_data(dut, data, addr=20):
+    """Streams data through the loaded pipeline into the SRAM at addr and checks it against the reference."""
+    mem = scalar_stage_sram_interface(dut)
+
+    expected_packed = [
+        sum((scalar_pipe_ref(data[i], BIAS, ZP, MUL)[j] & 0xFF) << (j * 8)
+            for j in range(8))
+        for i in range(len(data))
+    ]
+
+    for v in expected_packed:
+        bits = f"{v:064b}"
+        grouped = " ".join(bits[i:i+8] for i in range(0, 64, 8))
+        cocotb.log.debug(f"expected 0b {grouped}")
+
+    await mem.load_address('w', addr, len(data))
 
     for d in data:
         assert dut.data_ready_o.value == 1
-        dut.data_i.value = d
+        dut.data_i.value = [v & 0xFFFFFFFF for v in d]
         dut.data_valid_i.value = 1
         await FallingEdge(dut.clk_i)
     dut.data_valid_i.value = 0
@@ -154,16 +152,43 @@ async def test_simple(dut):
     await FallingEdge(dut.clk_i)
     await FallingEdge(dut.clk_i)
 
-    await mem.load_address('r', 20, 8)
+    await mem.load_address('r', addr, len(data))
     await mem.read_data(expected_packed)
     await FallingEdge(dut.clk_i)
 
+@cocotb.test()
+async def test_simple(dut):
+    await checkpoint(dut, "params", load_params, dut.clk_i)
+
+    data = [
+        [1 for _ in range(8)],
+        [2 for _ in range(8)],
+        [3 for _ in range(8)],
+        [4 for _ in range(8)],
+        [5 for _ in range(8)],
+        [6 for _ in range(8)],
+        [7 for _ in range(8)],
+        [8 for _ in range(8)],
+    ]
+    cocotb.log.debug(f"data {data}")
+    await run_data(dut, data)
+
+@cocotb.test()
+async def test_random_data(dut):
+    """Same parameters as test_simple, random data (starts from the 'params' snapshot when enabled)."""
+    await checkpoint(dut, "params", load_params, dut.clk_i)
+
+    data = [[random.randint(-200, 200) for _ in range(8)] for _ in range(8)]
+    cocotb.log.debug(f"data {data}")
+    await run_data(dut, data)
+
 
 
 
 tests =[
     'test_reset',
     'test_simple',
+    'test_random_data',
 ]
 
 proj_path = Path("./rtl").resolve()
@@ -174,6 +199,7 @@ sources = [
     proj_path / "scalar_units/add_n.sv",
     proj_path / "scalar_units/scale_n.sv",
     proj_path / "scalar_units/relu_n.sv",
+    proj_path / "scalar_units/lut_n.sv",
     proj_path / "scalar_units/load_data.sv",
     proj_path / "quantizer_mul.sv",
     proj_path / "utils/elastic.sv",
@@ -187,8 +213,8 @@ sources = [
 @pytest.mark.parametrize("testcase", tests)
 def test_scalar_mem_each(testcase):
     """Runs each test independently. Continues on test failure."""
-    run_test(parameters={}, sources=sources, module_name="test_scalar_stage_sram", hdl_toplevel="scalar_stage_sram", testcase=testcase, sims=['icarus'])
+    run_test(parameters={}, sources=sources, module_name="test_scalar_stage_sram", hdl_toplevel="scalar_stage_sram", testcase=testcase, sims=['icarus'], snapshots=True)
 
 def test_scalar_mem_all():
     """Runs all tests sequentially in one simulation."""
-    run_test(parameters={}, sources=sources, module_name="test_scalar_stage_sram", hdl_toplevel="scalar_stage_sram", sims=['icarus'])
\ No newline at end of file
+    run_test(parameters={}, sources=sources, module_name="test_scalar_stage_sram", hdl_toplevel="scalar_stage_sram", sims=['icarus'], snapshots=True)
\ No newline at end of file
@@ -10,28 +10,12 @@ from collections import deque
 from cocotb.types import LogicArray, Logic, Array
 from collections import deque
 import random
-import math
-from shared import handshake
+from shared import HandshakeMonitor
+from refmodel import float_to_fixed, fixed_to_float, quantize
 
 # TODO: 
 # - test saturation behavior
 
-def float_to_fixed(f_val, frac_bits):
-    """Converts a float to a fixed-point integer with rounding."""
-    scaling_factor = 1 << frac_bits 
-    return int(f_val * scaling_factor + 0.5)
-
-def fixed_to_float(fixed_val, frac_bits):
-    """Converts a fixed-point integer back to a float."""
-    scaling_factor = 1 << frac_bits
-    return float(fixed_val) / scaling_factor
-
-def quantize(x, m0):
-    """Matches quantizer_mul.sv: multiply, round, shift, saturate."""
-    return max(-128, 
-           min(127, 
-           math.floor(x * m0 + 0.5)))
-
 class mul_n_model():
     def __init__(self, N, width=8):
         self.N = N
@@ -143,30 +127,10 @@ class ModelRunner():
         self.model = mul_n_model(dut.N.value.to_unsigned())
 
     def start(self):
-        cocotb.start_soon(self.run_input())
-        cocotb.start_soon(self.run_output())
-
-    async def run_input(self):
-        clk_i = self.dut.clk_i
-        valid_i, valid_o = self.dut.data_valid_i, self.dut.data_valid_o
-        ready_i, ready_o = self.dut.data_ready_i, self.dut.data_ready_o
-        rst_i = self.dut.rst_i
-
-        while True:
-            await handshake(clk_i, rst_i, ready_o, valid_i)
-            self.model.consume(self.dut)
-
-    async def run_output(self):
-        clk_i = self.dut.clk_i
-        valid_i, valid_o = self.dut.data_valid_i, self.dut.data_valid_o
-        ready_i, ready_o = self.dut.data_ready_i, self.dut.data_ready_o
-        rst_i = self.dut.rst_i
-
-        while True:
-            cocotb.log.info("Waiting for output handshake...")
-            await handshake(clk_i, rst_i, ready_i, valid_o)
-            self.model.produce(self.dut)
-            cocotb.log.info("Output handshake successful, producing output")
+        monitor = HandshakeMonitor(self.dut.clk_i, self.dut.rst_i)
+        monitor.add(self.dut.data_ready_o, self.dut.data_valid_i, lambda: self.model.consume(self.dut))
+        monitor.add(self.dut.data_ready_i, self.dut.data_valid_o, lambda: self.model.produce(self.dut))
+        return monitor.start()
 
 @cocotb.test()
 async def reset_test(dut):
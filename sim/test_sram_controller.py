@@ -0,0 +1,139 @@
+import random
+import cocotb
+from cocotb.triggers import FallingEdge, ReadOnly
+from pathlib import Path
+import pytest
+from shared import clock_start, reset_sequence
+from runner import run_test
+from bank_conflicts import simulate
+
+def word(addr):
+    """Unique word per address."""
+    return (0xBA5E << 48) | (addr << 16) | (addr ^ 0xFFFF)
+
+async def do_reset(dut):
+    dut.rd_req_valid_i.value = 0
+    dut.rd_addr_i.value = 0
+    dut.wr_valid_i.value = 0
+    dut.wr_addr_i.value = 0
+    dut.wr_data_i.value = 0
+    await clock_start(dut.clk_i)
+    await reset_sequence(dut.clk_i, dut.rst_i)
+    await FallingEdge(dut.clk_i)
+
+async def stream(dut, reads, writes):
+    """
+    Presents both address streams, the next address of each port every cycle,
+    until both are done. Writes store word(addr). Returns (cycles, conflict
+    stalls, words read in order).
+    """
+    stalls_before = dut.conflict_stalls_o.value.to_unsigned()
+    i = j = 0
+    cycles = 0
+    got = []
+    while i < len(reads) or j < len(writes):
+        dut.rd_req_valid_i.value = int(i < len(reads))
+        if i < len(reads):
+            dut.rd_addr_i.value = reads[i]
+        dut.wr_valid_i.value = int(j < len(writes))
+        if j < len(writes):
+            dut.wr_addr_i.value = writes[j]
+            dut.wr_data_i.value = word(writes[j])
+        await ReadOnly()
+        rd_fire = dut.rd_req_valid_i.value == 1 and dut.rd_req_ready_o.value == 1
+        wr_fire = dut.wr_valid_i.value == 1 and dut.wr_ready_o.value == 1
+        # the read accepted in the previous cycle
+        if dut.rd_valid_o.value == 1:
+            got.append(dut.rd_data_o.value.to_unsigned())
+        await FallingEdge(dut.clk_i)
+        i += rd_fire
+        j += wr_fire
+        cycles += 1
+
+    dut.rd_req_valid_i.value = 0
+    dut.wr_valid_i.value = 0
+    await ReadOnly()
+    if dut.rd_valid_o.value == 1:
+        got.append(dut.rd_data_o.value.to_unsigned())
+    await FallingEdge(dut.clk_i)
+    return cycles, dut.conflict_stalls_o.value.to_unsigned() - stalls_before, got
+
+async def check(dut, reads, writes):
+    """Streams the pattern, checks the data and that cycles and conflicts match bank_conflicts.simulate()."""
+    cycles, stalls, got = await stream(dut, reads, writes)
+    assert got == [word(a) for a in reads]
+    banks = 1 << dut.bank_log2.value.to_unsigned()
+    model = simulate(reads, writes, banks)
+    cocotb.log.info(f"{len(reads)} reads + {len(writes)} writes in {cycles} cycles, {stalls} conflict stalls "
+                    f"(model: {model['cycles']} cycles, {model['conflict_stalls']} stalls)")
+    assert cycles == model["cycles"]
+    assert stalls == model["conflict_stalls"]
+    return cycles, stalls
+
+@cocotb.test()
+async def test_reset(dut):
+    await do_reset(dut)
+    assert dut.rd_valid_o.value == 0
+    assert dut.conflict_stalls_o.value == 0
+
+@cocotb.test()
+async def test_write_read_back(dut):
+    """One port at a time runs at one word per cycle."""
+    await do_reset(dut)
+    addrs = list(range(64))
+    assert await check(dut, [], addrs) == (64, 0)
+    assert await check(dut, addrs, []) == (64, 0)
+
+@cocotb.test()
+async def test_concurrent_different_banks(dut):
+    """A sequential read and a sequential write-back half a bank rotation apart never conflict."""
+    await do_reset(dut)
+    await check(dut, [], list(range(128)))
+    writes = [1024 + 4 + a for a in range(128)]
+    assert await check(dut, list(range(128)), writes) == (128, 0)
+    await check(dut, writes, [])
+
+@cocotb.test()
+async def test_same_bank(dut):
+    """Both ports striding through the same bank serialize, alternating."""
+    await do_reset(dut)
+    reads = [8 * a for a in range(64)]
+    await check(dut, [], reads)
+    writes = [1024 + 8 * a for a in range(64)]
+    # every cycle but the last, where only one port is left, is a conflict
+    assert await check(dut, reads, writes) == (128, 127)
+    await check(dut, writes, [])
+
+@cocotb.test()
+async def test_random_pattern(dut):
+    """Random addresses on both ports: the conflict model predicts the RTL cycle for cycle."""
+    await do_reset(dut)
+    await check(dut, [], list(range(256)))
+    reads = [random.randrange(256) for _ in range(200)]
+    writes = random.sample(range(1024, 2048), 200)
+    await check(dut, reads, writes)
+    await check(dut, writes, [])
+
+tests = [
+    "test_reset",
+    "test_write_read_back",
+    "test_concurrent_different_banks",
+    "test_same_bank",
+    "test_random_pattern",
+]
+
+proj_path = Path("./rtl").resolve()
+sources = [
+    proj_path / "sram/sram_controller.sv",
+    proj_path / "sram/sram_8x256.sv",
+    proj_path / "lib/sram/cells/gf180mcu_ocd_ip_sram__sram256x8m8wm1/gf180mcu_ocd_ip_sram__sram256x8m8wm1.v",
+]
+
+@pytest.mark.parametrize("testcase", tests)
+def test_sram_controller_each(testcase):
+    """Runs each test independently. Continues on test failure."""
+    run_test(parameters={}, sources=sources, module_name="test_sram_controller", hdl_toplevel="sram_controller", testcase=testcase, sims=['icarus'])
+
+def test_sram_controller_all():
+    """Runs all tests sequentially in one simulation."""
+    run_test(parameters={}, sources=sources, module_name="test_sram_controller", hdl_toplevel="sram_controller", sims=['icarus'])
@@ -1,21 +1,15 @@
-import random
 import cocotb
-from cocotb.triggers import FallingEdge
+from cocotb.triggers import FallingEdge, Event, with_timeout
 from pathlib import Path
+import numpy as np
 import pytest
-from shared import clock_start, reset_sequence
+from shared import clock_start, reset_sequence, stim_knob
 from runner import run_test
-
-
-def vec_mat_mul_ref(acts, weights):
-    """C[j] = sum_i acts[i] * weights[i][j]  (vector @ matrix, column outputs)"""
-    N = len(acts)
-    return [sum(acts[i] * weights[i][j] for i in range(N)) for j in range(N)]
-
-
-def mat_mat_mul_ref(act_matrix, weights):
-    """Compute act_matrix @ weights row-by-row; returns an M×N output matrix."""
-    return [vec_mat_mul_ref(act_row, weights) for act_row in act_matrix]
+from snapshot import checkpoint
+from refmodel import make_rng, random_matrix, matmul_ref, assert_matrix_equal
+from sysray_schedule import BankScheduler
+from refmodel import SysrayModel
+from lockstep import Lockstep, SysrayProbe, Divergence
 
 
 # Note: the following 2 helper functions independently drive weights and activations with diagonal pipelining, 
@@ -34,7 +28,7 @@ async def load_weights(dut, N, weights, sel=0):
             if 0 <= row_idx < N:
                 row = N - 1 - row_idx      # row_idx=0 → bottom row (N-1)
                 dut.weight_sel_n_i[col].value   = sel
-                dut.weight_n_i[col].value       = weights[row][col]
+                dut.weight_n_i[col].value       = int(weights[row][col])
                 dut.weight_valid_n_i[col].value = 1
             else:
                 dut.weight_n_i[col].value       = 0
@@ -63,7 +57,7 @@ async def stream_activation_matrix(dut, N, act_matrix, sel=0):
             m = cycle - i
             dut.act_sel_n_i[i].value = sel
             if 0 <= m < N:
-                dut.act_n_i[i].value       = act_matrix[m][i]
+                dut.act_n_i[i].value       = int(act_matrix[m][i])
                 dut.act_valid_n_i[i].value = 1
             else:
                 dut.act_n_i[i].value       = 0
@@ -98,7 +92,7 @@ async def load_weight_banks(dut, N, weight_banks):
 
             if 0 <= t < K*N:                                                                                                                              
                 dut.weight_sel_n_i[col].value   = k % 2
-                dut.weight_n_i[col].value       = weight_banks[k][N-1-(bk_idx)][col]                                                                                    
+                dut.weight_n_i[col].value       = int(weight_banks[k][N-1-(bk_idx)][col])                                                                                    
                 dut.weight_valid_n_i[col].value = 1                                                                                                            
             else:                                                                                                                                            
                 dut.weight_n_i[col].value       = 0                                                                                                            
@@ -123,7 +117,7 @@ async def stream_activation_banks(dut, N, act_banks):
 
             if 0 <= t < K*N:                                                                                                                              
                 dut.act_sel_n_i[col].value   = k % 2
-                dut.act_n_i[col].value       = act_banks[k][bk_idx][col]                                                                                    
+                dut.act_n_i[col].value       = int(act_banks[k][bk_idx][col])                                                                                    
                 dut.act_valid_n_i[col].value = 1                                                                                                            
             else:                                                                                                                                            
                 dut.act_n_i[col].value       = 0                                                                                                            
@@ -139,6 +133,77 @@ async def stream_activation_banks(dut, N, act_banks):
     return results
 
 
+async def do_reset(dut):
+    """Clock + reset; shared by every test as the "reset" snapshot."""
+    await clock_start(dut.clk_i)
+    await reset_sequence(dut.clk_i, dut.rst_i)
+
+
+async def stream_activations(dut, N, act_matrix, sel=0):
+    """
+    Drive an M×N activation matrix (any M) with the diagonal skew: row i carries
+    vector m at cycle m + i. Only drives; outputs are picked up by OutputCollector.
+    """
+    M = len(act_matrix)
+    for cycle in range(M + N - 1):
+        await FallingEdge(dut.clk_i)
+        for i in range(N):
+            m = cycle - i
+            dut.act_sel_n_i[i].value = sel
+            if 0 <= m < M:
+                dut.act_n_i[i].value       = int(act_matrix[m][i])
+                dut.act_valid_n_i[i].value = 1
+            else:
+                dut.act_n_i[i].value       = 0
+                dut.act_valid_n_i[i].value = 0
+
+    await FallingEdge(dut.clk_i)
+    for i in range(N):
+        dut.act_n_i[i].value       = 0
+        dut.act_valid_n_i[i].value = 0
+
+
+class OutputCollector():
+    """
+    Continuously collects psums for M activation rows.
+
+    Each column emits its outputs in row order, so the k-th valid output of
+    column j is out[k][j]; no cycle index math needed. Also stamps the cycles
+    of the first and last output for throughput reporting.
+    """
+    def __init__(self, dut, N, M):
+        self.dut = dut
+        self.N = N
+        self.M = M
+        self.out = np.zeros((M, N), dtype=np.int64)
+        self.count = [0] * N
+        self.cycle = 0
+        self.first_cycle = None
+        self.last_cycle = None
+        self.done = Event()
+
+    def start(self):
+        return cocotb.start_soon(self._run())
+
+    async def _run(self):
+        valid_o = self.dut.psum_out_valid_n_o
+        psum_o = self.dut.psum_out_n_o
+        while not self.done.is_set():
+            await FallingEdge(self.dut.clk_i)
+            self.cycle += 1
+            for j in range(self.N):
+                if valid_o[j].value == 1:
+                    k = self.count[j]
+                    assert k < self.M, f"col {j}: more than {self.M} outputs"
+                    self.out[k, j] = psum_o[j].value.to_signed()
+                    self.count[j] = k + 1
+                    if self.first_cycle is None:
+                        self.first_cycle = self.cycle
+                    self.last_cycle = self.cycle
+            if all(c == self.M for c in self.count):
+                self.done.set()
+
+
 @cocotb.test()
 async def reset_test(dut):
     """Verify that all psum outputs are 0 after reset with no inputs driven."""
@@ -157,12 +222,11 @@ async def test_basic_matmul_matrix(dut):
     N = dut.N.value.to_unsigned()
     # always square!
     M = N
-    await clock_start(dut.clk_i)
-    await reset_sequence(dut.clk_i, dut.rst_i)
+    await checkpoint(dut, "reset", do_reset, dut.clk_i)
 
     act_matrix = [[m * N + i + 1 for i in range(N)] for m in range(M)]
     weights    = [[(i + 1) * (j + 1) for j in range(N)] for i in range(N)]
-    expected   = mat_mat_mul_ref(act_matrix, weights)
+    expected   = matmul_ref(act_matrix, weights, dut.ACC_WIDTH.value.to_unsigned())
 
     cocotb.log.info(f"N={N}, M={M}")
     cocotb.log.info(f"act_matrix={act_matrix}")
@@ -174,10 +238,7 @@ async def test_basic_matmul_matrix(dut):
         await FallingEdge(dut.clk_i)
     results = await stream_activation_matrix(dut, N, act_matrix)
 
-    for m, (row_got, row_exp) in enumerate(zip(results, expected)):
-        for j, (got, exp) in enumerate(zip(row_got, row_exp)):
-            cocotb.log.info(f"out[{m}][{j}] = {got}  (expected {exp})")
-            assert got == exp, f"row {m}, col {j}: expected {exp}, got {got}"
+    assert_matrix_equal(results, expected)
 
     await FallingEdge(dut.clk_i)
 
@@ -187,73 +248,127 @@ async def test_random_matmul_matrix(dut):
     """
     Random matrix-matrix multiply: M×N activation matrix × N×N weights.
 
-    Values are capped at 7 so M * N * 7 * 7 stays well within ACC_WIDTH=32.
+    M defaults to N; STIM_ROWS and STIM_VALUE_BITS shrink the stimulus (sim/shrink.py).
     """
     N = dut.N.value.to_unsigned()
-    # always square!
-    M = N
-    await clock_start(dut.clk_i)
-    await reset_sequence(dut.clk_i, dut.rst_i)
+    M = stim_knob("rows", N)
+    value_bits = stim_knob("value_bits", 8)
+    await checkpoint(dut, "reset", do_reset, dut.clk_i)
 
-    act_matrix = [[random.randint(-128, 127) for _ in range(N)] for _ in range(M)]
-    weights    = [[random.randint(-128, 127) for _ in range(N)] for _ in range(N)]
-    expected   = mat_mat_mul_ref(act_matrix, weights)
+    rng = make_rng()
+    act_matrix = random_matrix(rng, M, N, value_bits)
+    weights    = random_matrix(rng, N, N, value_bits)
+    expected   = matmul_ref(act_matrix, weights, dut.ACC_WIDTH.value.to_unsigned())
 
     cocotb.log.info(f"N={N}, M={M}")
     cocotb.log.info(f"act_matrix={act_matrix}")
     cocotb.log.info(f"weights={weights}")
     cocotb.log.info(f"expected={expected}")
 
+    collector = OutputCollector(dut, N, M)
     cocotb.start_soon(load_weights(dut, N, weights))
     for _ in range(N):                          # wait for col 0 to finish loading
         await FallingEdge(dut.clk_i)
-    results = await stream_activation_matrix(dut, N, act_matrix)
+    collector.start()
+    await stream_activations(dut, N, act_matrix)
+    await with_timeout(collector.done.wait(), 10 * (4 * N + 10), "ns")
+
+    assert_matrix_equal(collector.out, expected)
+
+    await FallingEdge(dut.clk_i)
+
+@cocotb.test()
+async def test_long_m_stream(dut):
+    """
+    Weight-stationary streaming: one weight load, many activation rows back to back.
+
+    Reports MACs/cycle overall (including fill and drain) and in steady state,
+    where it should reach N*N.
+    """
+    N = dut.N.value.to_unsigned()
+    # activation rows per weight load; production runs use ~10k (STIM_LONG_ROWS=10000)
+    M = stim_knob("long_rows", 256)
+    await checkpoint(dut, "reset", do_reset, dut.clk_i)
+
+    rng = make_rng()
+    act_matrix = random_matrix(rng, M, N)
+    weights    = random_matrix(rng, N, N)
+    expected   = matmul_ref(act_matrix, weights, dut.ACC_WIDTH.value.to_unsigned())
+    cocotb.log.info(f"N={N}, M={M}")
+
+    collector = OutputCollector(dut, N, M)
+    cocotb.start_soon(load_weights(dut, N, weights))
+    for _ in range(N):                          # wait for col 0 to finish loading
+        await FallingEdge(dut.clk_i)
+    collector.start()
+    await stream_activations(dut, N, act_matrix)
+    await with_timeout(collector.done.wait(), 10 * (4 * N + 10), "ns")
 
-    for m, (row_got, row_exp) in enumerate(zip(results, expected)):
-        for j, (got, exp) in enumerate(zip(row_got, row_exp)):
-            cocotb.log.info(f"out[{m}][{j}] = {got}  (expected {exp})")
-            assert got == exp, f"row {m}, col {j}: expected {exp}, got {got}"
+    assert_matrix_equal(collector.out, expected)
+
+    # the last column finishes one row per cycle once the pipeline is full
+    macs = M * N * N
+    steady = collector.last_cycle - collector.first_cycle - (N - 1)
+    cocotb.log.info(f"{macs} MACs in {collector.last_cycle} cycles: {macs / collector.last_cycle:.1f} MACs/cycle overall, "
+                    f"{(M - 1) * N * N / max(steady, 1):.1f} MACs/cycle steady state (peak {N * N})")
 
     await FallingEdge(dut.clk_i)
 
+async def run_schedule(dut, N, sched):
+    """Drives a BankScheduler schedule, checks every job against matmul_ref and returns the report."""
+    acc_width = dut.ACC_WIDTH.value.to_unsigned()
+    collector = OutputCollector(dut, N, sched.total_rows)
+    collector.start()
+    await sched.drive(dut)
+    await with_timeout(collector.done.wait(), 10 * (4 * N + 10), "ns")
+
+    for k, (got, job) in enumerate(zip(sched.split_outputs(collector.out), sched.jobs)):
+        assert_matrix_equal(got, matmul_ref(job.acts, job.weights, acc_width), f"job {k}")
+
+    report = sched.report()
+    cocotb.log.info(f"schedule: {[(job.M, job.w_start, job.a_start) for job in sched.jobs]} (M, W, A)")
+    cocotb.log.info(f"{report['rows']} rows in {report['jobs']} jobs, row gaps {report['row_gaps']}, "
+                    f"{report['idle_pe_cycles']} idle PE-cycles between jobs, utilization {report['utilization']:.3f}")
+    return report
+
 @cocotb.test()
 async def test_shadow_buffer_2(dut):
     """Test shadow buffering by interleaving two different weight banks back-to-back"""
     N = dut.N.value.to_unsigned()
 
-    await clock_start(dut.clk_i)
-    await reset_sequence(dut.clk_i, dut.rst_i)
+    await checkpoint(dut, "reset", do_reset, dut.clk_i)
 
-    act_matrix0 = [[random.randint(-128, 127) for _ in range(N)] for _ in range(N)]
-    act_matrix1 = [[random.randint(-128, 127) for _ in range(N)] for _ in range(N)]
-    weights0    = [[random.randint(-128, 127) for _ in range(N)] for _ in range(N)]
-    weights1    = [[random.randint(-128, 127) for _ in range(N)] for _ in range(N)]
+    rng = make_rng()
+    sched = BankScheduler(N)
+    for _ in range(2):
+        sched.add(random_matrix(rng, N, N), random_matrix(rng, N, N))
 
-    expected0   = mat_mat_mul_ref(act_matrix0, weights0)
-    expected1  = mat_mat_mul_ref(act_matrix1, weights1)
+    report = await run_schedule(dut, N, sched)
+    assert report["idle_pe_cycles"] == 0, "double buffering left dead cycles between the banks"
 
-    cocotb.log.info(f"act_matrix0={act_matrix0}")
-    cocotb.log.info(f"weights0={weights0}")
-    cocotb.log.info(f"expected0={expected0}")
+    await FallingEdge(dut.clk_i)
 
-    cocotb.log.info(f"act_matrix1={act_matrix1}")
-    cocotb.log.info(f"weights1={weights1}")
-    cocotb.log.info(f"expected1={expected1}")
+@cocotb.test()
+async def test_bank_scheduler(dut):
+    """
+    Jobs of varying M back to back. A job following one with M >= N must
+    start with no idle PE-cycles; shorter jobs cannot hide the N-cycle
+    weight load of the next one.
+    """
+    N = dut.N.value.to_unsigned()
 
-    cocotb.start_soon(load_weight_banks(dut, N, [weights0, weights1]))                                                                                                
-    for _ in range(N):                                                                                                                                             
-        await FallingEdge(dut.clk_i)           # bank0 col0 done → stream                                                                                          
-    results = await stream_activation_banks(dut, N, [act_matrix0, act_matrix1])    
-    cocotb.log.info(f"results0={results[0]}")
-    cocotb.log.info(f"results1={results[1]}")
-    for m in range(N):
-          for j in range(N):
-              got0 = results[0][m][j]
-              exp0 = expected0[m][j]
-              got1 = results[1][m][j]
-              exp1 = expected1[m][j]
-              assert got0 == exp0, f"bank 0, row {m}, col {j}: expected {exp0}, got {got0}"
-              assert got1 == exp1, f"bank 1, row {m}, col {j}: expected {exp1}, got {got1}"
+    await checkpoint(dut, "reset", do_reset, dut.clk_i)
+
+    rng = make_rng()
+    sched = BankScheduler(N)
+    for M in [N, 3 * N, 2 * N + 1, N, 1, N + 3]:
+        sched.add(random_matrix(rng, N, N), random_matrix(rng, M, N))
+
+    report = await run_schedule(dut, N, sched)
+    for k, gap in enumerate(report["row_gaps"], start=1):
+        # job k's N-cycle weight load hides behind job k-1 when that streams at least N rows
+        if sched.jobs[k-1].M >= N:
+            assert gap == 0, f"job {k}: {gap} idle cycles before it"
 
     await FallingEdge(dut.clk_i)
 
@@ -262,19 +377,19 @@ async def test_shadow_buffer_3(dut):
     """Test shadow buffering by interleaving three different weight banks back-to-back"""
     N = dut.N.value.to_unsigned()
 
-    await clock_start(dut.clk_i)
-    await reset_sequence(dut.clk_i, dut.rst_i)
+    await checkpoint(dut, "reset", do_reset, dut.clk_i)
 
-    act_matrix0 = [[random.randint(-128, 127) for _ in range(N)] for _ in range(N)]
-    act_matrix1 = [[random.randint(-128, 127) for _ in range(N)] for _ in range(N)]
-    act_matrix2 = [[random.randint(-128, 127) for _ in range(N)] for _ in range(N)]
-    weights0    = [[random.randint(-128, 127) for _ in range(N)] for _ in range(N)]
-    weights1    = [[random.randint(-128, 127) for _ in range(N)] for _ in range(N)]
-    weights2    = [[random.randint(-128, 127) for _ in range(N)] for _ in range(N)]
+    rng = make_rng()
+    act_matrix0 = random_matrix(rng, N, N)
+    act_matrix1 = random_matrix(rng, N, N)
+    act_matrix2 = random_matrix(rng, N, N)
+    weights0    = random_matrix(rng, N, N)
+    weights1    = random_matrix(rng, N, N)
+    weights2    = random_matrix(rng, N, N)
 
-    expected0   = mat_mat_mul_ref(act_matrix0, weights0)
-    expected1  = mat_mat_mul_ref(act_matrix1, weights1)
-    expected2  = mat_mat_mul_ref(act_matrix2, weights2)
+    expected0   = matmul_ref(act_matrix0, weights0, dut.ACC_WIDTH.value.to_unsigned())
+    expected1  = matmul_ref(act_matrix1, weights1, dut.ACC_WIDTH.value.to_unsigned())
+    expected2  = matmul_ref(act_matrix2, weights2, dut.ACC_WIDTH.value.to_unsigned())
 
     cocotb.log.info(f"act_matrix0={act_matrix0}")
     cocotb.log.info(f"weights0={weights0}")
@@ -295,17 +410,65 @@ async def test_shadow_buffer_3(dut):
     cocotb.log.info(f"results0={results[0]}")
     cocotb.log.info(f"results1={results[1]}")
     cocotb.log.info(f"results2={results[2]}")
-    for m in range(N):
-          for j in range(N):
-              got0 = results[0][m][j]
-              exp0 = expected0[m][j]
-              got1 = results[1][m][j]
-              exp1 = expected1[m][j]
-              got2 = results[2][m][j]
-              exp2 = expected2[m][j]
-              assert got0 == exp0, f"bank 0, row {m}, col {j}: expected {exp0}, got {got0}"
-              assert got1 == exp1, f"bank 1, row {m}, col {j}: expected {exp1}, got {got1}"
-              assert got2 == exp2, f"bank 2, row {m}, col {j}: expected {exp2}, got {got2}"
+    assert_matrix_equal(results[0], expected0, "bank 0")
+    assert_matrix_equal(results[1], expected1, "bank 1")
+    assert_matrix_equal(results[2], expected2, "bank 2")
+
+    await FallingEdge(dut.clk_i)
+
+def lockstep_jobs(dut, N):
+    """A random mix of short and long jobs for the lockstep tests."""
+    rng = make_rng()
+    sched = BankScheduler(N)
+    for M in [N, 2 * N + 3, 1, N, 3 * N]:
+        sched.add(random_matrix(rng, N, N), random_matrix(rng, M, N))
+    return sched
+
+@cocotb.test()
+async def test_lockstep(dut):
+    """Every register of every PE matches the cycle-accurate model for a whole schedule."""
+    N = dut.N.value.to_unsigned()
+
+    await checkpoint(dut, "reset", do_reset, dut.clk_i)
+
+    sched = lockstep_jobs(dut, N)
+    lock = Lockstep(dut, dut.clk_i, SysrayModel(N, dut.DATA_WIDTH.value.to_unsigned(), dut.ACC_WIDTH.value.to_unsigned()),
+                    SysrayProbe(dut, N), check_every=16)
+    lock.start()
+    for inputs in sched.inputs():
+        await lock.step(inputs)
+    assert lock.matches(), "register state differs at the end of the schedule"
+    cocotb.log.info(f"{lock.cycle} cycles in lockstep, {lock.full_checks} full state checks")
+
+@cocotb.test()
+async def test_lockstep_bisect(dut):
+    """A fault injected into the model is traced back to the exact cycle it happened."""
+    N = dut.N.value.to_unsigned()
+
+    await checkpoint(dut, "reset", do_reset, dut.clk_i)
+
+    sched = lockstep_jobs(dut, N)
+    # flip a weight of bank 1 once job 1 has loaded it; nothing overwrites it before job 3
+    fault_cycle = sched.jobs[1].a_start + 1
+
+    class FaultyModel(SysrayModel):
+        def step(self, inputs):
+            super().step(inputs)
+            if self.cycle == fault_cycle:
+                self.weight_buf[N - 1, 0, 1] ^= 1
+
+    lock = Lockstep(dut, dut.clk_i, FaultyModel(N, dut.DATA_WIDTH.value.to_unsigned(), dut.ACC_WIDTH.value.to_unsigned()),
+                    SysrayProbe(dut, N), check_every=64)
+    lock.start()
+    try:
+        for inputs in sched.inputs():
+            await lock.step(inputs)
+    except Divergence as e:
+        cocotb.log.info(str(e))
+        assert e.cycle == fault_cycle, f"divergence reported at cycle {e.cycle}, fault injected at {fault_cycle}"
+        assert [d[:2] for d in e.diffs] == [("weight_buf", (N - 1, 0, 1))], f"unexpected differences {e.diffs}"
+    else:
+        assert False, "injected fault was not detected"
 
     await FallingEdge(dut.clk_i)
 
@@ -313,8 +476,12 @@ tests = [
     "reset_test",
     "test_basic_matmul_matrix",
     "test_random_matmul_matrix",
-    # "test_shadow_buffer_2",
+    "test_long_m_stream",
+    "test_shadow_buffer_2",
+    "test_bank_scheduler",
     "test_shadow_buffer_3",
+    "test_lockstep",
+    "test_lockstep_bisect",
 ]
 
 proj_path = Path("./rtl").resolve()
@@ -330,6 +497,7 @@ def test_sysray_nxn_each(N, testcase):
         hdl_toplevel="sysray_nxn",
         parameters={"N": N},
         testcase=testcase,
+        snapshots=True,
     )
 
 
@@ -340,4 +508,5 @@ def test_sysray_nxn_all(N):
         module_name="test_sysray_nxn",
         hdl_toplevel="sysray_nxn",
         parameters={"N": N},
+        snapshots=True,
     )
@@ -9,6 +9,7 @@ from cocotb.triggers import Timer, RisingEdge, ReadOnly
 
 import pytest
 from runner import run_test
+from shared import stim_knob
 
 
 async def drive(sig, val):
@@ -140,9 +141,11 @@ async def random_enables_random_data_test(dut):
     n = len(dut.data_o)
     sb = TriangleScoreboard(n)
 
-    for cyc in range(120):
+    cycles = stim_knob("cycles", 120)
+    value_bits = stim_knob("value_bits", 16)
+    for cyc in range(cycles):
         ens = [random.randrange(0, 2) for _ in range(n)]
-        vals = [random.randrange(0, 1 << 16) for _ in range(n)]
+        vals = [random.randrange(0, 1 << value_bits) for _ in range(n)]
 
         await drive_vec(dut.data_i, vals)
         await drive(dut.enable_i, pack_enables(ens))
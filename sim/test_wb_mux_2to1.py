@@ -0,0 +1,200 @@
+import random
+import cocotb
+from cocotb.triggers import FallingEdge, ReadOnly
+from pathlib import Path
+import pytest
+from shared import clock_start, reset_sequence
+from runner import run_test
+from model.dma import WishboneMemory, WishboneTransaction
+from perf_csr import CSR_BASE, PERF_REGS, CTRL_ENABLE
+
+class DramSlave():
+    """
+    LiteDRAM on s_*: takes a request on stb & ~stall, acks it the next cycle
+    and stalls while it is in flight, so it serves the classic SPI bridge and
+    the pipelined TPU alike. Every access is logged as (addr, we, tpu_active)
+    and none may fall into the CSR window.
+    """
+    def __init__(self, dut):
+        self.dut = dut
+        self.mem = WishboneMemory(1 << 16, "DRAM")
+        self.window = 1 << dut.CSR_ADDR_W.value.to_unsigned()
+        self.accesses = []
+
+    def start(self):
+        return cocotb.start_soon(self._run())
+
+    async def _run(self):
+        dut = self.dut
+        pending = None
+        while True:
+            await FallingEdge(dut.clk_i)
+            dut.s_ack.value = int(pending is not None)
+            dut.s_dat_r.value = pending if pending is not None else random.getrandbits(32)
+            dut.s_stall.value = int(pending is not None)
+            stall = pending is not None
+            pending = None
+            await ReadOnly()
+            if dut.s_cyc.value == 1 and dut.s_stb.value == 1:
+                addr = dut.s_adr.value.to_unsigned()
+                assert not CSR_BASE <= addr < CSR_BASE + self.window, f"CSR access {addr:#x} reached DRAM"
+                if not stall:
+                    txn = WishboneTransaction(addr=addr, data=dut.s_dat_w.value.to_unsigned(),
+                                              we=dut.s_we.value == 1, sel=dut.s_sel.value.to_unsigned())
+                    self.accesses.append((addr, txn.we, dut.tpu_active.value.to_unsigned()))
+                    pending = self.mem.execute(txn)
+
+async def do_reset(dut):
+    dut.tpu_active.value = 0
+    for m in ("m0", "m1"):
+        getattr(dut, f"{m}_adr").value = 0
+        getattr(dut, f"{m}_dat_w").value = 0
+        getattr(dut, f"{m}_we").value = 0
+        getattr(dut, f"{m}_stb").value = 0
+        getattr(dut, f"{m}_cyc").value = 0
+        getattr(dut, f"{m}_sel").value = 0
+    dut.m1_cti.value = 0
+    dut.m1_bte.value = 0
+    dut.s_dat_r.value = 0
+    dut.s_ack.value = 0
+    dut.s_stall.value = 0
+    await clock_start(dut.clk_i)
+    await reset_sequence(dut.clk_i, dut.rst_i)
+
+async def m0_access(dut, addr, data=None, timeout_cycles=10):
+    """One classic cycle from the SPI bridge. Returns the read data, None if it was never acked."""
+    await FallingEdge(dut.clk_i)
+    dut.m0_adr.value = addr
+    dut.m0_we.value = int(data is not None)
+    dut.m0_dat_w.value = data or 0
+    dut.m0_sel.value = 0xF
+    dut.m0_cyc.value = 1
+    dut.m0_stb.value = 1
+    value = None
+    for _ in range(timeout_cycles):
+        await ReadOnly()
+        if dut.m0_ack.value == 1:
+            value = dut.m0_dat_r.value.to_unsigned()
+            await FallingEdge(dut.clk_i)
+            break
+        await FallingEdge(dut.clk_i)
+    dut.m0_cyc.value = 0
+    dut.m0_stb.value = 0
+    dut.m0_we.value = 0
+    return value
+
+async def m1_burst(dut, requests):
+    """Pipelined TPU requests, (addr, data) with data None for a read. Returns the read data in order."""
+    reads = []
+    issued = acked = 0
+    while acked < len(requests):
+        await FallingEdge(dut.clk_i)
+        stb = issued < len(requests)
+        if stb:
+            addr, data = requests[issued]
+            dut.m1_adr.value = addr
+            dut.m1_we.value = int(data is not None)
+            dut.m1_dat_w.value = data or 0
+            dut.m1_sel.value = 0xF
+        dut.m1_cti.value = 0b010 if issued < len(requests) - 1 else 0b111
+        dut.m1_stb.value = int(stb)
+        dut.m1_cyc.value = 1
+        await ReadOnly()
+        if dut.m1_ack.value == 1:
+            if requests[acked][1] is None:
+                reads.append(dut.m1_dat_r.value.to_unsigned())
+            acked += 1
+        if stb and dut.m1_stall.value == 0:
+            issued += 1
+    await FallingEdge(dut.clk_i)
+    dut.m1_stb.value = 0
+    dut.m1_cyc.value = 0
+    return reads
+
+async def tpu_traffic(dut, base, words):
+    """Writes words to DRAM from m1 and reads them back. Returns the words read."""
+    await m1_burst(dut, [(base + 4 * i, w) for i, w in enumerate(words)])
+    return await m1_burst(dut, [(base + 4 * i, None) for i in range(len(words))])
+
+def csr(name):
+    return CSR_BASE + PERF_REGS[name]
+
+@cocotb.test()
+async def test_csr_idle(dut):
+    """With the bus idle, CSR accesses reach the counters and DRAM accesses reach DRAM."""
+    await do_reset(dut)
+    dram = DramSlave(dut)
+    dram.start()
+    assert await m0_access(dut, csr("ctrl")) == CTRL_ENABLE
+    first = await m0_access(dut, csr("cycles"))
+    assert 0 < first < await m0_access(dut, csr("cycles"))
+    assert dram.accesses == []
+
+    await m0_access(dut, 0x100, 0x1234_5678)
+    assert await m0_access(dut, 0x100) == 0x1234_5678
+    assert dram.accesses == [(0x100, True, 0), (0x100, False, 0)]
+
+@cocotb.test()
+async def test_csr_while_tpu_active(dut):
+    """The SPI bridge reads the counters while the TPU streams to DRAM; DRAM only ever sees the TPU."""
+    await do_reset(dut)
+    dram = DramSlave(dut)
+    dram.start()
+    await FallingEdge(dut.clk_i)
+    dut.tpu_active.value = 1
+    words = [random.getrandbits(32) for _ in range(32)]
+    tpu = cocotb.start_soon(tpu_traffic(dut, 0x800, words))
+
+    # freeze, read every counter twice, count again
+    await m0_access(dut, csr("ctrl"), 0)
+    frozen = {name: await m0_access(dut, csr(name)) for name in ("cycles", "wb_wait", "sram_reads")}
+    assert frozen == {name: await m0_access(dut, csr(name)) for name in frozen}
+    assert frozen["cycles"] > 0
+    assert frozen["wb_wait"] <= frozen["cycles"]
+    assert frozen["sram_reads"] == 0
+    await m0_access(dut, csr("ctrl"), CTRL_ENABLE)
+    assert await m0_access(dut, csr("cycles")) > frozen["cycles"]
+
+    # a DRAM access from the SPI bridge waits for the bus
+    assert await m0_access(dut, 0x40, 0xDEAD_BEEF) is None
+
+    assert await tpu == words
+    assert all(tpu_active for _, _, tpu_active in dram.accesses)
+    assert [a for a, _, _ in dram.accesses] == [0x800 + 4 * i for i in range(len(words))] * 2
+    assert dram.mem.read_bytes(0x40, 4) == bytes(4)
+
+@cocotb.test()
+async def test_window_edges(dut):
+    """Only the CSR_ADDR_W window at CSR_BASE is decoded; the words around it go to DRAM."""
+    await do_reset(dut)
+    dram = DramSlave(dut)
+    dram.start()
+    window = 1 << dut.CSR_ADDR_W.value.to_unsigned()
+    below, above = CSR_BASE - 4, CSR_BASE + window
+    assert await m0_access(dut, below) is not None
+    assert await m0_access(dut, above) is not None
+    assert await m0_access(dut, CSR_BASE + window - 4) is not None
+    assert [a for a, _, _ in dram.accesses] == [below, above]
+
+tests = [
+    "test_csr_idle",
+    "test_csr_while_tpu_active",
+    "test_window_edges",
+]
+
+proj_path = Path("./rtl").resolve()
+sources = [
+    proj_path / "wb_mux_csr_top.sv",
+    proj_path / "wb_mux_2to1.sv",
+    proj_path / "perf_counters.sv",
+]
+
+@pytest.mark.parametrize("csr_addr_w", [8, 12])
+@pytest.mark.parametrize("testcase", tests)
+def test_wb_mux_2to1_each(testcase, csr_addr_w):
+    """Runs each test independently. Continues on test failure."""
+    run_test(parameters={"CSR_ADDR_W": csr_addr_w}, sources=sources, module_name="test_wb_mux_2to1", hdl_toplevel="wb_mux_csr_top", testcase=testcase)
+
+def test_wb_mux_2to1_all():
+    """Runs all tests sequentially in one simulation."""
+    run_test(parameters={}, sources=sources, module_name="test_wb_mux_2to1", hdl_toplevel="wb_mux_csr_top")
@@ -0,0 +1,166 @@
+"""
+PE utilization of sysray_nxn for a workload of fully connected layers.
+
+Every layer of K inputs and O outputs is tiled into ceil(K/N) x ceil(O/N)
+weight tiles. Each tile is one job of the double-buffered schedule in
+sysray_schedule.py and streams the whole batch (M = batch rows) through the
+array. PE (r, c) does useful work for a tile when r < tile rows and c < tile
+columns, once per activation row; everything else (fill, drain, partial tiles,
+gaps between jobs) is idle time. Timing comes from the same constraints the
+testbenches drive the RTL with, so no simulation is needed:
+
+  - vector m of a job reaches PE (r, c) at a_start + m + r + c, so the last
+    MAC of a job happens 2N-2 cycles after its last row enters the array;
+  - a layer cannot start streaming before the previous layer has drained
+    (its outputs are the next activations), unless --overlap-layers;
+  - --single-buffer models loading weights only after the previous tile
+    has drained, i.e. N + M + 2N - 2 cycles per tile.
+
+Usage (from the repo root):
+    python3 sim/utilization.py -l 784x128 -l 128x10 -b 32
+    python3 sim/utilization.py -l 784x128 -l 128x10 -b 32 -N 8 16 32 --target 0.8
+    python3 sim/utilization.py -l 256x256 -b 64 --heatmap --json util.json
+"""
+import sys
+import json
+import argparse
+from dataclasses import dataclass
+import numpy as np
+from sysray_schedule import schedule
+
+@dataclass
+class Tile:
+    layer: int
+    rows: int             # active PE rows (input elements of this tile)
+    cols: int             # active PE columns (outputs of this tile)
+    M: int                # activation rows streamed through the tile
+    not_before: int = 0
+    w_start: int = 0
+    a_start: int = 0
+
+def parse_layer(text):
+    k, o = text.lower().split("x")
+    return int(k), int(o)
+
+def tiles(layers, N, batch):
+    """Weight tiles of every layer, in execution order."""
+    res = []
+    for l, (K, O) in enumerate(layers):
+        for k0 in range(0, K, N):
+            for o0 in range(0, O, N):
+                res.append(Tile(l, min(N, K - k0), min(N, O - o0), batch))
+    return res
+
+def tile_end(tile, N):
+    """Cycle after the last MAC of the tile (bottom right PE)."""
+    return tile.a_start + tile.M + 2 * N - 2
+
+def run_schedule(ts, N, single_buffer=False, overlap_layers=False):
+    """Schedules the tiles in place and returns the cycle the last one finishes."""
+    if single_buffer:
+        end = 0
+        for t in ts:
+            t.w_start = end
+            t.a_start = t.w_start + N
+            end = tile_end(t, N)
+        return end
+
+    if overlap_layers:
+        schedule(N, ts)
+    else:
+        # each layer waits for the last tile of the previous one to drain
+        start = 0
+        for l in sorted({t.layer for t in ts}):
+            layer_ts = [t for t in ts if t.layer == l]
+            for t in layer_ts:
+                t.not_before = start
+            schedule(N, [t for t in ts if t.layer <= l])
+            start = tile_end(layer_ts[-1], N)
+    return max(tile_end(t, N) for t in ts)
+
+def analyze(layers, N, batch, single_buffer=False, overlap_layers=False):
+    """Returns the utilization statistics of one workload on an N x N array."""
+    ts = tiles(layers, N, batch)
+    cycles = run_schedule(ts, N, single_buffer, overlap_layers)
+    active = np.zeros((N, N), dtype=np.int64)
+    for t in ts:
+        active[:t.rows, :t.cols] += t.M
+    macs = int(active.sum())
+    return {
+        "N": N,
+        "batch": batch,
+        "tiles": len(ts),
+        "cycles": cycles,
+        "macs": macs,
+        "utilization": macs / (N * N * cycles) if cycles else 0.0,
+        "macs_per_cycle": macs / cycles if cycles else 0.0,
+        "pe_activity": (active / cycles).tolist() if cycles else active.tolist(),
+    }
+
+def batch_for(layers, N, target, max_batch, **kwargs):
+    """Smallest batch reaching target utilization, or None if max_batch does not."""
+    util = lambda b: analyze(layers, N, b, **kwargs)["utilization"]
+    if util(max_batch) < target:
+        return None
+    # utilization grows with the batch: the per-tile overheads stay fixed
+    lo, hi = 1, 1
+    while util(hi) < target:
+        lo, hi = hi + 1, min(hi * 2, max_batch)
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if util(mid) >= target:
+            hi = mid
+        else:
+            lo = mid + 1
+    return hi
+
+def heatmap(activity):
+    """Text heatmap of the per-PE activity, row 0 (first activation element) on top."""
+    shades = " .:-=+*#%@"
+    lines = []
+    for row in activity:
+        if len(activity) <= 16:
+            lines.append(" ".join(f"{a:4.2f}" for a in row))
+        else:
+            lines.append("".join(shades[min(int(a * len(shades)), len(shades) - 1)] for a in row))
+    return "\n".join(lines)
+
+def main():
+    parser = argparse.ArgumentParser(description="Systolic array PE utilization for a workload")
+    parser.add_argument("-l", "--layer", action="append", required=True, type=parse_layer,
+                        help="layer shape KxO (inputs x outputs), in order; repeat for each layer")
+    parser.add_argument("-b", "--batch", type=int, default=1, help="activation rows per layer")
+    parser.add_argument("-N", type=int, nargs="+", default=[8], help="array sizes to compare")
+    parser.add_argument("--target", type=float, default=None, help="also find the batch reaching this utilization")
+    parser.add_argument("--max-batch", type=int, default=1 << 16)
+    parser.add_argument("--single-buffer", action="store_true", help="no weight double buffering")
+    parser.add_argument("--overlap-layers", action="store_true", help="ignore the dependency between layers")
+    parser.add_argument("--heatmap", action="store_true", help="print the per-PE activity")
+    parser.add_argument("--json", default=None, help="also write the results to this file")
+    args = parser.parse_args()
+
+    opts = {"single_buffer": args.single_buffer, "overlap_layers": args.overlap_layers}
+    results = []
+    print(f"{'N':>4s} {'tiles':>7s} {'cycles':>10s} {'MACs/cycle':>11s} {'utilization':>12s}"
+          + (f" {'batch@' + str(args.target):>12s}" if args.target is not None else ""))
+    for N in args.N:
+        res = analyze(args.layer, N, args.batch, **opts)
+        line = f"{N:4d} {res['tiles']:7d} {res['cycles']:10d} {res['macs_per_cycle']:11.1f} {res['utilization']:12.3f}"
+        if args.target is not None:
+            res["target"] = args.target
+            res["batch_for_target"] = batch_for(args.layer, N, args.target, args.max_batch, **opts)
+            line += f" {res['batch_for_target'] if res['batch_for_target'] else '>' + str(args.max_batch):>12}"
+        print(line)
+        results.append(res)
+
+    if args.heatmap:
+        for res in results:
+            print(f"\nPE activity, N={res['N']} (rows: activation element, columns: output):")
+            print(heatmap(res["pe_activity"]))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
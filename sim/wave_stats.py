@@ -0,0 +1,274 @@
+"""
+Streaming ready/valid statistics from VCD/FST waveforms.
+
+Reads the waveform once, front to back, keeping only the current value of the
+signals it was asked about, so memory does not grow with the length of the run.
+Every interface is sampled on each rising clock edge outside reset (the values
+the edge latches, i.e. from before the edge) and each cycle is classified as
+
+    transfer     valid &  ready
+    stall        valid & !ready   (backpressure)
+    bubble      !valid &  ready   (starved)
+    idle        !valid & !ready
+
+Occupancy is the fraction of cycles valid is high. Interfaces are given in
+pipeline order, so the stage between two neighbours is the one that throttles
+when its input stalls while its output does not: those cycles are reported per
+stage and the stage with the most is named the bottleneck.
+
+Usage (from the repo root):
+    python3 sim/wave_stats.py sim_build/.../scalar_pipe.fst --preset scalar_pipe
+    python3 sim/wave_stats.py dump.vcd -i in=data_valid_i,data_ready_o -i out=data_valid_o,data_ready_i
+    python3 sim/wave_stats.py dump.vcd --preset scalar_pipe --start 100000 --json stats.json
+
+Signal names match on trailing hierarchy components (bias_valid matches
+TOP.scalar_pipe.bias_valid); the shallowest match wins. FST files are converted
+on the fly by piping through gtkwave's fst2vcd, which has to be on PATH.
+"""
+import sys
+import json
+import gzip
+import argparse
+import subprocess
+from contextlib import contextmanager
+
+# stage interfaces of scalar_pipe.sv in pipeline order: name -> (valid, ready)
+PRESETS = {
+    "scalar_pipe": {
+        "in":    ("scalar_pipe.data_valid_i", "scalar_pipe.data_ready_o"),
+        "bias":  ("scalar_pipe.bias_valid",   "scalar_pipe.bias_ready"),
+        "relu":  ("scalar_pipe.relu_valid",   "scalar_pipe.relu_ready"),
+        "zp":    ("scalar_pipe.zp_valid",     "scalar_pipe.zp_ready"),
+        "scale": ("scalar_pipe.q_valid",      "scalar_pipe.q_ready"),
+        "lut":   ("scalar_pipe.data_valid_o", "scalar_pipe.data_ready_i"),
+    },
+}
+
+@contextmanager
+def open_wave(path):
+    """Yields the waveform as a stream of VCD text lines. FST goes through fst2vcd."""
+    if path.endswith(".fst"):
+        try:
+            proc = subprocess.Popen(["fst2vcd", path], stdout=subprocess.PIPE, text=True)
+        except FileNotFoundError:
+            sys.exit("fst2vcd not found; install gtkwave or convert the trace to VCD")
+        try:
+            yield proc.stdout
+        finally:
+            proc.stdout.close()
+            proc.kill()
+            proc.wait()
+    elif path == "-":
+        yield sys.stdin
+    else:
+        opener = gzip.open if path.endswith(".gz") else open
+        with opener(path, "rt") as f:
+            yield f
+
+def read_header(lines):
+    """
+    Parses the VCD header up to $enddefinitions.
+
+    Returns (timescale, {full name: [id codes]}). Scopes are joined with dots,
+    bit selects on the reference are dropped.
+    """
+    scope = []
+    signals = {}
+    timescale = ""
+    tokens = []
+    for line in lines:
+        tokens += line.split()
+        if "$end" not in tokens:
+            continue
+        # handle every complete $keyword ... $end block collected so far
+        while "$end" in tokens:
+            i = tokens.index("$end")
+            block, tokens = tokens[:i], tokens[i+1:]
+            if not block:
+                continue
+            kw = block[0]
+            if kw == "$scope":
+                scope.append(block[2])
+            elif kw == "$upscope":
+                scope.pop()
+            elif kw == "$var":
+                # $var type size id reference [bit select]
+                ident, ref = block[3], block[4]
+                signals.setdefault(".".join(scope + [ref]), []).append(ident)
+            elif kw == "$timescale":
+                timescale = "".join(block[1:])
+            elif kw == "$enddefinitions":
+                return timescale, signals
+    raise ValueError("no $enddefinitions in waveform")
+
+def resolve(signals, name):
+    """Id code of the signal whose full name ends with the dotted components of name."""
+    matches = [full for full in signals if full == name or full.endswith("." + name)]
+    if not matches:
+        raise KeyError(f"no signal matching '{name}' in waveform")
+    return signals[min(matches, key=lambda full: full.count("."))][0]
+
+class Interface():
+    """Cycle counters of one ready/valid pair."""
+    def __init__(self, name, valid, ready):
+        self.name = name
+        self.valid = valid
+        self.ready = ready
+        self.transfer = 0
+        self.stall = 0
+        self.bubble = 0
+        self.idle = 0
+        self.longest_stall = 0
+        self._stall_run = 0
+
+    def sample(self, v, r):
+        if v and r:
+            self.transfer += 1
+        elif v:
+            self.stall += 1
+        elif r:
+            self.bubble += 1
+        else:
+            self.idle += 1
+        self._stall_run = self._stall_run + 1 if v and not r else 0
+        self.longest_stall = max(self.longest_stall, self._stall_run)
+
+    def result(self, cycles):
+        frac = lambda n: n / cycles if cycles else 0.0
+        return {
+            "transfers": self.transfer,
+            "throughput": frac(self.transfer),
+            "occupancy": frac(self.transfer + self.stall),
+            "stall_cycles": self.stall,
+            "bubble_cycles": self.bubble,
+            "idle_cycles": self.idle,
+            "longest_stall": self.longest_stall,
+        }
+
+def analyze(lines, interfaces, clk="clk_i", rst="rst_i", start=None, end=None):
+    """
+    Streams VCD lines and returns the statistics dict.
+
+    interfaces is an ordered {name: (valid, ready)}. rst may be None for designs
+    without a reset. start/end limit the analysis to that time window, in the
+    waveform's timescale.
+    """
+    lines = iter(lines)
+    timescale, signals = read_header(lines)
+    clk_id = resolve(signals, clk)
+    rst_id = resolve(signals, rst) if rst else None
+    ifs = [Interface(name, resolve(signals, v), resolve(signals, r)) for name, (v, r) in interfaces.items()]
+    # throttle cycles per stage between neighbouring interfaces; the last one is the sink
+    stages = [f"{a.name}->{b.name}" for a, b in zip(ifs, ifs[1:])] + ["sink"]
+    throttle = [0] * len(stages)
+
+    tracked = {clk_id, rst_id} | {i.valid for i in ifs} | {i.ready for i in ifs}
+    tracked.discard(None)
+    cur = {ident: 0 for ident in tracked}
+    pending = {}
+    cycles = 0
+    time = 0
+    first_time = None
+    last_time = None
+
+    def end_of_timestep():
+        nonlocal cycles, first_time, last_time
+        # a rising edge in this timestep samples the values from before it
+        if pending.get(clk_id) == 1 and cur[clk_id] == 0:
+            in_window = (start is None or time >= start) and (end is None or time <= end)
+            if in_window and not (rst_id is not None and cur[rst_id]):
+                cycles += 1
+                if first_time is None:
+                    first_time = time
+                last_time = time
+                stalled = []
+                for i in ifs:
+                    v, r = cur[i.valid], cur[i.ready]
+                    i.sample(v, r)
+                    stalled.append(v and not r)
+                for s in range(len(ifs)):
+                    if stalled[s] and (s + 1 == len(ifs) or not stalled[s+1]):
+                        throttle[s] += 1
+        cur.update(pending)
+        pending.clear()
+
+    # value of a "b<value> <id>" / "r<value> <id>" change, waiting for its id token
+    vec = None
+    for line in lines:
+        for tok in line.split():
+            c = tok[0]
+            if vec is not None:
+                if tok in tracked:
+                    # valid/ready are 1 bit; a wider signal counts as its LSB
+                    pending[tok] = 1 if vec[-1:] == "1" else 0
+                vec = None
+            elif c == "#":
+                end_of_timestep()
+                time = int(tok[1:])
+                if end is not None and time > end:
+                    break
+            elif c in "01xXzZ":
+                if tok[1:] in tracked:
+                    pending[tok[1:]] = 1 if c == "1" else 0
+            elif c in "bBrR":
+                vec = tok[1:] if c in "bB" else ""
+        else:
+            continue
+        break
+    end_of_timestep()
+
+    res = {
+        "timescale": timescale,
+        "cycles": cycles,
+        "first_edge": first_time,
+        "last_edge": last_time,
+        "interfaces": {i.name: i.result(cycles) for i in ifs},
+        "throttle_cycles": dict(zip(stages, throttle)),
+    }
+    res["bottleneck"] = max(res["throttle_cycles"], key=res["throttle_cycles"].get) if any(throttle) else None
+    return res
+
+def report(res):
+    lines = [f"{res['cycles']} cycles (edges {res['first_edge']}..{res['last_edge']}, timescale {res['timescale']})",
+             f"{'interface':12s} {'throughput':>10s} {'occupancy':>10s} {'stall':>10s} {'bubble':>10s} {'idle':>10s} {'max stall':>10s}"]
+    for name, r in res["interfaces"].items():
+        lines.append(f"{name:12s} {r['throughput']:10.3f} {r['occupancy']:10.3f} {r['stall_cycles']:10d} "
+                     f"{r['bubble_cycles']:10d} {r['idle_cycles']:10d} {r['longest_stall']:10d}")
+    lines.append("throttle cycles (input stalled, output not): " +
+                 ", ".join(f"{s} {n}" for s, n in res["throttle_cycles"].items()))
+    lines.append(f"bottleneck: {res['bottleneck'] or 'none (no backpressure)'}")
+    return "\n".join(lines)
+
+def parse_interface(text):
+    name, sigs = text.split("=")
+    valid, ready = sigs.split(",")
+    return name.strip(), (valid.strip(), ready.strip())
+
+def main():
+    parser = argparse.ArgumentParser(description="Ready/valid occupancy, bubble and backpressure statistics from a VCD/FST")
+    parser.add_argument("wave", help="waveform (.vcd, .vcd.gz, .fst, or - for VCD on stdin)")
+    parser.add_argument("--preset", choices=list(PRESETS), help="predefined interface list")
+    parser.add_argument("-i", "--interface", action="append", default=[],
+                        help="NAME=VALID,READY in pipeline order; repeat for each interface")
+    parser.add_argument("--clk", default="clk_i")
+    parser.add_argument("--rst", default="rst_i", help="active high reset, cycles in reset are skipped ('' for none)")
+    parser.add_argument("--start", type=int, default=None, help="ignore edges before this time")
+    parser.add_argument("--end", type=int, default=None, help="stop reading after this time")
+    parser.add_argument("--json", default=None, help="also write the statistics to this file")
+    args = parser.parse_args()
+
+    interfaces = dict(PRESETS[args.preset]) if args.preset else {}
+    interfaces.update(parse_interface(t) for t in args.interface)
+    if not interfaces:
+        parser.error("give --preset or at least one --interface")
+
+    with open_wave(args.wave) as lines:
+        res = analyze(lines, interfaces, clk=args.clk, rst=args.rst or None, start=args.start, end=args.end)
+    print(report(res))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(res, f, indent=2)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
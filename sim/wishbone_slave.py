@@ -0,0 +1,197 @@
+"""
+Wishbone B4 slave for cocotb testbenches: the memory on the other side of
+wb_mux_2to1 (LiteDRAM on the chip), backed by model.dma.WishboneMemory.
+
+The DUT's master port is found by prefix, named from the master's side:
+{prefix}adr_o, dat_o, we_o, stb_o, cyc_o, sel_o, dat_i, ack_i, plus
+{prefix}stall_i in pipelined mode. {prefix}cti_o is recorded when it exists.
+
+Modes:
+    classic    the master holds the request until ack. The ack comes latency
+               cycles after the request first shows up (0 = in the same cycle),
+               and every cycle it is due it is held back with probability
+               stall_prob (wait states).
+    pipelined  a request is taken every cycle stall_i is low. stall_i is
+               raised with probability stall_prob and while queue_depth
+               requests wait for their ack, like LiteDRAM's command queue.
+               Acks come back in order, latency cycles after their request at
+               the earliest.
+
+latency is cycles: an int, a (lo, hi) tuple for a uniform draw per request, or
+any callable(addr) -> cycles, e.g. a RowBuffer for open-row DRAM timing or a
+sampled distribution. Attributes can be changed between transfers.
+
+stats() reports requests, bytes, the bandwidth from the first request to the
+last ack and the request-to-ack latencies.
+
+Usage:
+    mem = WishboneMemory(1 << 16, "DRAM")
+    slave = WishboneSlave(dut, mem, pipelined=True, latency=RowBuffer(hit=6, miss=18))
+    slave.start()
+    ...
+    cocotb.log.info(slave.stats())
+"""
+import random
+from collections import deque
+import cocotb
+from cocotb.triggers import FallingEdge, ReadOnly
+from model.dma import WishboneTransaction
+
+class RowBuffer():
+    """
+    Open-row DRAM timing. Banks interleave every row_bytes; an access to the
+    row open in its bank is a hit, any other row is a miss (precharge +
+    activate) and opens it.
+    """
+    def __init__(self, hit=6, miss=18, row_bytes=1024, banks=4):
+        self.hit = hit
+        self.miss = miss
+        self.row_bytes = row_bytes
+        self.banks = banks
+        self.open = [None] * banks
+        self.hits = 0
+        self.misses = 0
+
+    def __call__(self, addr):
+        bank = (addr // self.row_bytes) % self.banks
+        row = addr // (self.row_bytes * self.banks)
+        if self.open[bank] == row:
+            self.hits += 1
+            return self.hit
+        self.open[bank] = row
+        self.misses += 1
+        return self.miss
+
+class WishboneSlave():
+    """Answers a DUT's Wishbone master port from a WishboneMemory. See the module docstring."""
+    def __init__(self, dut, mem, pipelined=False, latency=0, stall_prob=0.0, queue_depth=None, prefix="wb_", clk=None):
+        self.dut = dut
+        self.mem = mem
+        self.pipelined = pipelined
+        self.latency = latency
+        self.stall_prob = stall_prob
+        self.queue_depth = queue_depth
+        self.clk = clk if clk is not None else dut.clk_i
+        self.bus = {name: getattr(dut, prefix + name) for name in
+                    ("adr_o", "dat_o", "we_o", "stb_o", "cyc_o", "sel_o", "dat_i", "ack_i")}
+        if pipelined:
+            self.bus["stall_i"] = getattr(dut, prefix + "stall_i")
+        if hasattr(dut, prefix + "cti_o"):
+            self.bus["cti_o"] = getattr(dut, prefix + "cti_o")
+        self.cycle = 0
+        self.reset_stats()
+
+    def start(self):
+        return cocotb.start_soon(self._run_pipelined() if self.pipelined else self._run_classic())
+
+    def reset_stats(self):
+        self.reads = 0
+        self.writes = 0
+        self.bytes = 0
+        self.latencies = []
+        self.cti = []
+        self.max_outstanding = 0
+        self.first_cycle = None
+        self.last_cycle = None
+
+    @property
+    def requests(self):
+        return self.reads + self.writes
+
+    def stats(self):
+        """Counts, bandwidth in bytes per cycle and latency in cycles since the last reset_stats()."""
+        cycles = self.last_cycle - self.first_cycle + 1 if self.latencies else 0
+        s = {
+            "reads": self.reads,
+            "writes": self.writes,
+            "bytes": self.bytes,
+            "cycles": cycles,
+            "bytes_per_cycle": self.bytes / cycles if cycles else 0.0,
+            "latency_mean": sum(self.latencies) / len(self.latencies) if self.latencies else 0.0,
+            "latency_min": min(self.latencies, default=0),
+            "latency_max": max(self.latencies, default=0),
+            "max_outstanding": self.max_outstanding,
+        }
+        if isinstance(self.latency, RowBuffer):
+            s["row_hits"] = self.latency.hits
+            s["row_misses"] = self.latency.misses
+        return s
+
+    def _cycles(self, addr):
+        if callable(self.latency):
+            return self.latency(addr)
+        if isinstance(self.latency, tuple):
+            return random.randint(*self.latency)
+        return self.latency
+
+    def _request(self):
+        """The transaction on the bus, executed against the memory. Returns the read data."""
+        bus = self.bus
+        txn = WishboneTransaction(addr=bus["adr_o"].value.to_unsigned(),
+                                  data=bus["dat_o"].value.to_unsigned(),
+                                  we=bus["we_o"].value == 1,
+                                  sel=bus["sel_o"].value.to_unsigned())
+        if txn.we:
+            self.writes += 1
+        else:
+            self.reads += 1
+        self.bytes += bin(txn.sel).count("1")
+        if "cti_o" in bus:
+            self.cti.append(bus["cti_o"].value.to_unsigned())
+        return self.mem.execute(txn)
+
+    def _acked(self, start):
+        self.latencies.append(self.cycle - start)
+        self.last_cycle = self.cycle
+
+    async def _run_classic(self):
+        bus = self.bus
+        start = due = None
+        while True:
+            await FallingEdge(self.clk)
+            self.cycle += 1
+            ack = False
+            if bus["cyc_o"].value == 1 and bus["stb_o"].value == 1:
+                if start is None:
+                    start = self.cycle
+                    due = self.cycle + self._cycles(bus["adr_o"].value.to_unsigned())
+                    if self.first_cycle is None:
+                        self.first_cycle = self.cycle
+                    self.max_outstanding = max(self.max_outstanding, 1)
+                if self.cycle >= due and random.random() >= self.stall_prob:
+                    bus["dat_i"].value = self._request()
+                    self._acked(start)
+                    start = None
+                    ack = True
+            else:
+                start = None
+            bus["ack_i"].value = int(ack)
+            if not ack:
+                bus["dat_i"].value = random.getrandbits(32)
+
+    async def _run_pipelined(self):
+        bus = self.bus
+        pending = deque()   # (cycle of the request, cycle the ack is due, read data)
+        while True:
+            await FallingEdge(self.clk)
+            self.cycle += 1
+            if pending and pending[0][1] <= self.cycle:
+                start, _, data = pending.popleft()
+                bus["dat_i"].value = data
+                bus["ack_i"].value = 1
+                self._acked(start)
+            else:
+                bus["dat_i"].value = random.getrandbits(32)
+                bus["ack_i"].value = 0
+            full = self.queue_depth is not None and len(pending) >= self.queue_depth
+            stall = full or random.random() < self.stall_prob
+            bus["stall_i"].value = int(stall)
+            await ReadOnly()
+            if bus["ack_i"].value == 1:
+                assert bus["cyc_o"].value == 1, "ack outside of a bus cycle"
+            if bus["cyc_o"].value == 1 and bus["stb_o"].value == 1 and not stall:
+                if self.first_cycle is None:
+                    self.first_cycle = self.cycle
+                addr = bus["adr_o"].value.to_unsigned()
+                pending.append((self.cycle, self.cycle + self._cycles(addr), self._request()))
+            self.max_outstanding = max(self.max_outstanding, len(pending))